@@ -0,0 +1,8 @@
+"""
+Point d'entrée: python -m clash_simulator
+"""
+import sys
+
+from clash_simulator.cli import main
+
+sys.exit(main())
@@ -0,0 +1,176 @@
+"""
+Benchmark headless des configurations de bases et d'armées fournies
+"""
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Dict, List, Optional, Sequence
+
+from clash_simulator.data.army_configs import ARMY_CONFIGURATIONS
+from clash_simulator.data.base_configs import BASE_CONFIGURATIONS, get_base_layout_from_config
+from clash_simulator.systems.battle_simulator import BattleRunner
+from clash_simulator.systems.pathfinding import PATHFINDING_STATS, reset_pathfinding_stats
+
+BENCHMARK_DIRECTORY = "benchmarks" # Répertoire des résultats et de la référence
+DEFAULT_BASELINE_PATH = os.path.join(BENCHMARK_DIRECTORY, "baseline.json")
+DEFAULT_REGRESSION_THRESHOLD = 0.10 # +10% de temps par bataille = régression
+
+
+def run_scenario(base_name: str, army_name: str, repeat: int = 3, measure_memory: bool = True,
+                 seed: int = 0) -> Dict:
+    """Mesure une bataille (base, armée).
+
+    Le temps retenu est le minimum sur `repeat` exécutions (le moins bruité). La mémoire
+    de pointe est mesurée dans une exécution séparée, tracemalloc ralentissant fortement
+    la simulation.
+    """
+    base = get_base_layout_from_config(base_name)
+    army = ARMY_CONFIGURATIONS[army_name]
+
+    wall_times = []
+    stats = None
+    astar_calls = nodes_expanded = 0
+    for _ in range(max(1, repeat)):
+        simulator = BattleRunner.build_battle(base, army, seed=seed)
+        reset_pathfinding_stats()
+        start = time.perf_counter()
+        simulator.simulate_battle()
+        wall_times.append(time.perf_counter() - start)
+        stats = simulator.get_statistics()
+        astar_calls = PATHFINDING_STATS["calls"]
+        nodes_expanded = PATHFINDING_STATS["nodes_expanded"]
+
+    peak_memory = None
+    if measure_memory:
+        simulator = BattleRunner.build_battle(base, army, seed=seed)
+        tracemalloc.start()
+        simulator.simulate_battle()
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    wall_time = min(wall_times)
+    return {
+        'base': base_name,
+        'army': army_name,
+        'wall_time': wall_time,
+        'wall_times': wall_times,
+        'ticks': stats['tick_count'],
+        'ticks_per_second': stats['tick_count'] / wall_time if wall_time > 0 else 0.0,
+        'astar_calls': astar_calls,
+        'nodes_expanded': nodes_expanded,
+        'peak_memory_bytes': peak_memory,
+        'state': stats['state'],
+        'destruction_percentage': stats['destruction_percentage'],
+    }
+
+
+def run_benchmark(base_names: Optional[Sequence[str]] = None, army_names: Optional[Sequence[str]] = None,
+                  repeat: int = 3, measure_memory: bool = True, verbose: bool = True) -> Dict:
+    """Exécute tous les scénarios bases × armées et retourne un rapport sérialisable en JSON"""
+    base_names = list(base_names) if base_names else list(BASE_CONFIGURATIONS)
+    army_names = list(army_names) if army_names else list(ARMY_CONFIGURATIONS)
+
+    scenarios = []
+    for base_name in base_names:
+        for army_name in army_names:
+            result = run_scenario(base_name, army_name, repeat, measure_memory)
+            scenarios.append(result)
+            if verbose:
+                print(format_scenario(result))
+
+    return {
+        'created': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': repeat,
+        'scenarios': scenarios,
+        'total_wall_time': sum(s['wall_time'] for s in scenarios),
+    }
+
+
+def format_scenario(result: Dict) -> str:
+    memory = f"{result['peak_memory_bytes'] / 1024:.0f} Ko" if result['peak_memory_bytes'] is not None else "-"
+    return (f"{result['base']} × {result['army']}: {result['wall_time'] * 1000:.1f} ms, "
+            f"{result['ticks_per_second']:.0f} ticks/s, A* {result['astar_calls']} appels / "
+            f"{result['nodes_expanded']} nœuds, mémoire {memory}")
+
+
+def save_report(report: Dict, path: str) -> None:
+    directory = os.path.dirname(path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+
+def load_report(path: str) -> Dict:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare_to_baseline(report: Dict, baseline: Dict, threshold: float = DEFAULT_REGRESSION_THRESHOLD) -> List[Dict]:
+    """Liste les régressions par rapport à une référence.
+
+    Un scénario régresse si son temps dépasse celui de la référence de plus de
+    `threshold` (relatif), ou si le nombre de nœuds A* développés augmente (compteur
+    déterministe, insensible au bruit de mesure).
+    """
+    baseline_by_key = {(s['base'], s['army']): s for s in baseline.get('scenarios', [])}
+    regressions = []
+    for scenario in report['scenarios']:
+        reference = baseline_by_key.get((scenario['base'], scenario['army']))
+        if reference is None:
+            continue
+        ratio = scenario['wall_time'] / reference['wall_time'] if reference['wall_time'] > 0 else 1.0
+        if ratio > 1.0 + threshold:
+            regressions.append({'base': scenario['base'], 'army': scenario['army'], 'metric': 'wall_time',
+                                'baseline': reference['wall_time'], 'current': scenario['wall_time'], 'ratio': ratio})
+        if scenario['nodes_expanded'] > reference['nodes_expanded']:
+            regressions.append({'base': scenario['base'], 'army': scenario['army'], 'metric': 'nodes_expanded',
+                                'baseline': reference['nodes_expanded'], 'current': scenario['nodes_expanded'],
+                                'ratio': scenario['nodes_expanded'] / max(1, reference['nodes_expanded'])})
+    return regressions
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Point d'entrée: python -m clash_simulator.benchmark [--output f] [--baseline f] [--save-baseline]"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark des scénarios bases × armées")
+    parser.add_argument("--base", action="append", help="Base à mesurer (répétable, défaut: toutes)")
+    parser.add_argument("--army", action="append", help="Armée à mesurer (répétable, défaut: toutes)")
+    parser.add_argument("--repeat", type=int, default=3, help="Exécutions par scénario (le minimum est retenu)")
+    parser.add_argument("--no-memory", action="store_true", help="Ne pas mesurer la mémoire de pointe")
+    parser.add_argument("--output", default=os.path.join(BENCHMARK_DIRECTORY, "latest.json"), help="Rapport JSON")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE_PATH, help="Référence à comparer")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_REGRESSION_THRESHOLD,
+                        help="Seuil de régression relatif sur le temps")
+    parser.add_argument("--save-baseline", action="store_true", help="Enregistrer ce rapport comme référence")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(args.base, args.army, args.repeat, not args.no_memory)
+    save_report(report, args.output)
+    print(f"Rapport écrit dans {args.output} (total {report['total_wall_time']:.2f}s)")
+
+    if args.save_baseline:
+        save_report(report, args.baseline)
+        print(f"Référence enregistrée dans {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"Pas de référence ({args.baseline}); utilisez --save-baseline pour en créer une.")
+        return 0
+
+    regressions = compare_to_baseline(report, load_report(args.baseline), args.threshold)
+    for r in regressions:
+        print(f"RÉGRESSION {r['base']} × {r['army']} [{r['metric']}]: {r['baseline']} -> {r['current']} (x{r['ratio']:.2f})")
+    if not regressions:
+        print("Aucune régression.")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,209 @@
+"""
+Interface en ligne de commande non interactive: python -m clash_simulator run|batch|bench|menu
+
+Les modules du moteur, de visualisation et de démonstration ne sont importés
+qu'au moment où une commande en a besoin, pour un démarrage rapide des scripts.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_BASE = "Simple TH3 Par Défaut"
+DEFAULT_ARMY = "Armée Mixte TH3 (Main)"
+
+
+def load_base(spec: str):
+    """Base depuis un fichier JSON (BaseLayout.save_to_file) ou un nom de BASE_CONFIGURATIONS"""
+    from clash_simulator.systems.base_layout import BaseLayout
+    from clash_simulator.data.base_configs import get_base_layout_from_config
+
+    if os.path.isfile(spec):
+        base = BaseLayout()
+        base.load_from_file(spec)
+        return base
+    return get_base_layout_from_config(spec)
+
+
+def load_army(spec: str) -> List[Tuple[str, int, Tuple[float, float]]]:
+    """Armée depuis un fichier JSON ([[type, niveau, [x, y]], ...] ou {"troops": [...]})
+    ou un nom d'ARMY_CONFIGURATIONS"""
+    if os.path.isfile(spec):
+        with open(spec, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        entries = data.get("troops", []) if isinstance(data, dict) else data
+        return [(troop_type, int(level), (float(position[0]), float(position[1])))
+                for troop_type, level, position in entries]
+
+    from clash_simulator.data.army_configs import ARMY_CONFIGURATIONS
+
+    if spec not in ARMY_CONFIGURATIONS:
+        raise ValueError(f"Configuration d'armée nommée '{spec}' non trouvée.")
+    return list(ARMY_CONFIGURATIONS[spec])
+
+
+def _army_label(spec: str) -> str:
+    return os.path.splitext(os.path.basename(spec))[0] if os.path.isfile(spec) else spec
+
+
+def format_stats(stats: Dict) -> str:
+    return (f"{stats['state']} - {stats['stars']}★ {stats['destruction_percentage']:.1f}% en "
+            f"{stats['duration']:.1f}s, troupes perdues {stats['troops_lost']}/{stats['troops_deployed']}")
+
+
+def _write_json(path: str, data) -> None:
+    directory = os.path.dirname(path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+def command_run(args: argparse.Namespace) -> int:
+    """Une bataille, affichée dans le terminal avec --visualize"""
+    from clash_simulator.systems.battle_simulator import BattleRunner
+
+    army = load_army(args.army)
+    base = load_base(args.base)
+    simulator = BattleRunner.build_battle(base, army, seed=args.seed, fidelity=args.fidelity,
+                                          replay_path=args.replay)
+    start = time.perf_counter()
+    if args.visualize:
+        from clash_simulator.visualization.terminal_display import BattleVisualizer
+
+        BattleVisualizer(simulator).run(speed_multiplier=args.speed, show_legend=False)
+    else:
+        simulator.simulate_battle()
+    elapsed = time.perf_counter() - start
+
+    stats = simulator.get_statistics()
+    print(format_stats(stats))
+    if args.output:
+        _write_json(args.output, {'base': args.base, 'army': _army_label(args.army), 'seed': args.seed,
+                                  'wall_time': elapsed, 'stats': stats})
+        print(f"Résultat écrit dans {args.output}")
+    return 0
+
+
+def command_batch(args: argparse.Namespace) -> int:
+    """Chaque armée × `repeat` graines contre une base, répartis sur `workers` processus"""
+    from clash_simulator.systems.battle_simulator import BattleRunner
+
+    army_specs = args.army or [DEFAULT_ARMY]
+    armies = [load_army(spec) for spec in army_specs]
+    base = load_base(args.base)
+    tasks = [(army, args.seed + i) for army in armies for i in range(args.repeat)]
+
+    cache = None
+    if args.cache:
+        from clash_simulator.utils.result_cache import ResultCache
+
+        cache = ResultCache(args.cache)
+
+    # .jsonl / .parquet: chaque résultat est écrit dès qu'il est disponible
+    sink = None
+    if args.output and args.output.endswith((".jsonl", ".parquet")):
+        from clash_simulator.utils.result_sink import open_result_sink
+
+        sink = open_result_sink(args.output)
+
+    start = time.perf_counter()
+    try:
+        results = BattleRunner.run_batch(base, tasks, workers=args.workers, cache=cache, sink=sink,
+                                         fidelity=args.fidelity)
+    finally:
+        if sink is not None:
+            sink.close()
+        if cache is not None:
+            cache.close()
+    elapsed = time.perf_counter() - start
+
+    records = []
+    for index, stats in enumerate(results):
+        spec = army_specs[index // args.repeat]
+        records.append({'army': _army_label(spec), 'seed': tasks[index][1], 'stats': stats})
+
+    for army_index, spec in enumerate(army_specs):
+        label = _army_label(spec)
+        runs = [r['stats'] for r in records[army_index * args.repeat:(army_index + 1) * args.repeat]]
+        mean_destruction = sum(s['destruction_percentage'] for s in runs) / len(runs)
+        mean_stars = sum(s['stars'] for s in runs) / len(runs)
+        print(f"{label}: {len(runs)} batailles, destruction moyenne {mean_destruction:.1f}%, "
+              f"étoiles moyennes {mean_stars:.2f}")
+    print(f"{len(tasks)} batailles en {elapsed:.2f}s ({args.workers} worker(s))")
+
+    if sink is not None:
+        print(f"Résultats ajoutés à {args.output} ({sink.written} enregistrements)")
+    elif args.output:
+        _write_json(args.output, {'base': args.base, 'wall_time': elapsed, 'results': records})
+        print(f"Résultats écrits dans {args.output}")
+    return 0
+
+
+def command_bench(args: argparse.Namespace) -> int:
+    from clash_simulator import benchmark
+
+    return benchmark.main(args.extra_args)
+
+
+def command_menu(args: argparse.Namespace) -> int:
+    from clash_simulator.main import interactive_menu
+
+    interactive_menu()
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m clash_simulator",
+                                     description="Simulateur de batailles Clash of Clans TH3")
+    commands = parser.add_subparsers(dest="command", metavar="commande")
+
+    def add_battle_options(command: argparse.ArgumentParser) -> None:
+        command.add_argument("--base", default=DEFAULT_BASE, help="Nom de base configurée ou fichier JSON")
+        command.add_argument("--seed", type=int, default=0, help="Graine (première graine pour batch)")
+        command.add_argument("--fidelity", default="full", help="Préréglage de fidélité (full, coarse)")
+        command.add_argument("--output", help="Fichier JSON des résultats (batch: .jsonl ou .parquet en flux)")
+
+    run = commands.add_parser("run", help="Simuler une bataille")
+    add_battle_options(run)
+    run.add_argument("--army", default=DEFAULT_ARMY, help="Nom d'armée configurée ou fichier JSON")
+    run.add_argument("--replay", help="Enregistrer le replay dans ce fichier")
+    run.add_argument("--visualize", action="store_true", help="Afficher la bataille dans le terminal")
+    run.add_argument("--speed", type=float, default=1.0, help="Multiplicateur de vitesse avec --visualize")
+    run.set_defaults(handler=command_run)
+
+    batch = commands.add_parser("batch", help="Simuler un lot de batailles")
+    add_battle_options(batch)
+    batch.add_argument("--army", action="append", help="Armée (répétable, défaut: armée principale)")
+    batch.add_argument("--repeat", type=int, default=10, help="Batailles (graines) par armée")
+    batch.add_argument("--workers", type=int, default=1, help="Processus de simulation")
+    batch.add_argument("--cache", help="Cache SQLite des résultats")
+    batch.set_defaults(handler=command_batch)
+
+    bench = commands.add_parser("bench", help="Benchmark (options de clash_simulator.benchmark)", add_help=False)
+    bench.set_defaults(handler=command_bench)
+
+    menu = commands.add_parser("menu", help="Menu interactif historique")
+    menu.set_defaults(handler=command_menu)
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = build_parser()
+    # Les options de bench sont transmises telles quelles à clash_simulator.benchmark
+    args, extra_args = parser.parse_known_args(argv)
+    if extra_args and args.command != "bench":
+        parser.error(f"arguments non reconnus : {' '.join(extra_args)}")
+    args.extra_args = extra_args
+    if args.command is None:
+        parser.print_help()
+        return 2
+    if getattr(args, "repeat", 1) < 1 or getattr(args, "workers", 1) < 1:
+        parser.error("--repeat et --workers doivent être strictement positifs")
+    try:
+        return args.handler(args)
+    except (ValueError, OSError) as e:
+        print(f"Erreur: {e}", file=sys.stderr)
+        return 2
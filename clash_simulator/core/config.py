@@ -9,6 +9,14 @@ TICK_RATE = 10  # Ticks par seconde
 TILE_SIZE = 1.0  # Taille d'une tuile en unités
 MAX_BATTLE_DURATION = 180.0 # Durée maximale d'une bataille en secondes (3 minutes)
 
+# Niveaux de fidélité de la simulation
+# "coarse" sert aux évaluations rapides (rollouts MCTS, tri de candidats): pas de temps
+# deux fois plus grand et pas d'historique.
+SIMULATION_FIDELITY = {
+    "full": {"tick_rate": TICK_RATE, "record_history": True},
+    "coarse": {"tick_rate": 5, "record_history": False},
+}
+
 # Statistiques des troupes par niveau
 TROOP_STATS = {
     "barbarian": {
@@ -118,6 +126,9 @@ TH3_BUILDING_LIMITS = {
     "wall": 50
 }
 
+# Capacité des camps militaires pour TH3 (2 camps de 35 places)
+TH3_HOUSING_CAPACITY = 70
+
 # Configuration du pathfinding et de l'IA
 PATHFINDING_CONFIG = {
     # Pénalités de mur par type de troupe
@@ -142,7 +153,23 @@ PATHFINDING_CONFIG = {
     "retarget_interval": 3.0,  # Temps en secondes avant de réévaluer la cible active
     "path_recalculation_interval": 1.0, # Temps en secondes avant de recalculer le chemin actif
     "wall_break_time_estimation": 5.0,
-    "compartment_preference": 0.8,
+    "compartment_preference": 0.8, # Facteur du score des cibles du compartiment de la troupe (avec use_compartments)
+    # Compartiments fermés par les murs (systems/compartments.py): préférence de cible et
+    # A* limité aux compartiments de la route. Les chemins peuvent différer de l'A* complet.
+    "use_compartments": False,
+    # Recherche hiérarchique par grappes de tuiles (systems/hierarchical_pathfinding.py), pour les
+    # grandes cartes (côté >= min_grid_size) ou les trajets d'au moins min_distance tuiles (None: jamais)
+    "hierarchical": {"cluster_size": 10, "min_grid_size": 80, "min_distance": None},
+    # Jump point search au lieu de l'A* quand la grille n'a plus de murs (ou pour les troupes aériennes)
+    "jump_point_search": True,
+    # Lissage des chemins par ligne de vue (les segments ne traversent ni bâtiment ni mur). Change les trajectoires.
+    "smooth_paths": False,
+    # Recherches de chemin d'un tick regroupées par arrivée et profil de traversée (systems/path_batch.py).
+    # Les troupes concernées avancent après les autres et les chemins groupés peuvent différer de l'A*.
+    "batch_paths": False,
+    # Troupes aériennes: position d'attaque tirée au hasard à moins de cet angle (degrés) de la
+    # direction bâtiment -> troupe (face avant du bâtiment), rejointe en ligne droite
+    "flying_front_angle": 45.0,
     "num_candidates_to_evaluate": 5 # Nombre de cibles potentielles à évaluer lors de find_target
 }
 
@@ -15,6 +15,8 @@ class Building(ABC):
         self.hp = self.max_hp
         self.is_destroyed = False
         self.gap = self._get_gap()
+        self.model = None # BaseModel dont le bâtiment est issu (voir BaseModel.instantiate)
+        self.model_index = None
         
     @property
     @abstractmethod
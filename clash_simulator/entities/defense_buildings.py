@@ -7,7 +7,7 @@ from typing import Optional, List, Tuple
 from .building import Building
 from .troop_types import Troop
 from ..core.config import DEFENSE_STATS, TILE_SIZE
-from ..entities.troop import Troop as TroopEntity
+from ..entities.troop import Troop as TroopEntity, TARGETING_STATS
 from ..utils.logger import BattleLogger
 
 class Projectile:
@@ -96,10 +96,21 @@ class DefenseBuilding(Building):
         """Vérifie si la défense peut attaquer basé sur sa vitesse d'attaque."""
         return current_time - self.last_attack_time >= self.attack_speed
 
+    def troops_in_reach(self, troops: List[Troop]) -> List[Troop]:
+        """Troupes dont la tuile peut être à portée (carte de couverture de la base compilée).
+        Le filtre est conservateur: les tests de portée restent faits sur les troupes gardées."""
+        model = self.model
+        if model is None:
+            return troops
+        return [troop for troop in troops if model.may_be_in_range(self.model_index, troop.x, troop.y)]
+
     def find_target(self, troops: List[Troop], logger: Optional[BattleLogger] = None) -> Optional[Troop]:
         """Trouve une cible valide parmi les troupes fournies."""
+        TARGETING_STATS["defense_searches"] += 1
+        candidates = self.troops_in_reach(troops)
+        TARGETING_STATS["defense_candidates"] += len(candidates)
         valid_targets = []
-        for troop in troops:
+        for troop in candidates:
             if troop.is_alive() and self.can_target(troop) and self.is_in_range(troop):
                 valid_targets.append(troop)
         
@@ -279,10 +290,13 @@ class Mortar(DefenseBuilding):
     
     def find_target(self, troops: List[Troop], logger: Optional[BattleLogger] = None) -> Optional[Troop]:
         """Trouve la meilleure cible (groupe de troupes)"""
+        TARGETING_STATS["defense_searches"] += 1
+        candidates = self.troops_in_reach(troops)
+        TARGETING_STATS["defense_candidates"] += len(candidates)
         best_target = None
         best_score = 0
         
-        for troop in troops:
+        for troop in candidates:
             if troop.hp <= 0 or not self.can_target(troop):
                 continue
             
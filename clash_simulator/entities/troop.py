@@ -6,6 +6,9 @@ from abc import ABC, abstractmethod
 from typing import Optional, List, Tuple
 from enum import Enum
 
+# Compteurs globaux des recherches de cibles (troupes et défenses), lus par le profileur de ticks
+TARGETING_STATS = {"troop_searches": 0, "troop_candidates": 0, "defense_searches": 0, "defense_candidates": 0}
+
 class TroopState(Enum):
     """États possibles d'une troupe"""
     IDLE = "idle"
@@ -31,6 +34,11 @@ class Troop(ABC):
         self.last_path_calculation_time = 0
         self.spawn_time = 0
         self.is_flying = False  # Par défaut, troupes au sol
+        self.rng = None  # Flux aléatoire propre à la troupe, attribué par le simulateur
+        self.tracer = None  # TraceRecorder et piste de la troupe, attribués par le simulateur si la trace est active
+        self.trace_track = 0
+        self.compartments = None  # CompartmentMap de la bataille, attribuée par le simulateur si PATHFINDING_CONFIG["use_compartments"]
+        self.path_batch = None  # PathBatch de la bataille, attribué par le simulateur si PATHFINDING_CONFIG["batch_paths"]
         
     @property
     def max_hp(self) -> int:
@@ -121,7 +129,7 @@ class Troop(ABC):
     
     def find_target(self, buildings: List, walls: List, current_time: float) -> Optional[object]:
         """Trouve la meilleure cible parmi les bâtiments."""
-        from ..core.config import PATHFINDING_CONFIG
+        from ..core.config import PATHFINDING_CONFIG, TILE_SIZE
         
         # Vérifier s'il faut recalculer la cible
         if self.target and not self.target.is_destroyed and \
@@ -130,6 +138,7 @@ class Troop(ABC):
         else:
             # Filtrer les bâtiments valides (non-murs explicitement pour la sélection initiale de cible)
             # Les murs seront considérés par A* pour le pathfinding.
+            TARGETING_STATS["troop_searches"] += 1
             valid_buildings = [b for b in buildings if not b.is_destroyed and b.type != 'wall']
             
             # Si après avoir filtré les murs, il n'y a plus de bâtiments,
@@ -164,12 +173,17 @@ class Troop(ABC):
                         return None
 
 
-            # Trier par distance (vol d'oiseau pour une première sélection)
-            buildings_by_distance = sorted(valid_buildings, 
-                                         key=lambda b: self.distance_to_building(b))
-            
             n_closest = PATHFINDING_CONFIG.get("num_candidates_to_evaluate", 5)
-            closest_buildings_to_evaluate = buildings_by_distance[:min(n_closest, len(buildings_by_distance))]
+            model = valid_buildings[0].model
+            if self.is_flying and model is not None and valid_buildings[0].type != "wall":
+                # Troupes aériennes: plus proches candidats par l'index spatial de la base compilée
+                candidates = {b.model_index: b for b in valid_buildings}
+                closest_buildings_to_evaluate = model.nearest_buildings(self.x, self.y, n_closest, candidates)
+            else:
+                # Trier par distance (vol d'oiseau pour une première sélection)
+                buildings_by_distance = sorted(valid_buildings, 
+                                             key=lambda b: self.distance_to_building(b))
+                closest_buildings_to_evaluate = buildings_by_distance[:min(n_closest, len(buildings_by_distance))]
             
             if not closest_buildings_to_evaluate: # Si après tout ça, rien à évaluer.
                 self.target = None
@@ -178,7 +192,14 @@ class Troop(ABC):
 
             best_score = float('inf')
             potential_target = None
+            # Compartiment de la troupe: ses cibles sont atteignables sans percer de mur
+            own_compartment = None
+            if self.compartments is not None:
+                self.compartments.sync()
+                around = self.compartments.compartments_around((int(self.x / TILE_SIZE), int(self.y / TILE_SIZE)))
+                own_compartment = min(around) if len(around) == 1 else None
             
+            TARGETING_STATS["troop_candidates"] += len(closest_buildings_to_evaluate)
             for building_candidate in closest_buildings_to_evaluate:
                 # Le pathfinding A* sera appelé APRÈS qu'une cible soit choisie.
                 # Ici, on veut juste une évaluation rapide.
@@ -196,6 +217,8 @@ class Troop(ABC):
                 # Par exemple, w_dist * dist + w_pref * pref
                 # Pour l'instant, simple produit. Si pref_score est élevé, ça pénalise.
                 score = distance_factor * preference_score 
+                if own_compartment is not None and own_compartment in self.compartments.compartments_of(building_candidate):
+                    score *= PATHFINDING_CONFIG["compartment_preference"]
                                 
                 if score < best_score:
                     best_score = score
@@ -212,24 +235,30 @@ class Troop(ABC):
     def calculate_path(self, target_building: object, all_buildings: List, walls: List, current_time: float) -> List[Tuple[float, float]]:
         """Calcule le chemin vers une position cible en utilisant A*."""
         from ..core.config import PATHFINDING_CONFIG, TILE_SIZE
-        from ..systems.pathfinding import find_path # Import A*
+        from ..systems.pathfinding import find_path, PATHFINDING_STATS # Import A*
         
         if not target_building:
             self.path = None
             return []
+        if self.is_flying:
+            return self.calculate_direct_path(target_building, current_time)
 
         # Déterminer la position cible pour A*
         # Idéalement, une position d'attaque valide la plus proche
-        attack_positions = target_building.get_attack_positions(self.range)
-        if not attack_positions:
-            # Si pas de positions d'attaque (ex: bâtiment très grand ou inaccessible), cibler le centre
-            target_center_x, target_center_y = target_building.get_center()
-            target_pos_world = (target_center_x, target_center_y)
+        goal_tile = None # Tuile libre visée par A*, connue si la base est compilée
+        if target_building.model is not None:
+            # Table précalculée à la compilation de la base
+            closest = target_building.model.closest_attack_position(
+                target_building.model_index, self.range, self.x, self.y, self.is_flying)
+            target_pos_world, goal_tile = closest if closest is not None else (None, None)
         else:
+            attack_positions = target_building.get_attack_positions(self.range)
             # Choisir la position d'attaque la plus proche de la troupe par distance directe
-            current_pos_world = (self.x, self.y)
-            target_pos_world = min(attack_positions, 
-                                   key=lambda pos: math.sqrt((pos[0] - current_pos_world[0])**2 + (pos[1] - current_pos_world[1])**2))
+            target_pos_world = min(attack_positions,
+                                   key=lambda pos: (pos[0] - self.x)**2 + (pos[1] - self.y)**2, default=None)
+        if target_pos_world is None:
+            # Si pas de positions d'attaque (ex: bâtiment très grand ou inaccessible), cibler le centre
+            target_pos_world = target_building.get_center()
 
         # print(f"TPW_DEBUG: Troop {self.type} -> {target_building.type if target_building else 'None'}, TargetPos: {target_pos_world if target_pos_world else 'None'}") # SIMPLIFIED DEBUG
 
@@ -245,6 +274,7 @@ class Troop(ABC):
             recalculation_needed = True
         
         if not recalculation_needed:
+            PATHFINDING_STATS["cache_hits"] += 1 # Chemin encore valide réutilisé
             return self.path
 
         # Appeler A*
@@ -254,8 +284,16 @@ class Troop(ABC):
         # Let's adjust `find_path` or how we pass these.
         # For now, `find_path` expects buildings (non-walls) and walls separately.
         
+        if self.path_batch is not None:
+            # Chemin calculé avec ceux des autres troupes à la fin du tick (voir systems/path_batch.py)
+            self.path_batch.request(self, target_pos_world, goal_tile)
+            return self.path
+
         non_wall_buildings = [b for b in all_buildings if b.type != "wall"]
 
+        if self.tracer is not None:
+            trace_start = self.tracer.now()
+            nodes_before = PATHFINDING_STATS["nodes_expanded"]
         
         calculated_path = find_path(
             start_pos_world=(self.x, self.y),
@@ -263,9 +301,23 @@ class Troop(ABC):
             buildings=non_wall_buildings, # Pass only non-wall buildings
             walls=walls,                  # Pass walls separately
             troop_type=self.type,
-            troop_is_flying=self.is_flying
+            troop_is_flying=self.is_flying,
+            goal_tile=goal_tile,
+            compartments=self.compartments
         )
         
+        if self.tracer is not None:
+            self.tracer.complete("A*", "pathfinding", trace_start, self.trace_track, {
+                "target": target_building.type,
+                "nodes_expanded": PATHFINDING_STATS["nodes_expanded"] - nodes_before,
+                "path_length": len(calculated_path) if calculated_path else 0,
+            })
+        
+        return self.set_path(calculated_path, target_pos_world, current_time)
+
+    def set_path(self, calculated_path: Optional[List[Tuple[float, float]]], target_pos_world: Tuple[float, float],
+                 current_time: float) -> Optional[List[Tuple[float, float]]]:
+        """Adopte un chemin calculé vers target_pos_world (None si aucun chemin n'a été trouvé)"""
         if calculated_path:
             self.path = calculated_path
             # print(f"DEBUG: Path found for {self.type}: {self.path}")
@@ -279,6 +331,44 @@ class Troop(ABC):
         
         return self.path
     
+    def calculate_direct_path(self, target_building: object, current_time: float) -> List[Tuple[float, float]]:
+        """Chemin des troupes aériennes: ligne droite vers une position d'attaque tirée au hasard
+        sur la face du bâtiment tournée vers la troupe, sans grille ni A*.
+
+        La position est gardée jusqu'au changement de cible (find_target vide alors le chemin).
+        """
+        from ..core.config import PATHFINDING_CONFIG
+        from ..systems.pathfinding import PATHFINDING_STATS
+
+        if self.path:
+            PATHFINDING_STATS["cache_hits"] += 1
+            return self.path
+
+        if target_building.model is not None:
+            positions = target_building.model.get_attack_positions(target_building.model_index, self.range).positions
+        else:
+            positions = target_building.get_attack_positions(self.range)
+        if not positions:
+            target_pos_world = target_building.get_center()
+        else:
+            # Face avant: positions à moins de flying_front_angle degrés de la direction centre -> troupe
+            center_x, center_y = target_building.get_center()
+            to_troop = math.atan2(self.y - center_y, self.x - center_x)
+            max_angle = math.radians(PATHFINDING_CONFIG["flying_front_angle"])
+            front = [p for p in positions
+                     if abs((math.atan2(p[1] - center_y, p[0] - center_x) - to_troop + math.pi) % (2 * math.pi) - math.pi) <= max_angle]
+            if front and self.rng is not None:
+                target_pos_world = self.rng.choice(front)
+            else:
+                target_pos_world = min(positions, key=lambda pos: (pos[0] - self.x) ** 2 + (pos[1] - self.y) ** 2)
+
+        PATHFINDING_STATS["direct_paths"] += 1
+        self.path = [target_pos_world]
+        self.path_index = 0
+        self.target_position = target_pos_world
+        self.last_path_calculation_time = current_time
+        return self.path
+
     def move_towards(self, target_x: float, target_y: float, dt: float) -> None:
         """Déplace la troupe vers une position cible"""
         dx = target_x - self.x
@@ -315,7 +405,6 @@ class Troop(ABC):
     
     def update(self, dt: float, buildings: List, walls: List, current_time: float) -> None:
         """Met à jour la troupe"""
-        from ..core.config import PATHFINDING_CONFIG
         if not self.is_alive():
             return
         
@@ -335,25 +424,31 @@ class Troop(ABC):
             # 3. Sinon, se déplacer vers la cible
             #   a. Calculer/Récupérer le chemin vers la position d'attaque de la cible
             self.calculate_path(self.target, buildings, walls, current_time) # Pass all buildings and walls
+            if self.path_batch is not None and self.path_batch.is_pending(self):
+                return # Le simulateur résout les chemins du tick, puis appelle follow_path
+            self.follow_path(dt, current_time)
+
+    def follow_path(self, dt: float, current_time: float) -> None:
+        """Avance le long du chemin courant (ou se met en attente s'il n'y en a pas)"""
+        from ..core.config import PATHFINDING_CONFIG
+        # Suivre le chemin
+        if self.path and self.path_index < len(self.path):
+            target_x, target_y = self.path[self.path_index]
+            self.move_towards(target_x, target_y, dt)
+            # print(f"DEBUG: {self.type} moving to {target_x:.1f},{target_y:.1f} (waypoint {self.path_index}/{len(self.path)-1}) for {self.target.type}")
             
-            #   b. Suivre le chemin
-            if self.path and self.path_index < len(self.path):
-                target_x, target_y = self.path[self.path_index]
-                self.move_towards(target_x, target_y, dt)
-                # print(f"DEBUG: {self.type} moving to {target_x:.1f},{target_y:.1f} (waypoint {self.path_index}/{len(self.path)-1}) for {self.target.type}")
-                
-                # Vérifier si on a atteint le waypoint actuel
-                if self.distance_to(target_x, target_y) < 0.2: # Increased tolerance a bit
-                    self.path_index += 1
-                    # print(f"DEBUG: {self.type} reached waypoint, next index {self.path_index}")
-            else:
-                # Pas de chemin ou chemin terminé mais pas encore à portée (peut arriver si la cible est bloquée)
-                self.state = TroopState.IDLE # Ou MOVING si on attend un recalcul? Pour l'instant IDLE.
-                # print(f"DEBUG: {self.type} IDLE, no path or path ended, target: {self.target.type}, in_range: {self.is_in_range(self.target)}")
-                # Potentially force a retarget or path recalculation if stuck
-                if current_time - self.last_path_calculation_time > PATHFINDING_CONFIG["path_recalculation_interval"] * 0.5 : # check more frequently if stuck
-                    self.path = None # force recalculation next tick
-                    # print(f"DEBUG: {self.type} forcing path recalc as it seems stuck")
+            # Vérifier si on a atteint le waypoint actuel
+            if self.distance_to(target_x, target_y) < 0.2: # Increased tolerance a bit
+                self.path_index += 1
+                # print(f"DEBUG: {self.type} reached waypoint, next index {self.path_index}")
+        else:
+            # Pas de chemin ou chemin terminé mais pas encore à portée (peut arriver si la cible est bloquée)
+            self.state = TroopState.IDLE # Ou MOVING si on attend un recalcul? Pour l'instant IDLE.
+            # print(f"DEBUG: {self.type} IDLE, no path or path ended, target: {self.target.type}, in_range: {self.is_in_range(self.target)}")
+            # Potentially force a retarget or path recalculation if stuck
+            if current_time - self.last_path_calculation_time > PATHFINDING_CONFIG["path_recalculation_interval"] * 0.5 : # check more frequently if stuck
+                self.path = None # force recalculation next tick
+                # print(f"DEBUG: {self.type} forcing path recalc as it seems stuck")
 
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}(type={self.type}, level={self.level}, pos=({self.x:.1f},{self.y:.1f}), hp={self.hp}/{self.max_hp}, state={self.state.value})" 
\ No newline at end of file
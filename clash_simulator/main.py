@@ -5,13 +5,7 @@ import os
 from clash_simulator.entities.troop_types import create_troop, Troop
 from clash_simulator.systems.base_layout import BaseLayout
 from clash_simulator.systems.battle_simulator import BattleSimulator
-from clash_simulator.visualization.terminal_display import BattleVisualizer, TerminalDisplay
-# Imports pour les démos et tests
-from clash_simulator.demo_battle import demo_simple_attack as demo_battle_simple_attack
-from clash_simulator.demo_battle import demo_speed_comparison as demo_battle_speed_comparison
-from clash_simulator.demo_improved import demo_compact_view as demo_improved_compact_view
-from clash_simulator.demo_improved import demo_comparison as demo_improved_comparison
-from clash_simulator import test_components # Import the whole module to call its functions
+# La visualisation, les démos et les tests sont importés à la demande (démarrage rapide)
 
 # Imports pour les configurations
 from clash_simulator.data.base_configs import get_base_layout_from_config, BASE_CONFIGURATIONS
@@ -20,6 +14,8 @@ from typing import List
 
 def run_all_component_tests():
     """Exécute tous les tests de test_components.py"""
+    from clash_simulator import test_components # Import the whole module to call its functions
+
     print("\n=== EXÉCUTION DES TESTS DE COMPOSANTS ===\n")
     test_components.test_building_creation()
     test_components.test_troop_creation()
@@ -55,6 +51,8 @@ def select_config(config_type: str, configs: dict, prompt_message: str) -> str:
 
 def main_test_simple_battle(base_name: str = "Simple TH3 Par Défaut", army_name: str = "Armée Mixte TH3 (Main)"):
     """Test avec une bataille simple en utilisant des configurations."""
+    from clash_simulator.visualization.terminal_display import BattleVisualizer, TerminalDisplay
+
     print(f"=== TEST DE BATAILLE CONFIGURÉE (Base: {base_name}, Armée: {army_name}) ===\n")
     
     try:
@@ -147,15 +145,19 @@ def interactive_menu():
             load_and_simulate_base_from_file()
             
         elif choice == "D1":
+            from clash_simulator.demo_battle import demo_simple_attack as demo_battle_simple_attack
             print("\nLancement Démo: Attaque simple (Classique)...")
             demo_battle_simple_attack(base_name="Simple TH3 Par Défaut", army_name="Armée Démo Visuelle")
         elif choice == "D2":
+            from clash_simulator.demo_battle import demo_speed_comparison as demo_battle_speed_comparison
             print("\nLancement Démo: Comparaison des vitesses (Classique)...")
             demo_battle_speed_comparison(base_name="Simple TH3 Par Défaut", army_name="Petite Armée Test Vitesse")
         elif choice == "D3":
+            from clash_simulator.demo_improved import demo_compact_view as demo_improved_compact_view
             print("\nLancement Démo: Vue compacte (Amélioré)...")
             demo_improved_compact_view(base_name="Simple TH3 Par Défaut", army_name="Armée Démo Visuelle")
         elif choice == "D4":
+            from clash_simulator.demo_improved import demo_comparison as demo_improved_comparison
             print("\nLancement Démo: Comparaison des visualisations...")
             demo_improved_comparison(base_name="Simple TH3 Par Défaut", army_name="Petite Armée Test Vitesse")
             
@@ -169,6 +171,8 @@ def interactive_menu():
 
 def create_and_save_base():
     """Interface pour créer et sauvegarder une base"""
+    from clash_simulator.visualization.terminal_display import TerminalDisplay
+
     print("\n=== CRÉATION DE BASE ===")
     name = input("Nom de la base: ")
     base = BaseLayout(name)
@@ -208,6 +212,8 @@ def create_and_save_base():
 
 def load_and_simulate_base_from_file():
     """Charge une base depuis un fichier JSON et lance une simulation avec une armée choisie."""
+    from clash_simulator.visualization.terminal_display import BattleVisualizer, TerminalDisplay
+
     print("\n=== CHARGER UNE BASE DEPUIS UN FICHIER JSON ET SIMULER ===")
     
     base_file_path = ""
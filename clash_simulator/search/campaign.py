@@ -0,0 +1,230 @@
+"""
+Campagnes longues (lots de batailles ou optimisation CEM) avec points de reprise sur disque
+"""
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from ..systems.base_layout import BaseLayout
+from ..systems.battle_simulator import ArmyConfig, BattleRunner
+from ..utils.result_cache import battle_key
+from ..utils.result_sink import ResultSink
+from .deployment_optimizer import DeploymentOptimizer
+
+CHECKPOINT_VERSION = 1
+DEFAULT_CHECKPOINT_INTERVAL = 60.0 # Secondes entre deux points de reprise (hors fin d'itération)
+
+
+def _write_json_atomic(path: str, data: Dict) -> None:
+    """Écrit un fichier JSON de façon atomique: l'ancien reste intact si l'écriture est interrompue"""
+    directory = os.path.dirname(path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+    temporary = path + ".tmp"
+    with open(temporary, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, path)
+
+
+def _army_from_json(army) -> List[Tuple[str, int, Tuple[float, float]]]:
+    return [(troop_type, level, tuple(position)) for troop_type, level, position in army]
+
+
+class _ChunkSink(ResultSink):
+    """Reçoit les résultats d'un paquet au fil de l'eau (même si le paquet est interrompu)"""
+
+    def __init__(self, campaign: 'CampaignManager', indices: List[int]):
+        super().__init__(flush_every=1)
+        self.campaign = campaign
+        self.indices = indices
+
+    def _write_batch(self, records: List[Dict]) -> None:
+        for record in records:
+            index = self.indices[record['task']]
+            self.campaign.results[index] = record['stats']
+            if self.campaign.sink is not None:
+                self.campaign.sink.write(dict(record, task=index, iteration=self.campaign.iteration_label()))
+
+
+class CampaignManager:
+    """Exécute une campagne par paquets de batailles et la rend reprenable.
+
+    Deux modes: une liste fixe de tâches (armée, graine) contre une base, ou un
+    DeploymentOptimizer dont chaque itération devient une file de tâches. Le point
+    de reprise (JSON, écriture atomique) contient la file de tâches et les résultats
+    déjà obtenus, l'état de l'optimiseur (lois et état du générateur aléatoire) et la
+    population en cours d'évaluation. Il est écrit toutes les `checkpoint_interval`
+    secondes, à chaque fin d'itération, à la fin et sur Ctrl-C.
+
+    Pour reprendre, on reconstruit la campagne avec les mêmes paramètres et le même
+    chemin: run() repart des tâches restantes et l'optimiseur retrouve exactement
+    le même générateur, donc la même suite de tirages qu'une exécution sans arrêt.
+    """
+
+    def __init__(self, checkpoint_path: str, base_layout: Optional[BaseLayout] = None,
+                 tasks: Optional[Sequence[Tuple[ArmyConfig, Optional[int]]]] = None,
+                 optimizer: Optional[DeploymentOptimizer] = None, chunk_size: int = 16,
+                 checkpoint_interval: float = DEFAULT_CHECKPOINT_INTERVAL, workers: Optional[int] = None,
+                 sink: Optional[ResultSink] = None, **simulator_kwargs):
+        if (optimizer is None) == (tasks is None):
+            raise ValueError("Une campagne prend soit une liste de tâches, soit un optimiseur")
+        if tasks is not None and base_layout is None:
+            raise ValueError("Une campagne de tâches nécessite une base")
+        if chunk_size < 1:
+            raise ValueError(f"Taille de paquet invalide : {chunk_size}")
+        self.checkpoint_path = checkpoint_path
+        self.optimizer = optimizer
+        self.base_layout = base_layout if optimizer is None else optimizer.base_layout
+        self.simulator_kwargs = simulator_kwargs if optimizer is None else optimizer.simulator_kwargs
+        self.workers = workers if workers is not None else (optimizer.workers if optimizer is not None else 1)
+        self.chunk_size = chunk_size
+        self.checkpoint_interval = checkpoint_interval
+        self.sink = sink
+
+        self.tasks: List[Tuple[ArmyConfig, Optional[int]]] = list(tasks) if tasks is not None else []
+        self.results: List[Optional[dict]] = [None] * len(self.tasks)
+        # Itération de l'optimiseur en cours d'évaluation: population et graines tirées par ask()
+        self.pending: Optional[Dict] = None
+        self.resumed = False
+        self.checkpoints_written = 0
+
+        base_data = self.base_layout.save_to_dict()
+        kwargs = {k: v for k, v in self.simulator_kwargs.items() if k != "antithetic"}
+        identity = self.tasks
+        if optimizer is not None:
+            # Un optimiseur configuré autrement ne doit pas reprendre ce point de reprise
+            identity = [list(group) for group in optimizer.groups]
+            kwargs["optimizer"] = optimizer.settings()
+        self.campaign_key = battle_key(base_data, identity, None, self.simulator_kwargs.get("antithetic", False), **kwargs)
+
+    def iteration_label(self) -> Optional[int]:
+        return self.optimizer.iteration + 1 if self.optimizer is not None else None
+
+    # --- Points de reprise ---
+
+    def checkpoint_state(self) -> Dict:
+        return {
+            'version': CHECKPOINT_VERSION,
+            'campaign': self.campaign_key,
+            'saved_at': time.time(),
+            'tasks': [[army, seed] for army, seed in self.tasks],
+            'results': self.results,
+            'optimizer': self.optimizer.get_state() if self.optimizer is not None else None,
+            'pending': self.pending,
+        }
+
+    def save_checkpoint(self) -> None:
+        _write_json_atomic(self.checkpoint_path, self.checkpoint_state())
+        self.checkpoints_written += 1
+
+    def load_checkpoint(self) -> bool:
+        """Restaure le point de reprise s'il existe; False sinon"""
+        if not os.path.exists(self.checkpoint_path):
+            return False
+        with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        if state.get('version') != CHECKPOINT_VERSION or state.get('campaign') != self.campaign_key:
+            raise ValueError(f"Le point de reprise {self.checkpoint_path} appartient à une autre campagne")
+        self.tasks = [(_army_from_json(army), seed) for army, seed in state['tasks']]
+        self.results = state['results']
+        self.pending = state['pending']
+        if self.optimizer is not None:
+            self.optimizer.set_state(state['optimizer'])
+        self.resumed = True
+        return True
+
+    # --- Exécution ---
+
+    def _next_iteration(self) -> bool:
+        """Termine l'itération évaluée et tire la suivante; False quand l'optimisation est finie"""
+        optimizer = self.optimizer
+        if optimizer is None:
+            return False
+        if self.pending is not None:
+            armies = [_army_from_json(army) for army in self.pending['armies']]
+            population = [{'counts': candidate['counts'],
+                           'positions': {slot: tuple(position) for slot, position in candidate['positions']}}
+                          for candidate in self.pending['population']]
+            optimizer.evaluations += len(self.tasks)
+            scores = optimizer.score_results(self.results, len(self.pending['seeds']))
+            optimizer.tell(population, armies, scores)
+            self.pending = None
+            self.tasks, self.results = [], []
+        if optimizer.iteration >= optimizer.iterations:
+            return False
+
+        population, armies, seeds = optimizer.ask()
+        self.pending = {
+            'population': [{'counts': candidate['counts'],
+                            'positions': [[slot, list(position)] for slot, position in candidate['positions'].items()]}
+                           for candidate in population],
+            'armies': armies,
+            'seeds': seeds,
+        }
+        self.tasks = [(army, seed) for army in armies for seed in seeds]
+        self.results = [None] * len(self.tasks)
+        self.save_checkpoint()
+        return True
+
+    def _run_chunk(self, indices: List[int], executor) -> None:
+        sink = _ChunkSink(self, indices)
+        BattleRunner.run_batch(self.base_layout, [self.tasks[i] for i in indices], workers=self.workers,
+                               executor=executor, sink=sink, **self.simulator_kwargs)
+
+    def run(self, time_budget: Optional[float] = None, resume: bool = True) -> Dict:
+        """Exécute (ou reprend) la campagne jusqu'à la fin ou l'épuisement du budget de temps"""
+        if resume:
+            self.load_checkpoint()
+        start = time.time()
+        last_checkpoint = start
+        executor = ProcessPoolExecutor(max_workers=self.workers) if self.workers > 1 else None
+        try:
+            while True:
+                remaining = [i for i, result in enumerate(self.results) if result is None]
+                if not remaining:
+                    if not self._next_iteration():
+                        break
+                    last_checkpoint = time.time()
+                    continue
+                if time_budget is not None and time.time() - start >= time_budget:
+                    break
+                self._run_chunk(remaining[:self.chunk_size], executor)
+                if time.time() - last_checkpoint >= self.checkpoint_interval:
+                    self.save_checkpoint()
+                    last_checkpoint = time.time()
+        except KeyboardInterrupt:
+            # Les résultats déjà reçus du paquet interrompu sont conservés
+            self.save_checkpoint()
+            raise
+        finally:
+            if executor is not None:
+                executor.shutdown()
+            if self.sink is not None:
+                self.sink.flush()
+        self.save_checkpoint()
+        return self.summary()
+
+    def is_finished(self) -> bool:
+        if any(result is None for result in self.results):
+            return False
+        return self.optimizer is None or (self.pending is None and self.optimizer.iteration >= self.optimizer.iterations)
+
+    def summary(self) -> Dict:
+        completed = sum(1 for result in self.results if result is not None)
+        summary = {'finished': self.is_finished(), 'resumed': self.resumed,
+                   'completed': completed, 'total': len(self.tasks)}
+        if self.optimizer is None:
+            summary['results'] = self.results
+        else:
+            summary.update({
+                'best_army': self.optimizer.best_army,
+                'best_score': self.optimizer.best_score,
+                'iterations': self.optimizer.iteration,
+                'evaluations': self.optimizer.evaluations,
+                'history': self.optimizer.history,
+            })
+        return summary
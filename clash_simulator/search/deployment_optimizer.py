@@ -0,0 +1,352 @@
+"""
+Optimisation des positions de déploiement par la méthode de l'entropie croisée (CEM)
+"""
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ..core.config import GRID_SIZE, MAX_BATTLE_DURATION, TH3_HOUSING_CAPACITY, TROOP_STATS
+from ..systems.base_layout import BaseLayout
+from ..systems.battle_simulator import ArmyConfig, BattleRunner
+
+# Composition d'armée: [(type_troupe, niveau, nombre)]
+ArmyComposition = List[Tuple[str, int, int]]
+
+
+def default_fitness(stats: dict) -> float:
+    """Score d'une bataille: étoiles d'abord, puis destruction, puis rapidité (départage)"""
+    return stats['stars'] * 100 + stats['destruction_percentage'] - stats['duration'] / MAX_BATTLE_DURATION
+
+
+def composition_from_config(army_config: ArmyConfig) -> ArmyComposition:
+    """Extrait la composition (type, niveau, nombre) d'une configuration d'armée"""
+    counts: Dict[Tuple[str, int], int] = {}
+    for troop_type, level, _ in army_config:
+        counts[(troop_type, level)] = counts.get((troop_type, level), 0) + 1
+    return [(troop_type, level, count) for (troop_type, level), count in counts.items()]
+
+
+def housing_of(troop_type: str, level: int) -> int:
+    """Places occupées par une troupe dans les camps"""
+    return TROOP_STATS[troop_type][level]["housing"]
+
+
+class DeploymentOptimizer:
+    """Recherche des positions de déploiement (et optionnellement des effectifs) par CEM.
+
+    Chaque "emplacement" de troupe suit une loi normale indépendante en x et en y.
+    À chaque itération, une population d'armées est tirée, évaluée par BattleRunner
+    (en parallèle si workers > 1, avec les mêmes graines pour tous les candidats),
+    puis les lois sont recentrées sur les meilleurs candidats (l'élite).
+
+    Avec optimize_counts=True, le nombre de troupes de chaque type suit aussi une
+    loi normale, arrondie et ramenée dans la capacité des camps.
+
+    Avec screen_factor > 1, screen_factor fois plus de candidats sont tirés et seuls
+    les moins exposés aux défenses (BaseModel.spawn_exposure, sans simulation) sont
+    évalués.
+    """
+
+    def __init__(self, base_layout: BaseLayout, composition: ArmyComposition,
+                 initial_army: Optional[ArmyConfig] = None,
+                 population_size: int = 24, elite_fraction: float = 0.25,
+                 iterations: int = 10, seeds_per_candidate: int = 1,
+                 optimize_counts: bool = False, housing_capacity: int = TH3_HOUSING_CAPACITY,
+                 max_slots_per_type: int = 20, smoothing: float = 0.7, min_std: float = 0.5,
+                 fitness: Callable[[dict], float] = default_fitness,
+                 workers: int = 1, time_budget: Optional[float] = None, screen_factor: int = 1,
+                 seed: Optional[int] = None, verbose: bool = False, **simulator_kwargs):
+        self.base_layout = base_layout
+        self.population_size = population_size
+        self.n_elite = max(1, int(round(population_size * elite_fraction)))
+        self.iterations = iterations
+        self.seeds_per_candidate = seeds_per_candidate
+        self.optimize_counts = optimize_counts
+        self.housing_capacity = housing_capacity
+        self.smoothing = smoothing
+        self.min_std = min_std
+        self.fitness = fitness
+        self.workers = workers
+        self.time_budget = time_budget
+        self.screen_factor = screen_factor
+        self._model = base_layout.compile() if screen_factor > 1 else None
+        self.verbose = verbose
+        self.simulator_kwargs = simulator_kwargs
+        self.rng = random.Random(seed)
+
+        self.deployable_tiles = base_layout.get_deployable_tiles()
+        if not self.deployable_tiles:
+            raise ValueError(f"Aucune tuile de déploiement disponible sur la base '{base_layout.name}'.")
+        self._deployable_set = set(self.deployable_tiles)
+
+        # Groupes (type, niveau) et emplacements associés
+        self.groups: List[Tuple[str, int]] = [(troop_type, level) for troop_type, level, _ in composition]
+        initial_counts = [count for _, _, count in composition]
+        self.group_slots: List[List[int]] = []
+        self.slot_group: List[int] = []
+        for group_index, (troop_type, level) in enumerate(self.groups):
+            if optimize_counts:
+                n_slots = min(max_slots_per_type, housing_capacity // housing_of(troop_type, level))
+                n_slots = max(n_slots, initial_counts[group_index])
+            else:
+                n_slots = initial_counts[group_index]
+            first = len(self.slot_group)
+            self.group_slots.append(list(range(first, first + n_slots)))
+            self.slot_group.extend([group_index] * n_slots)
+
+        # Lois des positions, initialisées sur l'armée de départ si fournie
+        initial_positions = self._initial_slot_positions(initial_army)
+        self.mean_x = [float(x) for x, _ in initial_positions]
+        self.mean_y = [float(y) for _, y in initial_positions]
+        spread = GRID_SIZE / 8 if initial_army else GRID_SIZE / 4
+        self.std_x = [spread] * len(self.slot_group)
+        self.std_y = [spread] * len(self.slot_group)
+
+        # Lois des effectifs
+        self.count_mean = [float(count) for count in initial_counts]
+        self.count_std = [max(1.0, count / 2) for count in initial_counts]
+
+        self.iteration = 0
+        self.evaluations = 0
+        self.best_army: Optional[List[Tuple[str, int, Tuple[int, int]]]] = None
+        self.best_score = -math.inf
+        self.history: List[Dict] = []
+
+    def _initial_slot_positions(self, initial_army: Optional[ArmyConfig]) -> List[Tuple[float, float]]:
+        """Positions de départ de chaque emplacement (armée initiale ou tuiles au hasard)"""
+        positions: List[Optional[Tuple[float, float]]] = [None] * len(self.slot_group)
+        if initial_army:
+            next_slot = [0] * len(self.groups)
+            for troop_type, level, position in initial_army:
+                if (troop_type, level) not in self.groups:
+                    continue
+                group_index = self.groups.index((troop_type, level))
+                slots = self.group_slots[group_index]
+                if next_slot[group_index] < len(slots):
+                    positions[slots[next_slot[group_index]]] = position
+                    next_slot[group_index] += 1
+        return [pos if pos is not None else self.rng.choice(self.deployable_tiles) for pos in positions]
+
+    def snap_to_deployable(self, x: float, y: float) -> Tuple[int, int]:
+        """Ramène une position continue sur la tuile de déploiement valide la plus proche"""
+        tx = max(0, min(GRID_SIZE - 1, int(round(x))))
+        ty = max(0, min(GRID_SIZE - 1, int(round(y))))
+        if (tx, ty) in self._deployable_set:
+            return (tx, ty)
+        # Recherche par anneaux carrés croissants
+        for radius in range(1, GRID_SIZE):
+            best = None
+            best_dist_sq = math.inf
+            for dy in range(-radius, radius + 1):
+                for dx in range(-radius, radius + 1):
+                    if max(abs(dx), abs(dy)) != radius:
+                        continue
+                    candidate = (tx + dx, ty + dy)
+                    if candidate in self._deployable_set:
+                        dist_sq = (candidate[0] - x) ** 2 + (candidate[1] - y) ** 2
+                        if dist_sq < best_dist_sq:
+                            best, best_dist_sq = candidate, dist_sq
+            if best is not None:
+                return best
+        return self.deployable_tiles[0]
+
+    def _sample_counts(self) -> List[int]:
+        """Tire des effectifs par type qui respectent la capacité des camps"""
+        if not self.optimize_counts:
+            return [len(slots) for slots in self.group_slots]
+
+        counts = []
+        for group_index, slots in enumerate(self.group_slots):
+            count = int(round(self.rng.gauss(self.count_mean[group_index], self.count_std[group_index])))
+            counts.append(max(0, min(len(slots), count)))
+
+        housing = sum(count * housing_of(*self.groups[i]) for i, count in enumerate(counts))
+        while housing > self.housing_capacity:
+            group_index = self.rng.choice([i for i, count in enumerate(counts) if count > 0])
+            counts[group_index] -= 1
+            housing -= housing_of(*self.groups[group_index])
+        return counts
+
+    def sample_candidate(self) -> Dict:
+        """Tire un candidat: effectifs et position de chaque emplacement utilisé"""
+        counts = self._sample_counts()
+        positions: Dict[int, Tuple[int, int]] = {}
+        for group_index, slots in enumerate(self.group_slots):
+            for slot in slots[:counts[group_index]]:
+                x = self.rng.gauss(self.mean_x[slot], self.std_x[slot])
+                y = self.rng.gauss(self.mean_y[slot], self.std_y[slot])
+                positions[slot] = self.snap_to_deployable(x, y)
+        return {'counts': counts, 'positions': positions}
+
+    def candidate_to_army(self, candidate: Dict) -> List[Tuple[str, int, Tuple[int, int]]]:
+        """Convertit un candidat au format des configurations d'armée"""
+        army = []
+        for slot in sorted(candidate['positions']):
+            troop_type, level = self.groups[self.slot_group[slot]]
+            army.append((troop_type, level, candidate['positions'][slot]))
+        return army
+
+    def evaluate(self, armies: List[ArmyConfig], seeds: List[int], executor=None) -> List[float]:
+        """Évalue un lot d'armées sur les mêmes graines (nombres aléatoires communs)"""
+        tasks = [(army, seed) for army in armies for seed in seeds]
+        results = BattleRunner.run_batch(self.base_layout, tasks, workers=self.workers,
+                                         executor=executor, **self.simulator_kwargs)
+        self.evaluations += len(tasks)
+        return self.score_results(results, len(seeds))
+
+    def score_results(self, results: List[dict], n_seeds: int) -> List[float]:
+        """Score moyen de chaque armée (résultats dans l'ordre armée × graine de evaluate)"""
+        return [
+            sum(self.fitness(stats) for stats in results[i * n_seeds:(i + 1) * n_seeds]) / n_seeds
+            for i in range(len(results) // n_seeds)
+        ]
+
+    def _update_distributions(self, elite: List[Dict]) -> None:
+        """Recentre les lois sur l'élite (avec lissage)"""
+        alpha = self.smoothing
+        for slot in range(len(self.slot_group)):
+            points = [candidate['positions'][slot] for candidate in elite if slot in candidate['positions']]
+            if not points:
+                continue
+            xs = [p[0] for p in points]
+            ys = [p[1] for p in points]
+            mean_x = sum(xs) / len(xs)
+            mean_y = sum(ys) / len(ys)
+            std_x = math.sqrt(sum((x - mean_x) ** 2 for x in xs) / len(xs))
+            std_y = math.sqrt(sum((y - mean_y) ** 2 for y in ys) / len(ys))
+            self.mean_x[slot] = alpha * mean_x + (1 - alpha) * self.mean_x[slot]
+            self.mean_y[slot] = alpha * mean_y + (1 - alpha) * self.mean_y[slot]
+            self.std_x[slot] = max(self.min_std, alpha * std_x + (1 - alpha) * self.std_x[slot])
+            self.std_y[slot] = max(self.min_std, alpha * std_y + (1 - alpha) * self.std_y[slot])
+
+        if self.optimize_counts:
+            for group_index in range(len(self.groups)):
+                counts = [candidate['counts'][group_index] for candidate in elite]
+                mean_count = sum(counts) / len(counts)
+                std_count = math.sqrt(sum((c - mean_count) ** 2 for c in counts) / len(counts))
+                self.count_mean[group_index] = alpha * mean_count + (1 - alpha) * self.count_mean[group_index]
+                self.count_std[group_index] = max(self.min_std, alpha * std_count + (1 - alpha) * self.count_std[group_index])
+
+    def exposure(self, army: ArmyConfig) -> float:
+        """Exposition moyenne des troupes entre leur point de déploiement et le bâtiment le plus proche"""
+        return sum(self._model.spawn_exposure(troop_type, level, position)
+                   for troop_type, level, position in army) / max(1, len(army))
+
+    def ask(self) -> Tuple[List[Dict], List[ArmyConfig], List[int]]:
+        """Tire la population de l'itération suivante et les graines communes d'évaluation"""
+        population = [self.sample_candidate() for _ in range(self.population_size * self.screen_factor)]
+        if self.screen_factor > 1:
+            exposures = [self.exposure(self.candidate_to_army(candidate)) for candidate in population]
+            kept = sorted(range(len(population)), key=lambda i: exposures[i])[:self.population_size]
+            population = [population[i] for i in sorted(kept)]
+        armies = [self.candidate_to_army(candidate) for candidate in population]
+        seeds = [self.rng.getrandbits(32) for _ in range(self.seeds_per_candidate)]
+        return population, armies, seeds
+
+    def step(self, executor=None) -> Dict:
+        """Exécute une itération CEM et retourne son résumé"""
+        population, armies, seeds = self.ask()
+        scores = self.evaluate(armies, seeds, executor)
+        return self.tell(population, armies, scores)
+
+    def tell(self, population: List[Dict], armies: List[ArmyConfig], scores: List[float]) -> Dict:
+        """Met à jour les lois à partir des scores d'une population tirée par ask()"""
+        ranking = sorted(range(len(population)), key=lambda i: scores[i], reverse=True)
+        elite = [population[i] for i in ranking[:self.n_elite]]
+        self._update_distributions(elite)
+
+        if scores[ranking[0]] > self.best_score:
+            self.best_score = scores[ranking[0]]
+            self.best_army = armies[ranking[0]]
+
+        self.iteration += 1
+        summary = {
+            'iteration': self.iteration,
+            'best_score': scores[ranking[0]],
+            'mean_score': sum(scores) / len(scores),
+            'elite_mean_score': sum(scores[i] for i in ranking[:self.n_elite]) / self.n_elite,
+            'evaluations': self.evaluations,
+        }
+        self.history.append(summary)
+        if self.verbose:
+            print(f"Itération {self.iteration}: meilleur={summary['best_score']:.1f}, "
+                  f"moyenne élite={summary['elite_mean_score']:.1f}, batailles={self.evaluations}")
+        return summary
+
+    def settings(self) -> Dict:
+        """Hyperparamètres qui déterminent le déroulement de l'optimisation (identité d'une campagne)"""
+        return {
+            'groups': [list(group) for group in self.groups],
+            'slots': [len(slots) for slots in self.group_slots],
+            'population_size': self.population_size,
+            'n_elite': self.n_elite,
+            'iterations': self.iterations,
+            'seeds_per_candidate': self.seeds_per_candidate,
+            'optimize_counts': self.optimize_counts,
+            'housing_capacity': self.housing_capacity,
+            'smoothing': self.smoothing,
+            'min_std': self.min_std,
+            'screen_factor': self.screen_factor,
+            'fitness': getattr(self.fitness, '__qualname__', type(self.fitness).__name__),
+        }
+
+    def get_state(self) -> Dict:
+        """État complet sérialisable en JSON (lois, générateur, meilleur candidat), voir campaign.py"""
+        version, internal, gauss_next = self.rng.getstate()
+        return {
+            'rng': [version, list(internal), gauss_next],
+            'mean_x': self.mean_x, 'mean_y': self.mean_y, 'std_x': self.std_x, 'std_y': self.std_y,
+            'count_mean': self.count_mean, 'count_std': self.count_std,
+            'iteration': self.iteration,
+            'evaluations': self.evaluations,
+            'best_army': self.best_army,
+            'best_score': self.best_score if self.best_score > -math.inf else None,
+            'history': self.history,
+        }
+
+    def set_state(self, state: Dict) -> None:
+        """Restaure un état produit par get_state (même configuration d'optimiseur)"""
+        if len(state['mean_x']) != len(self.slot_group) or len(state['count_mean']) != len(self.groups):
+            raise ValueError("L'état ne correspond pas à la composition de cet optimiseur")
+        version, internal, gauss_next = state['rng']
+        self.rng.setstate((version, tuple(internal), gauss_next))
+        self.mean_x, self.mean_y = list(state['mean_x']), list(state['mean_y'])
+        self.std_x, self.std_y = list(state['std_x']), list(state['std_y'])
+        self.count_mean, self.count_std = list(state['count_mean']), list(state['count_std'])
+        self.iteration = state['iteration']
+        self.evaluations = state['evaluations']
+        self.best_army = ([(troop_type, level, tuple(position)) for troop_type, level, position in state['best_army']]
+                          if state['best_army'] is not None else None)
+        self.best_score = state['best_score'] if state['best_score'] is not None else -math.inf
+        self.history = list(state['history'])
+
+    def run(self) -> Dict:
+        """Exécute les itérations dans la limite du budget (itérations et/ou temps)"""
+        start = time.time()
+        executor = ProcessPoolExecutor(max_workers=self.workers) if self.workers > 1 else None
+        try:
+            while self.iteration < self.iterations:
+                if self.time_budget is not None and time.time() - start >= self.time_budget:
+                    break
+                self.step(executor)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        return {
+            'best_army': self.best_army,
+            'best_score': self.best_score,
+            'iterations': self.iteration,
+            'evaluations': self.evaluations,
+            'elapsed': time.time() - start,
+            'history': self.history,
+        }
+
+
+def optimize_deployment(base_layout: BaseLayout, army_config: ArmyConfig, **optimizer_kwargs) -> Dict:
+    """Optimise les positions d'une configuration d'armée existante (même composition au départ)"""
+    optimizer = DeploymentOptimizer(base_layout, composition_from_config(army_config),
+                                    initial_army=army_config, **optimizer_kwargs)
+    return optimizer.run()
@@ -0,0 +1,212 @@
+"""
+Recherche arborescente Monte-Carlo (MCTS) sur des séquences de déploiement temporisées
+"""
+import math
+import random
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from ..core.config import GRID_SIZE, MAX_BATTLE_DURATION
+from ..systems.base_layout import BaseLayout
+from ..systems.battle_simulator import BattleSimulator, DeploymentAction
+from .deployment_optimizer import ArmyComposition, default_fitness
+
+# Action de l'arbre: (indice du groupe, indice du point de déploiement, délai en secondes)
+TreeAction = Tuple[int, int, float]
+
+# Décalages autour du point de déploiement pour étaler un groupe de troupes
+GROUP_SPREAD_OFFSETS = [(0, 0), (1, 0), (0, 1), (1, 1), (-1, 0), (0, -1), (-1, -1), (1, -1), (-1, 1),
+                        (2, 0), (0, 2), (-2, 0), (0, -2), (2, 1), (1, 2), (-2, -1), (-1, -2)]
+
+# Score maximal de default_fitness (3 étoiles, 100%), pour ramener les valeurs dans [0, 1]
+MAX_FITNESS = 400.0
+
+
+def default_spawn_points(base_layout: BaseLayout, count: int = 8) -> List[Tuple[int, int]]:
+    """Points de déploiement répartis autour de la base.
+
+    Pour chaque direction (rayons depuis le centre des bâtiments), on part du bord de
+    la carte et on avance vers le centre jusqu'à la dernière tuile déployable avant
+    la base: c'est le point le plus proche des défenses dans cette direction.
+    """
+    deployable = set(base_layout.get_deployable_tiles())
+    buildings = base_layout.get_all_buildings()
+    if buildings:
+        center_x = sum(b.get_center()[0] for b in buildings) / len(buildings)
+        center_y = sum(b.get_center()[1] for b in buildings) / len(buildings)
+    else:
+        center_x = center_y = GRID_SIZE / 2
+
+    points = []
+    for i in range(count):
+        angle = 2 * math.pi * i / count
+        dx, dy = math.cos(angle), math.sin(angle)
+        best = None
+        for step in range(GRID_SIZE * 2):
+            radius = GRID_SIZE - step * 0.5
+            if radius < 0:
+                break
+            tile = (int(center_x + dx * radius), int(center_y + dy * radius))
+            if not (0 <= tile[0] < GRID_SIZE and 0 <= tile[1] < GRID_SIZE):
+                continue
+            if tile in deployable:
+                best = tile
+            elif best is not None:
+                break
+        if best is not None and best not in points:
+            points.append(best)
+    return points
+
+
+class MCTSNode:
+    """Nœud de l'arbre: instantané de la bataille après un préfixe d'actions"""
+
+    def __init__(self, simulator: BattleSimulator, remaining_groups: Tuple[int, ...], decision_time: float,
+                 actions: List[DeploymentAction], parent: Optional['MCTSNode'] = None):
+        self.simulator = simulator # Instantané: n'est jamais simulé directement, seulement forké
+        self.remaining_groups = remaining_groups
+        self.decision_time = decision_time
+        self.actions = actions # Préfixe complet (troupe par troupe) menant à ce nœud
+        self.parent = parent
+        self.children: Dict[TreeAction, 'MCTSNode'] = {}
+        self.untried_actions: Optional[List[TreeAction]] = None
+        self.visits = 0
+        self.total_value = 0.0
+
+    def is_terminal(self) -> bool:
+        return not self.remaining_groups or self.simulator.is_finished()
+
+    def uct_child(self, exploration: float) -> 'MCTSNode':
+        """Enfant maximisant le critère UCT"""
+        log_visits = math.log(self.visits)
+        return max(self.children.values(),
+                   key=lambda c: c.total_value / c.visits + exploration * math.sqrt(log_visits / c.visits))
+
+
+class DeploymentMCTS:
+    """MCTS sur l'ordre, la position et le moment du déploiement des groupes de troupes.
+
+    Une décision déploie tous les exemplaires d'un (type, niveau) de la composition
+    sur un des points candidats, après un des délais candidats. Chaque nœud garde un
+    instantané du simulateur (BattleSimulator.fork): étendre un nœud ne rejoue que
+    l'intervalle depuis son parent, et les préfixes communs ne sont simulés qu'une fois.
+    Les rollouts terminent la bataille avec des décisions aléatoires, en fidélité
+    "coarse" par défaut.
+    """
+
+    def __init__(self, base_layout: BaseLayout, composition: ArmyComposition,
+                 spawn_points: Optional[Sequence[Tuple[int, int]]] = None,
+                 delays: Sequence[float] = (0.0, 3.0, 8.0),
+                 exploration: float = 1.0 / math.sqrt(2), fidelity: str = "coarse",
+                 battle_duration: float = MAX_BATTLE_DURATION, seed: Optional[int] = None,
+                 fitness=default_fitness):
+        self.base_layout = base_layout
+        self.groups = [(troop_type, level) for troop_type, level, _ in composition]
+        self.group_counts = [count for _, _, count in composition]
+        self.spawn_points = list(spawn_points) if spawn_points else default_spawn_points(base_layout)
+        if not self.spawn_points:
+            raise ValueError(f"Aucun point de déploiement disponible sur la base '{base_layout.name}'.")
+        self.delays = list(delays)
+        self.exploration = exploration
+        self.fitness = fitness
+        self.rng = random.Random(seed)
+        self._deployable = set(base_layout.get_deployable_tiles())
+
+        base_copy = BaseLayout(base_layout.name)
+        base_copy.load_from_dict(base_layout.save_to_dict())
+        root_simulator = BattleSimulator(base_copy, [], battle_duration=battle_duration, log_to_file=False,
+                                         seed=seed, fidelity=fidelity)
+        root_simulator.reserve_count = sum(self.group_counts)
+        root_simulator.start()
+        self.root = MCTSNode(root_simulator, tuple(range(len(self.groups))), 0.0, [])
+
+        self.best_actions: List[DeploymentAction] = []
+        self.best_score = -math.inf
+        self.iterations = 0
+
+    def group_actions(self, group_index: int, spawn_index: int, deploy_time: float) -> List[DeploymentAction]:
+        """Actions unitaires (une par troupe) pour déployer un groupe autour d'un point"""
+        troop_type, level = self.groups[group_index]
+        origin_x, origin_y = self.spawn_points[spawn_index]
+        actions = []
+        offsets = [o for o in GROUP_SPREAD_OFFSETS if (origin_x + o[0], origin_y + o[1]) in self._deployable] or [(0, 0)]
+        for i in range(self.group_counts[group_index]):
+            dx, dy = offsets[i % len(offsets)]
+            actions.append((troop_type, level, (origin_x + dx, origin_y + dy), deploy_time))
+        return actions
+
+    def legal_actions(self, node: MCTSNode) -> List[TreeAction]:
+        return [(group, spawn, delay) for group in node.remaining_groups
+                for spawn in range(len(self.spawn_points)) for delay in self.delays]
+
+    def _apply(self, simulator: BattleSimulator, node_time: float, remaining: Tuple[int, ...],
+               action: TreeAction) -> Tuple[float, Tuple[int, ...], List[DeploymentAction]]:
+        """Programme une action sur un simulateur (déjà forké) et retourne le nouvel état logique"""
+        group_index, spawn_index, delay = action
+        deploy_time = node_time + delay
+        unit_actions = self.group_actions(group_index, spawn_index, deploy_time)
+        for troop_type, level, position, at_time in unit_actions:
+            simulator.schedule_deployment(troop_type, level, position, at_time)
+        simulator.reserve_count -= self.group_counts[group_index]
+        new_remaining = tuple(g for g in remaining if g != group_index)
+        return deploy_time, new_remaining, unit_actions
+
+    def _expand(self, node: MCTSNode, action: TreeAction) -> MCTSNode:
+        simulator = node.simulator.fork()
+        deploy_time, remaining, unit_actions = self._apply(simulator, node.decision_time, node.remaining_groups, action)
+        # Avancer jusqu'au déploiement: la prochaine décision ne peut pas être antérieure
+        simulator.advance_until(deploy_time)
+        child = MCTSNode(simulator, remaining, deploy_time, node.actions + unit_actions, parent=node)
+        node.children[action] = child
+        return child
+
+    def _rollout(self, node: MCTSNode) -> Tuple[float, List[DeploymentAction]]:
+        """Termine la bataille avec des décisions aléatoires; retourne (valeur dans [0, 1], actions)"""
+        simulator = node.simulator.fork()
+        node_time = node.decision_time
+        remaining = node.remaining_groups
+        actions = list(node.actions)
+        while remaining:
+            action = (self.rng.choice(remaining), self.rng.randrange(len(self.spawn_points)), self.rng.choice(self.delays))
+            node_time, remaining, unit_actions = self._apply(simulator, node_time, remaining, action)
+            actions.extend(unit_actions)
+        while not simulator.is_finished():
+            simulator.simulate_tick()
+        score = self.fitness(simulator.get_statistics())
+        if score > self.best_score:
+            self.best_score = score
+            self.best_actions = actions
+        return max(0.0, min(1.0, score / MAX_FITNESS)), actions
+
+    def iterate(self) -> None:
+        """Une itération: sélection, expansion, rollout, rétropropagation"""
+        node = self.root
+        while not node.is_terminal():
+            if node.untried_actions is None:
+                node.untried_actions = self.legal_actions(node)
+                self.rng.shuffle(node.untried_actions)
+            if node.untried_actions:
+                node = self._expand(node, node.untried_actions.pop())
+                break
+            node = node.uct_child(self.exploration)
+
+        value, _ = self._rollout(node)
+        while node is not None:
+            node.visits += 1
+            node.total_value += value
+            node = node.parent
+        self.iterations += 1
+
+    def search(self, time_budget: float = 10.0, max_iterations: Optional[int] = None) -> Dict:
+        """Lance la recherche pendant time_budget secondes; retourne la meilleure séquence trouvée"""
+        start = time.time()
+        while time.time() - start < time_budget:
+            if max_iterations is not None and self.iterations >= max_iterations:
+                break
+            self.iterate()
+        return {
+            'best_actions': self.best_actions,
+            'best_score': self.best_score,
+            'iterations': self.iterations,
+            'elapsed': time.time() - start,
+        }
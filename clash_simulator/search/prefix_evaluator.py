@@ -0,0 +1,127 @@
+"""
+Évaluation groupée de variantes d'attaque partageant un début de déploiement
+"""
+from typing import Dict, List, Optional, Sequence
+
+from ..systems.base_layout import BaseLayout
+from ..systems.battle_simulator import BattleRunner, BattleSimulator, DeploymentAction
+
+
+class PrefixNode:
+    """Nœud du trie: les candidats passant par ce nœud partagent les mêmes actions jusqu'ici"""
+
+    def __init__(self, action: Optional[DeploymentAction] = None):
+        self.action = action # Action menant à ce nœud (None pour la racine)
+        self.children: Dict[DeploymentAction, 'PrefixNode'] = {}
+        self.candidates: List[int] = [] # Indices des candidats dont la séquence s'arrête ici
+
+    def subtree_candidates(self) -> List[int]:
+        indices = list(self.candidates)
+        for child in self.children.values():
+            indices.extend(child.subtree_candidates())
+        return indices
+
+
+class PrefixSharingEvaluator:
+    """Simule une seule fois chaque préfixe commun de déploiement.
+
+    Les séquences d'actions (type, niveau, (x, y), temps) sont triées par temps puis
+    rangées dans un trie. Chaque préfixe n'est simulé qu'une fois: le simulateur
+    avance jusqu'à la première divergence (le plus petit temps de déploiement parmi
+    les suites possibles), puis est forké pour chaque branche. Les résultats sont
+    identiques à BattleRunner.run_timed_battle pour chaque candidat pris isolément.
+    """
+
+    def __init__(self, base_layout: BaseLayout, seed: Optional[int] = None, antithetic: bool = False,
+                 **simulator_kwargs):
+        self.base_layout = base_layout
+        self.seed = seed
+        self.antithetic = antithetic
+        self.simulator_kwargs = simulator_kwargs
+
+        # Compteurs de la dernière évaluation
+        self.ticks_simulated = 0
+        self.ticks_naive = 0
+        self.forks = 0
+
+    @staticmethod
+    def build_trie(candidates: Sequence[Sequence[DeploymentAction]]) -> PrefixNode:
+        root = PrefixNode()
+        for index, actions in enumerate(candidates):
+            node = root
+            # Tri stable: à temps égal, l'ordre du candidat est conservé (comme schedule_deployment)
+            for troop_type, level, position, deploy_time in sorted(actions, key=lambda a: a[3]):
+                action = (troop_type, level, tuple(position), deploy_time)
+                if action not in node.children:
+                    node.children[action] = PrefixNode(action)
+                node = node.children[action]
+            node.candidates.append(index)
+        return root
+
+    def evaluate(self, candidates: Sequence[Sequence[DeploymentAction]]) -> List[dict]:
+        """Retourne les statistiques de chaque candidat, dans l'ordre fourni"""
+        self.ticks_simulated = 0
+        self.forks = 0
+        results: List[Optional[dict]] = [None] * len(candidates)
+
+        root = self.build_trie(candidates)
+        simulator = BattleRunner.build_timed_battle(self.base_layout, [], self.seed, self.antithetic, **self.simulator_kwargs)
+        simulator.start()
+        self._evaluate_node(root, simulator, results)
+
+        self.ticks_naive = sum(r['tick_count'] for r in results)
+        return results
+
+    def _fork(self, simulator: BattleSimulator) -> BattleSimulator:
+        self.forks += 1
+        return simulator.fork()
+
+    def _run(self, simulator: BattleSimulator, until: Optional[float] = None) -> None:
+        """Avance le simulateur (jusqu'à la fin si until est None) en comptant les ticks"""
+        start_tick = simulator.current_tick
+        if until is None:
+            simulator.simulate_battle()
+        else:
+            simulator.advance_until(until)
+        self.ticks_simulated += simulator.current_tick - start_tick
+
+    def _finish(self, simulator: BattleSimulator, indices: List[int], results: List[Optional[dict]]) -> None:
+        simulator.reserve_count = 0
+        self._run(simulator)
+        stats = simulator.get_statistics()
+        for index in indices:
+            results[index] = dict(stats)
+
+    def _evaluate_node(self, node: PrefixNode, simulator: BattleSimulator, results: List[Optional[dict]]) -> None:
+        """Évalue le sous-arbre de node; simulator contient déjà les actions du préfixe (il est consommé)"""
+        if not node.children:
+            self._finish(simulator, node.candidates, results)
+            return
+
+        # Les candidats qui s'arrêtent ici divergent dès maintenant: sans déploiement à venir,
+        # leur bataille peut se terminer avant la prochaine action des autres branches
+        if node.candidates:
+            self._finish(self._fork(simulator), node.candidates, results)
+
+        # Tronc commun jusqu'à la première action qui diffère d'une branche à l'autre
+        simulator.reserve_count = 1
+        self._run(simulator, until=min(action[3] for action in node.children))
+        if simulator.is_finished():
+            stats = simulator.get_statistics()
+            for child in node.children.values():
+                for index in child.subtree_candidates():
+                    results[index] = dict(stats)
+            return
+
+        children = list(node.children.values())
+        for i, child in enumerate(children):
+            branch = simulator if i == len(children) - 1 else self._fork(simulator)
+            troop_type, level, position, deploy_time = child.action
+            branch.schedule_deployment(troop_type, level, position, deploy_time)
+            self._evaluate_node(child, branch, results)
+
+
+def evaluate_with_shared_prefixes(base_layout: BaseLayout, candidates: Sequence[Sequence[DeploymentAction]],
+                                  seed: Optional[int] = None, **simulator_kwargs) -> List[dict]:
+    """Raccourci: évalue des séquences d'actions en partageant leurs préfixes communs"""
+    return PrefixSharingEvaluator(base_layout, seed, **simulator_kwargs).evaluate(candidates)
@@ -21,7 +21,23 @@ class BaseLayout:
         self.walls = []
         self.grid = [[None for _ in range(GRID_SIZE)] for _ in range(GRID_SIZE)]
         self.building_counts = {building_type: 0 for building_type in TH3_BUILDING_LIMITS}
+        self.model = None # BaseModel dont la base est issue (voir compile et BaseModel.instantiate)
+        self.compartments = None # CompartmentMap, calculée à la demande (voir get_compartments)
         
+    def compile(self) -> 'BaseModel':
+        """Compile la base en modèle immuable (tables statiques partagées entre batailles)"""
+        from .base_model import BaseModel
+        return BaseModel.compile(self)
+    
+    def get_compartments(self) -> 'CompartmentMap':
+        """Compartiments fermés par les murs, mis à jour au fil des destructions"""
+        from .compartments import CompartmentMap
+        if self.compartments is None:
+            self.compartments = CompartmentMap(self.buildings, self.walls, len(self.grid[0]), len(self.grid))
+        else:
+            self.compartments.sync()
+        return self.compartments
+
     def add_building(self, building_type: str, level: int, position: Tuple[int, int]) -> bool:
         """Ajoute un bâtiment à la base"""
         x, y = position
@@ -43,7 +59,9 @@ class BaseLayout:
             print(f"Position invalide pour {building_type} à {position}")
             return False
         
-        # Ajouter le bâtiment
+        # Ajouter le bâtiment (la base ne correspond plus à son modèle ni à ses compartiments)
+        self.model = None
+        self.compartments = None
         if building_type == "wall":
             self.walls.append(building)
         else:
@@ -65,6 +83,8 @@ class BaseLayout:
             self.walls.remove(building)
         else:
             return False
+        self.model = None
+        self.compartments = None
         
         # Retirer de la grille
         self._remove_from_grid(building)
@@ -240,6 +260,27 @@ class BaseLayout:
         
         return stars
     
+    def get_deployable_tiles(self, margin: int = 1) -> List[Tuple[int, int]]:
+        """Retourne les tuiles où une troupe peut être déployée.
+        
+        Comme dans le jeu, on ne peut pas déployer sur un bâtiment (murs compris)
+        ni à moins de `margin` tuiles de celui-ci.
+        """
+        tiles = []
+        for y in range(GRID_SIZE):
+            for x in range(GRID_SIZE):
+                blocked = False
+                for ny in range(max(0, y - margin), min(GRID_SIZE, y + margin + 1)):
+                    for nx in range(max(0, x - margin), min(GRID_SIZE, x + margin + 1)):
+                        if self.grid[ny][nx] is not None:
+                            blocked = True
+                            break
+                    if blocked:
+                        break
+                if not blocked:
+                    tiles.append((x, y))
+        return tiles
+    
     def reset(self) -> None:
         """Réinitialise tous les bâtiments à leur état initial"""
         for building in self.get_all_buildings():
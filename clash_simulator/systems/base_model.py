@@ -0,0 +1,451 @@
+"""
+Modèle compilé et immuable d'une base, partagé par toutes les batailles qui la jouent
+"""
+import hashlib
+import json
+import math
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from ..core.config import GRID_SIZE, TILE_SIZE, TROOP_STATS
+from ..entities.defense_buildings import DefenseBuilding, Mortar
+from ..entities.other_buildings import create_building
+from .base_layout import BaseLayout
+
+# Occupation d'une tuile (tableau `occupancy`)
+EMPTY = 0
+BUILDING = 1
+WALL = 2
+
+MODEL_CACHE_SIZE = 32 # Modèles compilés gardés en mémoire par processus (voir compiled_model)
+SPATIAL_CELL = 4 # Côté (en tuiles) des cases de l'index spatial des bâtiments
+
+
+class BuildingSpec(NamedTuple):
+    """Partie statique d'un bâtiment: identité, géométrie et points de vie maximum"""
+    index: int
+    type: str
+    level: int
+    x: int
+    y: int
+    size: int
+    gap: float
+    max_hp: int
+    hitbox: Tuple[float, float, float, float] # Inclut le gap (comme Building.get_hitbox)
+    center: Tuple[float, float]
+
+
+def _goal_tile(x: float, y: float, obstacles, width: int, height: int) -> Optional[Tuple[int, int]]:
+    """Tuile libre visée par A* pour la position (x, y): sa propre tuile, sinon la tuile libre
+    la plus proche dans le carré 7x7 (même règle que pathfinding.find_path), sinon None"""
+    tile_x = max(0, min(int(x / TILE_SIZE), width - 1))
+    tile_y = max(0, min(int(y / TILE_SIZE), height - 1))
+    if obstacles[tile_y * width + tile_x] == EMPTY:
+        return (tile_x, tile_y)
+    best, best_distance = None, None
+    for dx in range(-3, 4):
+        for dy in range(-3, 4):
+            alt_x, alt_y = tile_x + dx, tile_y + dy
+            if (dx or dy) and 0 <= alt_x < width and 0 <= alt_y < height and obstacles[alt_y * width + alt_x] == EMPTY:
+                distance = (alt_x * TILE_SIZE + TILE_SIZE / 2.0 - x) ** 2 + (alt_y * TILE_SIZE + TILE_SIZE / 2.0 - y) ** 2
+                if best_distance is None or distance < best_distance:
+                    best, best_distance = (alt_x, alt_y), distance
+    return best
+
+
+class AttackPositions(NamedTuple):
+    """Positions d'attaque d'un bâtiment pour une portée, calculées une seule fois.
+
+    Chaque position au sol est associée à la tuile libre que vise A* (`goals`),
+    calculée sur la grille d'obstacles initiale: la destruction ne fait que libérer
+    des tuiles, A* n'a donc plus à chercher de tuile de remplacement. Les positions
+    sans tuile libre atteignable sont écartées (toutes gardées, sans tuile, s'il n'en
+    reste aucune). Les coordonnées sont rangées en deux tableaux pour la recherche
+    de la plus proche.
+    """
+    positions: Tuple[Tuple[float, float], ...] # Toutes (troupes volantes)
+    walkable: Tuple[Tuple[float, float], ...]
+    goals: Tuple[Optional[Tuple[int, int]], ...] # Tuile visée par A* pour chaque position de `walkable`
+    xs: Tuple[float, ...] # Coordonnées de `walkable`
+    ys: Tuple[float, ...]
+
+    @classmethod
+    def build(cls, positions: Sequence[Tuple[float, float]], obstacles, width: int, height: int) -> 'AttackPositions':
+        positions = tuple(positions)
+        kept = [(position, _goal_tile(position[0], position[1], obstacles, width, height)) for position in positions]
+        kept = [(position, goal) for position, goal in kept if goal is not None] or [(position, None) for position in positions]
+        walkable = tuple(position for position, _ in kept)
+        return cls(positions, walkable, tuple(goal for _, goal in kept),
+                   tuple(x for x, _ in walkable), tuple(y for _, y in walkable))
+
+    def closest(self, x: float, y: float, flying: bool = False) -> Optional[Tuple[Tuple[float, float], Optional[Tuple[int, int]]]]:
+        """Position la plus proche de (x, y) (la première en cas d'égalité) et sa tuile visée,
+        None s'il n'y a aucune position"""
+        if flying:
+            if not self.positions:
+                return None
+            return min(self.positions, key=lambda p: (p[0] - x) ** 2 + (p[1] - y) ** 2), None
+        xs, ys = self.xs, self.ys
+        if not xs:
+            return None
+        best = 0
+        best_distance = (xs[0] - x) ** 2 + (ys[0] - y) ** 2
+        for i in range(1, len(xs)):
+            dx = xs[i] - x
+            dy = ys[i] - y
+            distance = dx * dx + dy * dy
+            if distance < best_distance:
+                best, best_distance = i, distance
+        return self.walkable[best], self.goals[best]
+
+
+class DefenseCoverage(NamedTuple):
+    """Zone couverte par une défense (portée mesurée depuis le bord du bâtiment)"""
+    index: int # Indice du bâtiment dans BaseModel.specs
+    range_box: Tuple[float, float, float, float] # Rectangle depuis lequel la portée est mesurée
+    range_min: float # Zone morte (mortier), mesurée depuis le centre
+    range_max: float
+    targets_ground: bool
+    targets_air: bool
+    dps: float
+
+    def covers(self, x: float, y: float) -> bool:
+        """Le point (x, y) est-il attaquable (DefenseBuilding.is_in_range et zone morte du mortier)"""
+        x1, y1, x2, y2 = self.range_box
+        dx = x - max(x1, min(x, x2))
+        dy = y - max(y1, min(y, y2))
+        if dx * dx + dy * dy > self.range_max ** 2 + 1e-9:
+            return False
+        if self.range_min > 0:
+            center_distance = math.hypot(x - (x1 + x2) / 2, y - (y1 + y2) / 2)
+            return self.range_min <= center_distance <= self.range_max
+        return True
+
+    def may_cover_tile(self, x1: float, y1: float, x2: float, y2: float) -> bool:
+        """Un point du rectangle [x1, x2] x [y1, y2] peut-il être à portée (test conservateur,
+        qui couvre aussi DefenseBuilding.can_target, seul test de Mortar.find_target)"""
+        bx1, by1, bx2, by2 = self.range_box
+        dx = max(0.0, bx1 - x2, x1 - bx2)
+        dy = max(0.0, by1 - y2, y1 - by2)
+        limit = self.range_max ** 2 + 1e-6
+        if dx * dx + dy * dy <= limit:
+            return True
+        cx, cy = (bx1 + bx2) / 2, (by1 + by2) / 2
+        near_x = max(0.0, x1 - cx, cx - x2)
+        near_y = max(0.0, y1 - cy, cy - y2)
+        far_x = max(abs(x1 - cx), abs(x2 - cx))
+        far_y = max(abs(y1 - cy), abs(y2 - cy))
+        return (near_x * near_x + near_y * near_y <= limit
+                and far_x * far_x + far_y * far_y >= self.range_min ** 2 - 1e-6)
+
+
+class _Probe:
+    """Troupe factice pour interroger DefenseBuilding.can_target"""
+
+    def __init__(self, x: float, y: float, is_flying: bool):
+        self.x, self.y = x, y
+        self.is_flying = is_flying
+
+
+class BaseModel:
+    """Base compilée: tout ce qui ne change pas pendant une bataille.
+
+    Le modèle contient les tables des bâtiments (BuildingSpec), l'occupation des
+    tuiles (`occupancy`: EMPTY / BUILDING / WALL par tuile, `obstacles`: la grille
+    de pathfinding initiale, hitbox et gap compris), les positions d'attaque de
+    chaque bâtiment pour chaque portée de troupe (AttackPositions, avec leur tuile
+    libre pour A*) et la couverture des défenses: par tuile, le masque des défenses
+    qui peuvent l'atteindre (`coverage_masks`, bit i pour defense_coverage[i]) et le
+    DPS reçu au centre de la tuile au sol et en vol (`ground_dps`, `air_dps`).
+    L'index spatial (`spatial_cells`) range les bâtiments hors murs par case de
+    SPATIAL_CELL tuiles selon leur centre, pour la recherche des plus proches.
+    Les tableaux sont des `bytes` (ou des vues en lecture seule sur un segment de
+    mémoire partagée) indexés par y * width + x.
+
+    Le modèle est immuable: des milliers de batailles peuvent le partager.
+    L'état d'une bataille (pv, destruction, cibles) reste dans les objets Building
+    créés par instantiate(), sans revalider la base.
+    """
+
+    __slots__ = ("name", "width", "height", "specs", "building_count", "occupancy", "obstacles",
+                 "attack_positions", "defense_coverage", "defense_bits", "coverage_masks", "ground_dps", "air_dps",
+                 "spatial_columns", "spatial_cells", "_prototypes")
+
+    def __init__(self, name: str, width: int, height: int, specs: Tuple[BuildingSpec, ...], building_count: int,
+                 occupancy: bytes, obstacles: bytes, attack_positions: Dict[Tuple[int, float], AttackPositions],
+                 defense_coverage: Tuple[DefenseCoverage, ...]):
+        set_field = object.__setattr__
+        # État initial de chaque bâtiment (classe, attributs, attributs mutables à recréer)
+        prototypes = []
+        for spec in specs:
+            building = create_building(spec.type, spec.level, (spec.x, spec.y))
+            building.model = self
+            building.model_index = spec.index
+            state = vars(building)
+            mutable = tuple(name for name, value in state.items() if isinstance(value, (list, dict, set)))
+            prototypes.append((type(building), state, mutable))
+        set_field(self, "_prototypes", tuple(prototypes))
+        set_field(self, "name", name)
+        set_field(self, "width", width)
+        set_field(self, "height", height)
+        set_field(self, "specs", specs)
+        set_field(self, "building_count", building_count) # Les murs suivent les bâtiments dans specs
+        set_field(self, "occupancy", occupancy)
+        set_field(self, "obstacles", obstacles)
+        set_field(self, "attack_positions", attack_positions)
+        set_field(self, "defense_coverage", defense_coverage)
+        # Cartes par tuile dérivées de la couverture (recalculées plutôt que transmises)
+        set_field(self, "defense_bits", {coverage.index: 1 << bit for bit, coverage in enumerate(defense_coverage)})
+        masks, ground_dps, air_dps = [], [], []
+        for y in range(height):
+            for x in range(width):
+                tile_x, tile_y = x * TILE_SIZE, y * TILE_SIZE
+                center_x, center_y = tile_x + TILE_SIZE / 2.0, tile_y + TILE_SIZE / 2.0
+                mask, ground, air = 0, 0.0, 0.0
+                for bit, coverage in enumerate(defense_coverage):
+                    if not coverage.may_cover_tile(tile_x, tile_y, tile_x + TILE_SIZE, tile_y + TILE_SIZE):
+                        continue
+                    mask |= 1 << bit
+                    if coverage.covers(center_x, center_y):
+                        ground += coverage.dps if coverage.targets_ground else 0.0
+                        air += coverage.dps if coverage.targets_air else 0.0
+                masks.append(mask)
+                ground_dps.append(ground)
+                air_dps.append(air)
+        set_field(self, "coverage_masks", tuple(masks))
+        set_field(self, "ground_dps", tuple(ground_dps))
+        set_field(self, "air_dps", tuple(air_dps))
+        columns, rows = -(-width // SPATIAL_CELL), -(-height // SPATIAL_CELL)
+        cells = [[] for _ in range(columns * rows)]
+        for spec in specs[:building_count]:
+            column = min(columns - 1, max(0, int(spec.center[0] // SPATIAL_CELL)))
+            row = min(rows - 1, max(0, int(spec.center[1] // SPATIAL_CELL)))
+            cells[row * columns + column].append(spec.index)
+        set_field(self, "spatial_columns", columns)
+        set_field(self, "spatial_cells", tuple(tuple(cell) for cell in cells))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("BaseModel est immuable")
+
+    def __copy__(self) -> 'BaseModel':
+        return self
+
+    def __deepcopy__(self, memo) -> 'BaseModel':
+        # Partagé, jamais copié (fork d'un simulateur compris)
+        return self
+
+    def __reduce__(self):
+        # bytes(): les tableaux peuvent être des vues sur de la mémoire partagée (voir shared_model.py)
+        return (BaseModel, (self.name, self.width, self.height, self.specs, self.building_count,
+                            bytes(self.occupancy), bytes(self.obstacles), self.attack_positions, self.defense_coverage))
+
+    @classmethod
+    def compile(cls, base_layout: BaseLayout) -> 'BaseModel':
+        """Compile une base (déjà validée) en modèle immuable"""
+        width = height = GRID_SIZE
+        prototypes = base_layout.buildings + base_layout.walls
+        specs = tuple(
+            BuildingSpec(i, b.type, b.level, b.x, b.y, b.size, b.gap, b.max_hp, b.get_hitbox(), b.get_center())
+            for i, b in enumerate(prototypes)
+        )
+
+        occupancy = bytearray(width * height)
+        obstacles = bytearray(width * height)
+        for spec in specs:
+            is_wall = spec.type == "wall"
+            for y in range(max(0, spec.y), min(height, spec.y + spec.size)):
+                for x in range(max(0, spec.x), min(width, spec.x + spec.size)):
+                    occupancy[y * width + x] = WALL if is_wall else BUILDING
+        # Même marquage que pathfinding.create_pathfinding_grid (bâtiments puis murs)
+        for spec in specs:
+            if spec.type == "wall":
+                continue
+            x1, y1, x2, y2 = spec.hitbox
+            for row in range(max(0, int(y1 / TILE_SIZE)), min(height - 1, int(y2 / TILE_SIZE)) + 1):
+                for col in range(max(0, int(x1 / TILE_SIZE)), min(width - 1, int(x2 / TILE_SIZE)) + 1):
+                    obstacles[row * width + col] = BUILDING
+        for spec in specs:
+            if spec.type == "wall":
+                col, row = int(spec.x / TILE_SIZE), int(spec.y / TILE_SIZE)
+                if 0 <= col < width and 0 <= row < height:
+                    obstacles[row * width + col] = WALL
+
+        ranges = sorted({stats["range"] for levels in TROOP_STATS.values() for stats in levels.values()})
+        attack_positions = {
+            (spec.index, attack_range): AttackPositions.build(building.get_attack_positions(attack_range), obstacles, width, height)
+            for spec, building in zip(specs, prototypes) for attack_range in ranges
+        }
+
+        coverage = []
+        for spec, building in zip(specs, prototypes):
+            if not isinstance(building, DefenseBuilding):
+                continue
+            range_min = building.range_min if isinstance(building, Mortar) else 0.0
+            # Sonde placée au milieu de la zone de tir (le mortier vérifie sa zone morte)
+            probe_x = spec.center[0] + (range_min + building.range) / 2
+            coverage.append(DefenseCoverage(
+                spec.index, building.get_hitbox_for_range_check(), range_min, building.range,
+                building.can_target(_Probe(probe_x, spec.center[1], False)),
+                building.can_target(_Probe(probe_x, spec.center[1], True)),
+                building.damage / building.attack_speed,
+            ))
+
+        return cls(base_layout.name, width, height, specs, len(base_layout.buildings), bytes(occupancy),
+                   bytes(obstacles), attack_positions, tuple(coverage))
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'BaseModel':
+        """Compile une base sérialisée (BaseLayout.save_to_dict); la validation n'a lieu qu'ici"""
+        layout = BaseLayout()
+        layout.load_from_dict(data)
+        return cls.compile(layout)
+
+    def instantiate(self) -> BaseLayout:
+        """Crée une base jouable (état de bataille neuf) sans revalider les positions.
+        
+        Les bâtiments sont clonés depuis leur état initial, sans repasser par les
+        constructeurs ni par add_building.
+        """
+        layout = BaseLayout(self.name)
+        grid = layout.grid
+        counts = layout.building_counts
+        for spec, (cls, state, mutable) in zip(self.specs, self._prototypes):
+            building = cls.__new__(cls)
+            building.__dict__.update(state)
+            for name in mutable:
+                setattr(building, name, state[name].copy())
+            if spec.index < self.building_count:
+                layout.buildings.append(building)
+            else:
+                layout.walls.append(building)
+            for y in range(spec.y, spec.y + spec.size):
+                grid[y][spec.x:spec.x + spec.size] = [building] * spec.size
+            counts[spec.type] += 1
+        layout.model = self
+        return layout
+
+    def save_to_dict(self) -> Dict:
+        """Même format que BaseLayout.save_to_dict (un modèle peut remplacer la base dans BattleRunner)"""
+        buildings = [{"type": s.type, "level": s.level, "x": s.x, "y": s.y} for s in self.specs[:self.building_count]]
+        walls = [{"level": s.level, "x": s.x, "y": s.y} for s in self.specs[self.building_count:]]
+        return {"name": self.name, "buildings": buildings, "walls": walls}
+
+    def tile(self, x: int, y: int) -> int:
+        """Occupation de la tuile (EMPTY, BUILDING ou WALL)"""
+        return self.occupancy[y * self.width + x]
+
+    def get_attack_positions(self, index: int, attack_range: float) -> AttackPositions:
+        """Table des positions d'attaque (une portée absente de TROOP_STATS est calculée puis mémorisée)"""
+        table = self.attack_positions.get((index, attack_range))
+        if table is None:
+            spec = self.specs[index]
+            positions = create_building(spec.type, spec.level, (spec.x, spec.y)).get_attack_positions(attack_range)
+            table = AttackPositions.build(positions, self.obstacles, self.width, self.height)
+            self.attack_positions[(index, attack_range)] = table # Cache interne, le contenu ne dépend que du modèle
+        return table
+
+    def closest_attack_position(self, index: int, attack_range: float, x: float, y: float,
+                                flying: bool = False) -> Optional[Tuple[Tuple[float, float], Optional[Tuple[int, int]]]]:
+        """Position d'attaque la plus proche de (x, y) et tuile libre visée par A* (None en vol)"""
+        return self.get_attack_positions(index, attack_range).closest(x, y, flying)
+
+    def may_be_in_range(self, index: int, x: float, y: float) -> bool:
+        """Faux seulement si aucun point de la tuile de (x, y) n'est à portée de la défense `index`"""
+        tile_x, tile_y = int(x / TILE_SIZE), int(y / TILE_SIZE)
+        if not (0 <= x and 0 <= y and tile_x < self.width and tile_y < self.height):
+            return True
+        return bool(self.coverage_masks[tile_y * self.width + tile_x] & self.defense_bits[index])
+
+    def incoming_dps(self, x: float, y: float, flying: bool = False) -> float:
+        """DPS cumulé des défenses intactes qui atteignent la tuile de (x, y)"""
+        tile_x, tile_y = int(x / TILE_SIZE), int(y / TILE_SIZE)
+        if not (0 <= x and 0 <= y and tile_x < self.width and tile_y < self.height):
+            return 0.0
+        return (self.air_dps if flying else self.ground_dps)[tile_y * self.width + tile_x]
+
+    def path_exposure(self, points: Sequence[Tuple[float, float]], speed: float, flying: bool = False,
+                      step: float = 0.5) -> float:
+        """Dégâts reçus le long d'une ligne brisée parcourue à `speed` tuiles/s (échantillons tous
+        les `step` tuiles), toutes défenses intactes: une estimation sans simulation"""
+        damage = 0.0
+        for (x1, y1), (x2, y2) in zip(points, points[1:]):
+            length = math.hypot(x2 - x1, y2 - y1)
+            samples = max(1, int(math.ceil(length / step)))
+            for i in range(samples):
+                ratio = (i + 0.5) / samples
+                damage += self.incoming_dps(x1 + (x2 - x1) * ratio, y1 + (y2 - y1) * ratio, flying) * (length / samples) / speed
+        return damage
+
+    def spawn_exposure(self, troop_type: str, level: int, position: Tuple[float, float], flying: bool = False) -> float:
+        """Part des pv qu'une troupe perd avant d'atteindre le bâtiment (hors murs) le plus proche
+        en ligne droite: score de point de déploiement sans simulation (plus bas = mieux)"""
+        stats = TROOP_STATS[troop_type][level]
+        buildings = self.specs[:self.building_count]
+        if not buildings:
+            return 0.0
+        nearest = min(buildings, key=lambda spec: (spec.center[0] - position[0]) ** 2 + (spec.center[1] - position[1]) ** 2)
+        return self.path_exposure([tuple(position), nearest.center], stats["speed"], flying) / stats["hp"]
+
+    def nearest_buildings(self, x: float, y: float, count: int, candidates: Dict[int, object]) -> List:
+        """Les `count` candidats (bâtiments hors murs, par model_index) les plus proches de (x, y) par leur
+        centre, dans l'ordre d'un tri stable par distance. Les cases de l'index spatial sont parcourues en
+        anneaux autour du point, jusqu'à ce qu'aucune case restante ne puisse être plus proche."""
+        columns = self.spatial_columns
+        rows = len(self.spatial_cells) // columns
+        cx, cy = int(x // SPATIAL_CELL), int(y // SPATIAL_CELL)
+        found = []
+        for ring in range(max(cx, columns - 1 - cx, cy, rows - 1 - cy, 0) + 1):
+            # Une case de l'anneau `ring` est à plus de (ring - 1) cases du point
+            if len(found) >= count and found[count - 1][0] < (ring - 1) * SPATIAL_CELL:
+                break
+            if ring == 0:
+                cells = [(cx, cy)]
+            else:
+                cells = [(column, row) for row in (cy - ring, cy + ring) for column in range(cx - ring, cx + ring + 1)]
+                cells += [(column, row) for column in (cx - ring, cx + ring) for row in range(cy - ring + 1, cy + ring)]
+            for column, row in cells:
+                if not (0 <= column < columns and 0 <= row < rows):
+                    continue
+                for index in self.spatial_cells[row * columns + column]:
+                    if index in candidates:
+                        center_x, center_y = self.specs[index].center
+                        found.append((math.sqrt((x - center_x) ** 2 + (y - center_y) ** 2), index))
+            found.sort()
+        return [candidates[index] for _, index in found[:count]]
+
+    def coverage_of(self, index: int) -> Optional[DefenseCoverage]:
+        """Couverture de la défense d'indice `index` (None si ce n'est pas une défense)"""
+        for coverage in self.defense_coverage:
+            if coverage.index == index:
+                return coverage
+        return None
+
+    def __repr__(self) -> str:
+        return (f"BaseModel(name='{self.name}', buildings={self.building_count}, "
+                f"walls={len(self.specs) - self.building_count}, grid={self.width}x{self.height})")
+
+
+_MODEL_CACHE: 'OrderedDict[str, BaseModel]' = OrderedDict()
+
+
+def model_key(base_data: Dict) -> str:
+    """Empreinte du contenu d'une base sérialisée (le nom compte, il est affiché)"""
+    return hashlib.sha256(json.dumps(base_data, sort_keys=True, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+
+def compiled_model(base_data: Dict) -> BaseModel:
+    """Modèle compilé d'une base sérialisée, mis en cache dans le processus (LRU)"""
+    key = model_key(base_data)
+    model = _MODEL_CACHE.get(key)
+    if model is not None:
+        _MODEL_CACHE.move_to_end(key)
+        return model
+    model = BaseModel.from_dict(base_data)
+    _MODEL_CACHE[key] = model
+    if len(_MODEL_CACHE) > MODEL_CACHE_SIZE:
+        _MODEL_CACHE.popitem(last=False)
+    return model
+
+
+def clear_model_cache() -> None:
+    _MODEL_CACHE.clear()
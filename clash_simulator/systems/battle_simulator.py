@@ -1,15 +1,35 @@
 """
 Moteur de simulation de bataille
 """
+import copy
+import math
+import os
 import time
-from typing import List, Tuple, Optional
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import List, Tuple, Optional, Dict, Sequence
 from enum import Enum
 from ..entities.troop import Troop, TroopState
+from ..entities.troop_types import create_troop
 from ..entities.defense_buildings import DefenseBuilding
 from ..entities.other_buildings import Wall
 from ..systems.base_layout import BaseLayout
-from ..core.config import TICK_RATE, MAX_BATTLE_DURATION
+from ..systems.base_model import BaseModel, compiled_model
+from ..systems.path_batch import PathBatch
+from ..systems.shared_model import SharedBaseModel, SharedResultBuffer, attach_model, attach_results
+from ..systems.replay import ReplayRecorder
+from ..core.config import TICK_RATE, MAX_BATTLE_DURATION, SIMULATION_FIDELITY, PATHFINDING_CONFIG
 from ..utils.logger import BattleLogger
+from ..utils.random_streams import RandomStreams
+from ..utils.result_cache import ResultCache, battle_key
+from ..utils.result_sink import ResultSink
+from ..utils.profiler import TickProfiler
+from ..utils.trace import TraceRecorder, TICK_TRACK, DEFENSE_TRACK, TRACE_DIRECTORY
+from ..utils.stats import mean_confidence_interval, paired_differences
+
+# Format d'une armée: (type_troupe, niveau, (spawn_x, spawn_y)), comme dans data/army_configs.py
+ArmyConfig = Sequence[Tuple[str, int, Tuple[float, float]]]
+# Action de déploiement: (type_troupe, niveau, (x, y), temps_de_déploiement)
+DeploymentAction = Tuple[str, int, Tuple[float, float], float]
 
 class BattleState(Enum):
     """États possibles de la bataille"""
@@ -19,16 +39,39 @@ class BattleState(Enum):
     DEFEAT = "defeat"
     TIMEOUT = "timeout"
 
+# Statistiques renvoyées par les workers via un SharedResultBuffer (get_statistics sans profil),
+# suivies du temps de calcul. L'état est codé par son rang dans BattleState.
+SHARED_STAT_FIELDS = ('duration', 'state', 'destruction_percentage', 'stars', 'troops_deployed', 'troops_lost',
+                      'buildings_destroyed', 'defenses_destroyed', 'tick_count')
+_FLOAT_STAT_FIELDS = {'duration', 'destruction_percentage'}
+_BATTLE_STATES = list(BattleState)
+
 class BattleSimulator:
     """Moteur principal de simulation de bataille"""
     
-    def __init__(self, base_layout: BaseLayout, troops: List[Troop], battle_duration: Optional[float] = None, battle_id: Optional[str] = None, log_to_console: bool = False, log_to_file: bool = True):
+    def __init__(self, base_layout: BaseLayout, troops: List[Troop], battle_duration: Optional[float] = None, battle_id: Optional[str] = None, log_to_console: bool = False, log_to_file: bool = True,
+                 seed: Optional[int] = None, antithetic: bool = False, fidelity: str = "full",
+                 profile: bool = False, profile_sample_every: int = 1, trace: bool = False,
+                 replay_path: Optional[str] = None):
+        if fidelity not in SIMULATION_FIDELITY:
+            raise ValueError(f"Fidélité de simulation inconnue : {fidelity}")
         self.base_layout = base_layout
         self.troops = troops
         self.projectiles = [] # Pour les projectiles de mortier, etc.
         self.battle_duration = battle_duration if battle_duration is not None else MAX_BATTLE_DURATION
         self.history = []
         self.initial_troop_count = len(troops)
+        self.pending_deployments: List[DeploymentAction] = [] # Triées par temps de déploiement
+        self.reserve_count = 0 # Troupes pas encore programmées mais qui pourront l'être (la bataille continue)
+        self.fidelity = fidelity
+        self.tick_rate = SIMULATION_FIDELITY[fidelity]["tick_rate"]
+        self.record_history = SIMULATION_FIDELITY[fidelity]["record_history"]
+        # Profileur de ticks optionnel (None = aucune mesure, aucun coût)
+        self.profiler: Optional[TickProfiler] = TickProfiler(profile_sample_every) if profile else None
+        # Trace Chrome/Perfetto optionnelle (voir save_trace)
+        self.tracer: Optional[TraceRecorder] = TraceRecorder(battle_id or "battle") if trace else None
+        # Replay compact (images clés + deltas), écrit au fil de la bataille si un chemin est fourni
+        self.replay_recorder: Optional[ReplayRecorder] = ReplayRecorder(replay_path) if replay_path else None
         self.current_tick = 0
         self.current_time = 0.0
         self.state = BattleState.NOT_STARTED
@@ -38,10 +81,20 @@ class BattleSimulator:
         self.log_to_file_enabled = log_to_file
         self.logger: Optional[BattleLogger] = None # Sera initialisé dans start()
         
+        # Aléa: un sous-flux par source (simulateur, puis chaque troupe dans l'ordre de déploiement)
+        self.seed = seed
+        self.antithetic = antithetic
+        self.random_streams = RandomStreams(seed, antithetic)
+        self.rng = self.random_streams.spawn()
+        
         # Statistiques
         self.troops_deployed = 0
         self.troops_remaining = len(troops)
         self.initial_base_hp = base_layout.get_total_hp()
+        # Compartiments de la base, partagés par les troupes (option use_compartments)
+        self.compartments = base_layout.get_compartments() if PATHFINDING_CONFIG["use_compartments"] else None
+        # Recherches de chemin regroupées en fin de mise à jour des troupes (option batch_paths)
+        self.path_batch = PathBatch() if PATHFINDING_CONFIG["batch_paths"] else None
         
     def start(self) -> None:
         """Démarre la simulation"""
@@ -71,23 +124,115 @@ class BattleSimulator:
         # Initialiser les troupes
         for troop in self.troops:
             troop.spawn_time = self.current_time
+            troop.rng = self.random_streams.spawn()
+            troop.compartments = self.compartments
+            troop.path_batch = self.path_batch
+            self._attach_tracer(troop)
             self.troops_deployed += 1
+        
+        if self.replay_recorder is not None:
+            self.replay_recorder.start(self)
+    
+    def deploy_troop(self, troop_type: str, level: int, position: Tuple[float, float]) -> Troop:
+        """Déploie immédiatement une nouvelle troupe sur le champ de bataille"""
+        troop = create_troop(troop_type, level, position)
+        troop.spawn_time = self.current_time
+        troop.rng = self.random_streams.spawn()
+        troop.compartments = self.compartments
+        troop.path_batch = self.path_batch
+        self._attach_tracer(troop)
+        self.troops.append(troop)
+        self.troops_deployed += 1
+        self.troops_remaining += 1
+        if self.logger:
+            self.logger.info(f"Deployed {troop_type}_{level} at ({position[0]:.1f}, {position[1]:.1f})",
+                             tick=self.current_tick, sim_time=self.current_time)
+        return troop
+    
+    def _attach_tracer(self, troop: Troop) -> None:
+        """Donne à la troupe sa piste dans la trace (si la trace est active)"""
+        if self.tracer is not None:
+            troop.tracer = self.tracer
+            troop.trace_track = self.tracer.register_track(f"{troop.type}_{troop.level} #{self.troops_deployed}")
+    
+    def save_trace(self, path: Optional[str] = None) -> str:
+        """Écrit la trace (format Chrome trace event) et retourne son chemin"""
+        if self.tracer is None:
+            raise ValueError("La trace n'est pas activée pour cette bataille (trace=True).")
+        if path is None and self.logger:
+            path = os.path.join(TRACE_DIRECTORY, f"{self.logger.battle_id}.trace.json")
+        return self.tracer.save(path)
+    
+    def schedule_deployment(self, troop_type: str, level: int, position: Tuple[float, float], deploy_time: float) -> None:
+        """Programme le déploiement d'une troupe à un instant donné (en secondes de bataille).
+        
+        Le déploiement a lieu au début du premier tick dont le temps atteint deploy_time.
+        """
+        if deploy_time < self.current_time - 1e-6 / self.tick_rate: # Tolérance sur le cumul des pas de temps
+            raise ValueError(f"Impossible de déployer dans le passé ({deploy_time:.1f}s < {self.current_time:.1f}s)")
+        action = (troop_type, level, tuple(position), deploy_time)
+        # Insertion stable: à temps égal, l'ordre de programmation est conservé
+        index = len(self.pending_deployments)
+        while index > 0 and self.pending_deployments[index - 1][3] > deploy_time:
+            index -= 1
+        self.pending_deployments.insert(index, action)
+    
+    def _process_deployments(self) -> None:
+        """Déploie les troupes programmées dont l'heure est venue"""
+        dt = 1.0 / self.tick_rate
+        while self.pending_deployments and self.pending_deployments[0][3] <= self.current_time + dt * 1e-6:
+            troop_type, level, position, _ = self.pending_deployments.pop(0)
+            self.deploy_troop(troop_type, level, position)
+    
+    def advance_until(self, sim_time: float) -> None:
+        """Simule des ticks jusqu'à atteindre sim_time (ou la fin de la bataille)"""
+        if self.state == BattleState.NOT_STARTED:
+            self.start()
+        dt = 1.0 / self.tick_rate
+        while self.state == BattleState.IN_PROGRESS and self.current_time < sim_time - dt * 1e-6:
+            self.simulate_tick()
+    
+    def fork(self) -> 'BattleSimulator':
+        """Retourne une copie indépendante de la bataille dans son état courant.
+        
+        La copie peut servir d'instantané (on la garde intacte et on la fork à son
+        tour) ou de branche à simuler. Le logger est partagé; l'historique déjà
+        enregistré est partagé en lecture (copie superficielle de la liste). La copie
+        n'enregistre pas de replay (le fichier appartient à la bataille d'origine).
+        """
+        memo = {id(self.logger): self.logger, id(self.history): list(self.history), id(self.replay_recorder): None}
+        return copy.deepcopy(self, memo)
     
     def simulate_tick(self) -> None:
         """Simule un tick de la bataille"""
         if self.state != BattleState.IN_PROGRESS or not self.logger:
             return
 
-        dt = 1.0 / TICK_RATE
+        dt = 1.0 / self.tick_rate
+        profiler = self.profiler if self.profiler is not None and self.profiler.should_sample(self.current_tick) else None
+        if profiler:
+            mark = profiler.start_tick()
+        if self.tracer is not None:
+            tick_start = self.tracer.now()
         self.logger.debug(f"--- Tick Start --- DT: {dt}", tick=self.current_tick, sim_time=self.current_time)
+        
+        # Déployer les troupes programmées
+        if self.pending_deployments:
+            self._process_deployments()
+        if profiler:
+            mark = profiler.lap("deployments", mark)
 
         # Mettre à jour les troupes
         active_troops = [t for t in self.troops if t.is_alive()]
-        if not active_troops and self.state == BattleState.IN_PROGRESS: # Early exit if all troops dead
+        if not active_troops and not self.pending_deployments and not self.reserve_count and self.state == BattleState.IN_PROGRESS: # Early exit if all troops dead
             self.logger.info("All troops are dead.", tick=self.current_tick, sim_time=self.current_time)
             self._check_end_conditions()
             if self.state != BattleState.IN_PROGRESS: # If end condition met
                 self.logger.debug("--- Tick End (Battle Ended Early) ---", tick=self.current_tick, sim_time=self.current_time)
+                self._record_replay_frame()
+                if profiler:
+                    profiler.lap("end_conditions", mark)
+                    profiler.end_tick()
                 return
 
         for troop in active_troops:
@@ -115,6 +260,14 @@ class BattleSimulator:
             if not troop.is_alive() and old_state != TroopState.DEAD:
                 self.logger.info(f"Troop {troop.type}_{troop.level} died.", tick=self.current_tick, sim_time=self.current_time)
 
+        # Chemins demandés pendant le tick: résolus ensemble, puis les troupes concernées avancent
+        if self.path_batch:
+            for troop in self.path_batch.resolve(self.base_layout.buildings, self.base_layout.walls, self.current_time):
+                troop.follow_path(dt, self.current_time)
+
+        if profiler:
+            mark = profiler.lap("troops", mark)
+
         # Mettre à jour les bâtiments (ex: défenses qui tirent)
         for building in self.base_layout.get_defenses():
             if not building.is_destroyed:
@@ -127,7 +280,17 @@ class BattleSimulator:
                 #    if not target.is_alive():
                 #        self.logger.info(f"Troop {target.type} died from {building.type} attack.", 
                 #                          tick=self.current_tick, sim_time=self.current_time)
+                previous_target = building.target
                 building.update(dt, self.troops, self.current_time, self.projectiles, self.logger) # Passer le logger aux défenses
+                if self.tracer is not None and building.target is not None and building.target is not previous_target:
+                    self.tracer.instant(f"{building.type} cible {building.target.type}", "targeting", DEFENSE_TRACK, {
+                        "defense": f"{building.type}@({building.x},{building.y})",
+                        "target": f"{building.target.type}_{building.target.level}",
+                        "tick": self.current_tick,
+                    })
+
+        if profiler:
+            mark = profiler.lap("defenses", mark)
 
         # Mettre à jour les projectiles
         new_projectiles = []
@@ -140,17 +303,39 @@ class BattleSimulator:
             else:
                 new_projectiles.append(p)
         self.projectiles = new_projectiles
+        if profiler:
+            mark = profiler.lap("projectiles", mark)
 
         self._check_end_conditions()
-        self._record_state()
+        if profiler:
+            mark = profiler.lap("end_conditions", mark)
+        if self.record_history:
+            self._record_state()
+        if profiler:
+            profiler.lap("record_state", mark)
+            profiler.end_tick()
+        if self.tracer is not None:
+            self.tracer.complete("tick", "simulation", tick_start, TICK_TRACK, {
+                "tick": self.current_tick, "sim_time": round(self.current_time, 3),
+                "troops_alive": len(active_troops),
+            })
         
         self.current_time += dt
         self.current_tick += 1
+        self._record_replay_frame()
         self.logger.debug("--- Tick End ---", tick=self.current_tick -1, sim_time=self.current_time - dt) # Log with tick/time at start of tick
     
+    def _record_replay_frame(self) -> None:
+        """Ajoute la frame courante au replay, et le finalise quand la bataille est terminée"""
+        if self.replay_recorder is not None:
+            self.replay_recorder.record_frame(self)
+            if self.is_finished():
+                self.replay_recorder.close()
+    
     def simulate_battle(self) -> BattleState:
-        """Simule la bataille complète"""
-        self.start()
+        """Simule la bataille complète (ou la termine si elle est déjà en cours)"""
+        if self.state == BattleState.NOT_STARTED:
+            self.start()
         
         while self.state == BattleState.IN_PROGRESS:
             self.simulate_tick()
@@ -173,8 +358,8 @@ class BattleSimulator:
             self.state = BattleState.VICTORY
             if self.logger: self.logger.info("VICTORY! All non-wall buildings destroyed.", tick=self.current_tick, sim_time=self.current_time)
 
-        # Condition de défaite: toutes les troupes mortes ET pas de victoire
-        elif not any(t.is_alive() for t in self.troops):
+        # Condition de défaite: toutes les troupes mortes, plus rien à déployer ET pas de victoire
+        elif not any(t.is_alive() for t in self.troops) and not self.pending_deployments and not self.reserve_count:
             if self.state == BattleState.IN_PROGRESS: # Assurer qu'on n'a pas déjà gagné au même tick
                 self.state = BattleState.DEFEAT
                 if self.logger: self.logger.info("DEFEAT! All troops eliminated.", tick=self.current_tick, sim_time=self.current_time)
@@ -217,8 +402,8 @@ class BattleSimulator:
             self.history.append(state)
     
     def get_statistics(self) -> dict:
-        """Retourne les statistiques de la bataille"""
-        return {
+        """Retourne les statistiques de la bataille (avec le profil des ticks si activé)"""
+        stats = {
             'duration': self.current_time,
             'state': self.state.value,
             'destruction_percentage': self.base_layout.get_destruction_percentage(),
@@ -229,6 +414,9 @@ class BattleSimulator:
             'defenses_destroyed': sum(1 for b in self.base_layout.get_defenses() if b.is_destroyed),
             'tick_count': self.current_tick
         }
+        if self.profiler is not None:
+            stats['profile'] = self.profiler.summary()
+        return stats
     
     def is_finished(self) -> bool:
         """Vérifie si la bataille est terminée"""
@@ -251,6 +439,10 @@ class BattleSimulator:
             troop.path = []
             troop.last_attack_time = 0
         
+        # Rejouer les mêmes flux aléatoires
+        self.random_streams = RandomStreams(self.seed, self.antithetic)
+        self.rng = self.random_streams.spawn()
+        
         # Réinitialiser l'état
         self.state = BattleState.NOT_STARTED
         self.current_time = 0.0
@@ -290,4 +482,275 @@ class BattleRunner:
         """Exécute une bataille instantanément sans visualisation"""
         simulator = BattleSimulator(base_layout, troops)
         simulator.simulate_battle()
-        return simulator.get_statistics() 
\ No newline at end of file
+        return simulator.get_statistics() 
+    
+    @staticmethod
+    def build_battle(base_layout: BaseLayout, army_config: ArmyConfig, seed: Optional[int] = None,
+                     antithetic: bool = False, **simulator_kwargs) -> BattleSimulator:
+        """Crée un simulateur sur une copie fraîche de la base et de l'armée.
+        
+        La base fournie sert de modèle et n'est jamais modifiée, ce qui permet de
+        lancer plusieurs batailles indépendantes à partir des mêmes configurations.
+        base_layout peut aussi être un BaseModel déjà compilé (partout dans BattleRunner).
+        """
+        if isinstance(base_layout, BaseModel):
+            return BattleRunner._build_battle_from_model(base_layout, army_config, seed, antithetic, **simulator_kwargs)
+        return BattleRunner._build_battle_from_data(base_layout.save_to_dict(), army_config, seed, antithetic, **simulator_kwargs)
+    
+    @staticmethod
+    def _build_battle_from_data(base_data: Dict, army_config: ArmyConfig, seed: Optional[int] = None,
+                                antithetic: bool = False, **simulator_kwargs) -> BattleSimulator:
+        """Crée un simulateur depuis une base sérialisée (BaseLayout.save_to_dict).
+        
+        La base n'est validée et compilée qu'une fois par processus (compiled_model):
+        les batailles suivantes instancient directement le modèle.
+        """
+        return BattleRunner._build_battle_from_model(compiled_model(base_data), army_config, seed, antithetic, **simulator_kwargs)
+    
+    @staticmethod
+    def _build_battle_from_model(model: BaseModel, army_config: ArmyConfig, seed: Optional[int] = None,
+                                 antithetic: bool = False, **simulator_kwargs) -> BattleSimulator:
+        """Crée un simulateur sur une instance neuve d'un modèle compilé"""
+        base_copy = model.instantiate()
+        troops = [create_troop(troop_type, level, position) for troop_type, level, position in army_config]
+        simulator_kwargs.setdefault("log_to_file", False)
+        return BattleSimulator(base_copy, troops, seed=seed, antithetic=antithetic, **simulator_kwargs)
+    
+    @staticmethod
+    def run_seeded_battle(base_layout: BaseLayout, army_config: ArmyConfig, seed: Optional[int] = None,
+                          antithetic: bool = False, cache: Optional[ResultCache] = None, **simulator_kwargs) -> dict:
+        """Exécute instantanément une bataille reproductible (même graine = même résultat).
+        
+        Avec un cache, le résultat est d'abord cherché par contenu (base, armée, graine,
+        paramètres); une bataille sans graine n'est jamais mise en cache.
+        """
+        key = BattleRunner._cache_key(cache, base_layout.save_to_dict(), army_config, seed, antithetic, simulator_kwargs)
+        if key is not None:
+            stats = cache.get(key)
+            if stats is not None:
+                return stats
+        simulator = BattleRunner.build_battle(base_layout, army_config, seed, antithetic, **simulator_kwargs)
+        simulator.simulate_battle()
+        stats = simulator.get_statistics()
+        if key is not None:
+            cache.put(key, stats)
+        return stats
+    
+    @staticmethod
+    def _cache_key(cache: Optional[ResultCache], base_data: Dict, deployments: Sequence, seed: Optional[int],
+                   antithetic: bool, simulator_kwargs: Dict) -> Optional[str]:
+        """Clé de cache de la bataille, ou None si le résultat ne doit pas être mis en cache"""
+        if cache is None or seed is None or simulator_kwargs.get("profile"): # Les mesures de temps ne se rejouent pas
+            return None
+        return battle_key(base_data, deployments, seed, antithetic, **simulator_kwargs)
+
+    @staticmethod
+    def build_timed_battle(base_layout: BaseLayout, actions: Sequence[DeploymentAction], seed: Optional[int] = None,
+                           antithetic: bool = False, **simulator_kwargs) -> BattleSimulator:
+        """Crée un simulateur sans troupe initiale où chaque action de déploiement est programmée"""
+        simulator = BattleRunner.build_battle(base_layout, [], seed, antithetic, **simulator_kwargs)
+        for troop_type, level, position, deploy_time in actions:
+            simulator.schedule_deployment(troop_type, level, position, deploy_time)
+        return simulator
+
+    @staticmethod
+    def run_timed_battle(base_layout: BaseLayout, actions: Sequence[DeploymentAction], seed: Optional[int] = None,
+                         antithetic: bool = False, cache: Optional[ResultCache] = None, **simulator_kwargs) -> dict:
+        """Exécute instantanément une bataille décrite par des actions de déploiement temporisées"""
+        key = BattleRunner._cache_key(cache, base_layout.save_to_dict(), actions, seed, antithetic, simulator_kwargs)
+        if key is not None:
+            stats = cache.get(key)
+            if stats is not None:
+                return stats
+        simulator = BattleRunner.build_timed_battle(base_layout, actions, seed, antithetic, **simulator_kwargs)
+        simulator.simulate_battle()
+        stats = simulator.get_statistics()
+        if key is not None:
+            cache.put(key, stats)
+        return stats
+
+    @staticmethod
+    def run_paired_comparison(base_layout: BaseLayout, army_a: ArmyConfig, army_b: ArmyConfig,
+                              n_pairs: int = 10, base_seed: int = 0, antithetic: bool = False,
+                              metric: str = "destruction_percentage", confidence: float = 0.95,
+                              cache: Optional[ResultCache] = None, **simulator_kwargs) -> Dict:
+        """Compare deux variantes d'armée avec des nombres aléatoires communs.
+        
+        La paire i exécute les deux variantes avec la même graine (base_seed + i), donc
+        les mêmes flux aléatoires : la variance de la différence a - b est bien plus
+        faible qu'avec des tirages indépendants. Avec antithetic=True, chaque variante
+        est de plus évaluée sur le flux antithétique de la même graine et la moyenne
+        des deux résultats sert d'échantillon.
+        
+        Retourne les moyennes de chaque variante, la différence moyenne (a - b) et son
+        intervalle de confiance.
+        """
+        if n_pairs < 1:
+            raise ValueError(f"Nombre de paires invalide : {n_pairs}")
+        
+        def evaluate(army_config: ArmyConfig, seed: int) -> float:
+            value = BattleRunner.run_seeded_battle(base_layout, army_config, seed, cache=cache, **simulator_kwargs)[metric]
+            if antithetic:
+                mirrored = BattleRunner.run_seeded_battle(base_layout, army_config, seed, antithetic=True, cache=cache,
+                                                          **simulator_kwargs)[metric]
+                value = (value + mirrored) / 2
+            return value
+        
+        seeds = [base_seed + i for i in range(n_pairs)]
+        samples_a = [evaluate(army_a, seed) for seed in seeds]
+        samples_b = [evaluate(army_b, seed) for seed in seeds]
+        differences = paired_differences(samples_a, samples_b)
+        interval = mean_confidence_interval(differences, confidence)
+        
+        return {
+            'metric': metric,
+            'n_pairs': n_pairs,
+            'antithetic': antithetic,
+            'seeds': seeds,
+            'mean_a': sum(samples_a) / n_pairs,
+            'mean_b': sum(samples_b) / n_pairs,
+            'mean_difference': interval['mean'],
+            'std_difference': interval['std'],
+            'confidence': confidence,
+            'ci_low': interval['ci_low'],
+            'ci_high': interval['ci_high'],
+            'samples_a': samples_a,
+            'samples_b': samples_b,
+        }
+    
+    @staticmethod
+    def run_batch(base_layout: BaseLayout, tasks: Sequence[Tuple[ArmyConfig, Optional[int]]], workers: int = 1,
+                  executor: Optional[Executor] = None, cache: Optional[ResultCache] = None,
+                  replay_directory: Optional[str] = None, sink: Optional[ResultSink] = None,
+                  shared_memory: Optional[bool] = None, **simulator_kwargs) -> List[dict]:
+        """Exécute un lot de batailles (armée, graine) contre une même base.
+        
+        Avec workers > 1 (ou un executor fourni), les batailles sont réparties par
+        paquets sur plusieurs processus. La base compilée (BaseModel) est publiée une
+        fois en mémoire partagée et chaque worker l'ouvre une seule fois; une tâche ne
+        transporte que son armée et sa graine, et les statistiques reviennent par un
+        tampon partagé (shared_memory=None: automatique avec un pool de processus;
+        sinon la base sérialisée accompagne chaque tâche). Avec profile=True, la base
+        sérialisée est toujours utilisée, même avec shared_memory=True, car le tampon
+        ne transporte pas les statistiques de profilage. Avec un cache, seules les batailles absentes
+        du cache sont simulées (le cache n'est consulté que dans le processus appelant).
+        Avec replay_directory, chaque bataille écrit son replay dans
+        replay_directory/battle_<indice>.replay (le cache n'est alors pas lu, pour que
+        chaque tâche ait son replay). Les résultats sont renvoyés dans l'ordre des tâches.
+        
+        Avec un sink (voir utils/result_sink.py), chaque résultat y est écrit dès qu'il
+        est disponible (les résultats du cache d'abord), avec le hash de configuration,
+        la graine et le temps de calcul; le sink est vidé même si le lot est interrompu.
+        """
+        base_data = base_layout.save_to_dict()
+        results: List[Optional[dict]] = [None] * len(tasks)
+        keys: List[Optional[str]] = []
+        antithetic = simulator_kwargs.get("antithetic", False)
+        key_kwargs = {k: v for k, v in simulator_kwargs.items() if k != "antithetic"}
+        for i, (army_config, seed) in enumerate(tasks):
+            key = BattleRunner._cache_key(cache, base_data, army_config, seed, antithetic, key_kwargs)
+            keys.append(key)
+            if key is not None and replay_directory is None:
+                results[i] = cache.get(key)
+        
+        def record(i: int, stats: dict, wall_time: float, cached: bool) -> None:
+            if sink is not None:
+                sink.write({
+                    'config_hash': battle_key(base_data, tasks[i][0], None, antithetic, **key_kwargs),
+                    'seed': tasks[i][1],
+                    'task': i,
+                    'cached': cached,
+                    'wall_time': wall_time,
+                    'finished_at': time.time(),
+                    'stats': stats,
+                })
+        
+        for i, stats in enumerate(results):
+            if stats is not None:
+                record(i, stats, 0.0, True)
+        
+        missing = [i for i, result in enumerate(results) if result is None]
+        task_kwargs = []
+        for i in missing:
+            kwargs = simulator_kwargs
+            if replay_directory is not None:
+                kwargs = dict(simulator_kwargs, replay_path=os.path.join(replay_directory, f"battle_{i:05d}.replay"))
+            task_kwargs.append(kwargs)
+        
+        pool = None
+        shared_model = shared_results = None
+        if executor is None and workers <= 1:
+            computed = map(_run_batch_task, [(base_data, tasks[i][0], tasks[i][1], kwargs)
+                                             for i, kwargs in zip(missing, task_kwargs)])
+        else:
+            n_workers = workers if executor is None else max(1, workers)
+            chunksize = max(1, math.ceil(len(missing) / (n_workers * 4)))
+            if simulator_kwargs.get("profile"):
+                shared_memory = False # Le tampon partagé ne transporte pas les statistiques de profilage
+            elif shared_memory is None:
+                shared_memory = executor is None or isinstance(executor, ProcessPoolExecutor)
+            if executor is None:
+                executor = pool = ProcessPoolExecutor(max_workers=workers)
+            if shared_memory and missing:
+                model = base_layout if isinstance(base_layout, BaseModel) else compiled_model(base_data)
+                shared_model = SharedBaseModel(model)
+                shared_results = SharedResultBuffer(len(missing), len(SHARED_STAT_FIELDS) + 1)
+                payloads = [(shared_model.name, shared_results.name, len(missing), row, tasks[i][0], tasks[i][1], kwargs)
+                            for row, (i, kwargs) in enumerate(zip(missing, task_kwargs))]
+                rows = executor.map(_run_shared_batch_task, payloads, chunksize=chunksize)
+                computed = (_decode_stats(shared_results.read_row(row)) for row in rows)
+            else:
+                payloads = [(base_data, tasks[i][0], tasks[i][1], kwargs) for i, kwargs in zip(missing, task_kwargs)]
+                computed = executor.map(_run_batch_task, payloads, chunksize=chunksize)
+        
+        # Les résultats sont consommés au fil de l'eau (dans l'ordre des tâches)
+        try:
+            for i, (stats, wall_time) in zip(missing, computed):
+                results[i] = stats
+                if keys[i] is not None:
+                    cache.put(keys[i], stats)
+                record(i, stats, wall_time, False)
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+            if shared_model is not None:
+                shared_model.close()
+                shared_results.close()
+            if sink is not None:
+                sink.flush()
+        return results
+
+def _run_batch_task(payload: Tuple[Dict, ArmyConfig, Optional[int], Dict]) -> Tuple[dict, float]:
+    """Tâche exécutée par un worker de BattleRunner.run_batch (doit rester au niveau du module).
+    Retourne les statistiques et le temps de calcul en secondes."""
+    start = time.perf_counter()
+    base_data, army_config, seed, simulator_kwargs = payload
+    simulator = BattleRunner._build_battle_from_data(base_data, army_config, seed, **simulator_kwargs)
+    simulator.simulate_battle()
+    return simulator.get_statistics(), time.perf_counter() - start
+
+def _run_shared_batch_task(payload: Tuple[str, str, int, int, ArmyConfig, Optional[int], Dict]) -> int:
+    """Tâche de run_batch en mémoire partagée: écrit ses statistiques dans sa ligne du tampon
+    et retourne l'indice de la ligne"""
+    start = time.perf_counter()
+    model_name, results_name, n_rows, row, army_config, seed, simulator_kwargs = payload
+    simulator = BattleRunner._build_battle_from_model(attach_model(model_name), army_config, seed, **simulator_kwargs)
+    simulator.simulate_battle()
+    values = _encode_stats(simulator.get_statistics())
+    values.append(time.perf_counter() - start)
+    attach_results(results_name, n_rows, len(SHARED_STAT_FIELDS) + 1).write_row(row, values)
+    return row
+
+def _encode_stats(stats: dict) -> List[float]:
+    return [_BATTLE_STATES.index(BattleState(stats[field])) if field == 'state' else stats[field]
+            for field in SHARED_STAT_FIELDS]
+
+def _decode_stats(values: List[float]) -> Tuple[dict, float]:
+    """Statistiques et temps de calcul relus dans une ligne d'un SharedResultBuffer"""
+    stats = {}
+    for field, value in zip(SHARED_STAT_FIELDS, values):
+        if field == 'state':
+            stats[field] = _BATTLE_STATES[int(value)].value
+        else:
+            stats[field] = value if field in _FLOAT_STAT_FIELDS else int(value)
+    return stats, values[-1]
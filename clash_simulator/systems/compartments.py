@@ -0,0 +1,303 @@
+"""
+Compartiments d'une base: zones fermées par les murs et graphe des murs qui les séparent
+"""
+import heapq
+import math
+from typing import Dict, List, Optional, Set, Tuple
+
+from ..core.config import TILE_SIZE
+from .pathfinding import hitbox_tiles
+
+# Voisinage des tuiles: 8-connexité, comme les déplacements de l'A* (diagonales entre deux murs comprises)
+NEIGHBORS_8 = ((0, 1), (0, -1), (1, 0), (-1, 0), (1, 1), (1, -1), (-1, 1), (-1, -1))
+
+# État d'une tuile, comme dans pathfinding.create_pathfinding_grid
+FREE = 0
+BUILDING = 1
+WALL = 2
+
+
+class CompartmentMap:
+    """Compartiments d'une base en cours de bataille.
+
+    Les tuiles libres de la grille de pathfinding (ni mur, ni hitbox de bâtiment) sont
+    regroupées par remplissage (8-connexité): chaque zone fermée est un compartiment,
+    l'extérieur de la base en est un aussi. Deux compartiments sont voisins dans le
+    graphe quand un mur touche les deux; l'arête porte la liste de ces murs.
+
+    Quand des murs ou des bâtiments tombent (sync), le remplissage n'est pas refait:
+    les tuiles libérées rejoignent les compartiments qui les touchent (union-find) et
+    le graphe est regroupé. Une base réinitialisée est recalculée entièrement.
+    """
+
+    def __init__(self, buildings: List, walls: List, width: int, height: int):
+        self.width = width
+        self.height = height
+        # Obstacles et tuiles qu'ils bloquent (un mur l'emporte sur la hitbox d'un bâtiment)
+        self.obstacles = [(b, [y * width + x for x, y in hitbox_tiles(b)]) for b in buildings if b.type != "wall"]
+        self.obstacles += [(w, [int(w.y / TILE_SIZE) * width + int(w.x / TILE_SIZE)]) for w in walls]
+        self.tiles_of = {obstacle: tiles for obstacle, tiles in self.obstacles} # Clés objets: suivies par deepcopy (fork)
+        self.blockers: Dict[int, List] = {}
+        for obstacle, tiles in self.obstacles:
+            for tile in tiles:
+                self.blockers.setdefault(tile, []).append(obstacle)
+        self._build()
+
+    def _tile_state(self, tile: int) -> int:
+        standing = [obstacle for obstacle in self.blockers.get(tile, ()) if not obstacle.is_destroyed]
+        if any(obstacle.type == "wall" for obstacle in standing):
+            return WALL
+        return BUILDING if standing else FREE
+
+    def _build(self) -> None:
+        """Remplissage des compartiments depuis les obstacles encore debout"""
+        width, height = self.width, self.height
+        self.standing = [obstacle for obstacle, _ in self.obstacles if not obstacle.is_destroyed]
+        self.fallen = [obstacle for obstacle, _ in self.obstacles if obstacle.is_destroyed]
+        self.state = bytearray(width * height)
+        for tile in self.blockers:
+            self.state[tile] = self._tile_state(tile)
+
+        labels = [-1] * (width * height)
+        count = 0
+        sums: List[List[float]] = []
+        # Les bords d'abord: l'extérieur de la base reçoit le premier numéro
+        border = [(x, y) for y in (0, height - 1) for x in range(width)] + \
+                 [(x, y) for x in (0, width - 1) for y in range(1, height - 1)]
+        interior = [(x, y) for y in range(1, height - 1) for x in range(1, width - 1)]
+        for x0, y0 in border + interior:
+            if labels[y0 * width + x0] != -1 or self.state[y0 * width + x0] != FREE:
+                continue
+            labels[y0 * width + x0] = count
+            stack = [(x0, y0)]
+            total = [0.0, 0.0, 0]
+            while stack:
+                x, y = stack.pop()
+                total[0] += x
+                total[1] += y
+                total[2] += 1
+                for dx, dy in NEIGHBORS_8:
+                    nx, ny = x + dx, y + dy
+                    index = ny * width + nx
+                    if 0 <= nx < width and 0 <= ny < height and labels[index] == -1 and self.state[index] == FREE:
+                        labels[index] = count
+                        stack.append((nx, ny))
+            sums.append(total)
+            count += 1
+        self.compartment_count = count
+
+        # Chaque tuile bloquée garde son propre numéro, fusionné le jour où elle se libère
+        for index, state in enumerate(self.state):
+            if state != FREE:
+                labels[index] = count
+                sums.append([float(index % width), float(index // width), 0])
+                count += 1
+        self.labels = labels
+        self.parent = list(range(count))
+        self.sums = sums
+        self._edges: Optional[Dict[Tuple[int, int], List[Tuple[int, int]]]] = None
+        self._masks: Dict[int, bytearray] = {}
+        self._reachable: Dict[object, Set[int]] = {} # Par bâtiment, jusqu'au prochain changement
+
+    def find(self, label: int) -> int:
+        """Compartiment courant d'un numéro de remplissage (racine union-find)"""
+        parent = self.parent
+        while parent[label] != label:
+            parent[label] = parent[parent[label]]
+            label = parent[label]
+        return label
+
+    def _union(self, a: int, b: int) -> int:
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return a
+        if b < a:
+            a, b = b, a
+        self.parent[b] = a
+        for i in range(3):
+            self.sums[a][i] += self.sums[b][i]
+        return a
+
+    def _release(self, index: int) -> None:
+        """Met à jour une tuile dont un obstacle est tombé; une tuile libérée relie ses voisines"""
+        state = self._tile_state(index)
+        if state == self.state[index]:
+            return
+        self.state[index] = state
+        if state != FREE:
+            return
+        x, y = index % self.width, index // self.width
+        label = self.labels[index]
+        self.sums[self.find(label)][2] += 1
+        for dx, dy in NEIGHBORS_8:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < self.width and 0 <= ny < self.height and self.state[ny * self.width + nx] == FREE:
+                label = self._union(label, self.labels[ny * self.width + nx])
+
+    def sync(self) -> bool:
+        """Prend en compte les obstacles tombés depuis le dernier appel; retourne True si le graphe a changé"""
+        if any(not obstacle.is_destroyed for obstacle in self.fallen):
+            self._build()
+            return True
+        fallen = [obstacle for obstacle in self.standing if obstacle.is_destroyed]
+        if not fallen:
+            return False
+        self.standing = [obstacle for obstacle in self.standing if not obstacle.is_destroyed]
+        self.fallen.extend(fallen)
+        for obstacle in fallen:
+            for index in self.tiles_of[obstacle]:
+                self._release(index)
+        self._edges = None
+        self._masks.clear()
+        self._reachable.clear()
+        return True
+
+    def compartment_at(self, x: float, y: float) -> Optional[int]:
+        """Compartiment d'une position (None sur un obstacle debout ou hors de la carte)"""
+        tile_x, tile_y = int(x / TILE_SIZE), int(y / TILE_SIZE)
+        if not (0 <= x and 0 <= y and tile_x < self.width and tile_y < self.height):
+            return None
+        index = tile_y * self.width + tile_x
+        return self.find(self.labels[index]) if self.state[index] == FREE else None
+
+    def compartments_around(self, tile: Tuple[int, int]) -> Set[int]:
+        """Compartiment de la tuile si elle est libre, sinon ceux de ses voisines libres"""
+        x, y = tile
+        if 0 <= x < self.width and 0 <= y < self.height and self.state[y * self.width + x] == FREE:
+            return {self.find(self.labels[y * self.width + x])}
+        around = set()
+        for dx, dy in NEIGHBORS_8:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < self.width and 0 <= ny < self.height and self.state[ny * self.width + nx] == FREE:
+                around.add(self.find(self.labels[ny * self.width + nx]))
+        return around
+
+    def compartments_of(self, building) -> Set[int]:
+        """Compartiments d'où un bâtiment est atteignable (ceux qui touchent sa hitbox)"""
+        around = self._reachable.get(building)
+        if around is None:
+            around = set()
+            for index in self.tiles_of.get(building, ()):
+                around |= self.compartments_around((index % self.width, index // self.width))
+            self._reachable[building] = around
+        return around
+
+    @property
+    def edges(self) -> Dict[Tuple[int, int], List[Tuple[int, int]]]:
+        """Graphe des compartiments: (a, b) avec a < b -> murs debout qui touchent a et b"""
+        if self._edges is None:
+            edges: Dict[Tuple[int, int], List[Tuple[int, int]]] = {}
+            for index, state in enumerate(self.state):
+                if state != WALL:
+                    continue
+                tile = (index % self.width, index // self.width)
+                ordered = sorted(self.compartments_around(tile))
+                for i, a in enumerate(ordered):
+                    for b in ordered[i + 1:]:
+                        edges.setdefault((a, b), []).append(tile)
+            self._edges = edges
+        return self._edges
+
+    def compartments(self) -> List[int]:
+        """Compartiments courants (les fusionnés n'apparaissent qu'une fois)"""
+        return sorted({self.find(self.labels[index]) for index, state in enumerate(self.state) if state == FREE})
+
+    def neighbors(self, compartment: int) -> List[int]:
+        """Compartiments séparés de `compartment` par au moins un mur"""
+        return sorted({b if a == compartment else a for a, b in self.edges if compartment in (a, b)})
+
+    def centroid(self, compartment: int) -> Tuple[float, float]:
+        total_x, total_y, count = self.sums[compartment]
+        return (total_x / count, total_y / count) if count else (total_x, total_y)
+
+    def route(self, start: int, goal: int, wall_cost: float) -> Optional[List[int]]:
+        """Suite de compartiments de `start` à `goal` (Dijkstra sur le graphe des murs).
+
+        Traverser un mur coûte `wall_cost` plus la distance entre les centres des
+        deux compartiments. Retourne None si aucun mur ne les relie.
+        """
+        adjacency: Dict[int, List[int]] = {}
+        for a, b in self.edges:
+            adjacency.setdefault(a, []).append(b)
+            adjacency.setdefault(b, []).append(a)
+        best = {start: 0.0}
+        previous: Dict[int, int] = {}
+        queue = [(0.0, start)]
+        while queue:
+            cost, compartment = heapq.heappop(queue)
+            if compartment == goal:
+                route = [goal]
+                while route[-1] != start:
+                    route.append(previous[route[-1]])
+                return route[::-1]
+            if cost > best[compartment]:
+                continue
+            cx, cy = self.centroid(compartment)
+            for other in adjacency.get(compartment, ()):
+                ox, oy = self.centroid(other)
+                new_cost = cost + wall_cost + math.hypot(ox - cx, oy - cy)
+                if new_cost < best.get(other, math.inf):
+                    best[other] = new_cost
+                    previous[other] = compartment
+                    heapq.heappush(queue, (new_cost, other))
+        return None
+
+    def _mask(self, compartment: int) -> bytearray:
+        """Tuiles libres d'un compartiment (1 = autorisée)"""
+        mask = self._masks.get(compartment)
+        if mask is None:
+            find, labels = self.find, self.labels
+            mask = bytearray(state == FREE and find(labels[index]) == compartment
+                             for index, state in enumerate(self.state))
+            self._masks[compartment] = mask
+        return mask
+
+    def _hop(self, wall: Tuple[int, int]) -> bytearray:
+        """Masque réduit à la tuile d'un mur: la traversée du mur est un pas imposé"""
+        mask = bytearray(self.width * self.height)
+        mask[wall[1] * self.width + wall[0]] = 1
+        return mask
+
+    def plan(self, start_tile: Tuple[int, int], goal_tile: Tuple[int, int],
+             wall_cost: float) -> Optional[List[Tuple[Tuple[int, int], bytearray]]]:
+        """Étapes d'une recherche hiérarchique de start_tile à goal_tile (tuile libre).
+
+        La route est d'abord cherchée sur le graphe des compartiments. Pour chaque mur
+        à percer (celui de l'arête qui minimise le détour), une recherche locale mène,
+        sans sortir du compartiment, à la tuile libre collée au mur, puis un pas entre
+        dans le mur; la dernière étape va jusqu'à goal_tile. Retourne
+        [(tuile visée, tuiles autorisées)], ou None si une des tuiles n'est dans aucun
+        compartiment ou si aucune route n'existe.
+        """
+        self.sync()
+        goal = self.compartment_at(goal_tile[0] + 0.5, goal_tile[1] + 0.5)
+        # Une troupe qui attaque peut se tenir dans la hitbox de sa cible: compartiments voisins
+        starts = self.compartments_around(start_tile)
+        if goal is None or not starts:
+            return None
+        if goal in starts:
+            route = [goal]
+        else:
+            routes = [route for route in (self.route(start, goal, wall_cost) for start in sorted(starts)) if route]
+            if not routes:
+                return None
+            route = min(routes, key=len)
+        legs = []
+        x, y = start_tile
+        for i, (a, b) in enumerate(zip(route, route[1:])):
+            next_x, next_y = goal_tile if i == len(route) - 2 else self.centroid(route[i + 2])
+            wall = min(self.edges[(min(a, b), max(a, b))],
+                       key=lambda w: math.hypot(w[0] - x, w[1] - y) + math.hypot(next_x - w[0], next_y - w[1]))
+            mask = self._mask(a)
+            approach = min(((wall[0] + dx, wall[1] + dy) for dx, dy in NEIGHBORS_8
+                            if 0 <= wall[0] + dx < self.width and 0 <= wall[1] + dy < self.height
+                            and mask[(wall[1] + dy) * self.width + wall[0] + dx]),
+                           key=lambda t: math.hypot(t[0] - x, t[1] - y))
+            legs.append((approach, mask))
+            legs.append((wall, self._hop(wall)))
+            x, y = wall
+        legs.append((goal_tile, self._mask(route[-1])))
+        return legs
+
+    def __repr__(self) -> str:
+        return f"CompartmentMap(compartments={len(self.compartments())}, edges={len(self.edges)})"
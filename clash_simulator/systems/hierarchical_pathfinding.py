@@ -0,0 +1,276 @@
+"""
+Hierarchical pathfinding (HPA*-style) for large grids.
+
+The map is cut into square clusters. Transitions are placed on the borders between
+4-adjacent clusters, and the cost between the transitions of a cluster is precomputed
+with a local Dijkstra. A query only searches the start cluster tile by tile, then the
+abstract graph of transitions; the tile path is rebuilt from the cached Dijkstra trees.
+Step costs are the ones of pathfinding.astar_search: 1 orthogonal, 1.414 * 1.414
+diagonal, times the multiplier of the entered tile (the wall penalty on walls).
+"""
+import heapq
+from typing import Dict, List, Optional, Tuple
+
+DIAGONAL_COST = 1.414 * 1.414
+NEIGHBORS_8 = ((0, 1), (0, -1), (1, 0), (-1, 0), (1, 1), (1, -1), (-1, 1), (-1, -1))
+
+# Transition runs at least this long get one transition at each end instead of one in the middle
+LONG_ENTRANCE = 6
+
+
+def tile_costs(grid: List[List[int]], wall_multiplier: float, troop_is_flying: bool) -> List[Optional[float]]:
+    """Flat list (indexed y * width + x) of the multiplier of each tile, None when not walkable."""
+    if troop_is_flying:
+        return [1.0] * (len(grid) * len(grid[0]))
+    by_value = (1.0, None, wall_multiplier)
+    return [by_value[cell] for row in grid for cell in row]
+
+
+class ClusterGraph:
+    """Abstract graph of cluster transitions for one map size and one traversal profile."""
+
+    def __init__(self, width: int, height: int, cluster_size: int, wall_multiplier: float, troop_is_flying: bool):
+        if cluster_size < 2:
+            raise ValueError(f"cluster_size doit valoir au moins 2 (reçu {cluster_size})")
+        self.width, self.height = width, height
+        self.cluster_size = cluster_size
+        self.wall_multiplier = wall_multiplier
+        self.troop_is_flying = troop_is_flying
+        self.columns = (width + cluster_size - 1) // cluster_size
+        self.rows = (height + cluster_size - 1) // cluster_size
+        # Admissible heuristic scale: cheapest multiplier of any tile
+        self.min_multiplier = min(1.0, wall_multiplier)
+
+        self.costs: Optional[List[Optional[float]]] = None
+        self.transitions: Dict[Tuple[int, int], List[Tuple[int, int]]] = {} # border -> [(tile_a, tile_b)]
+        self.nodes: Dict[int, List[int]] = {} # cluster -> transition tiles
+        self.links: Dict[int, List[int]] = {} # tile -> transition tiles across the border
+        self.trees: Dict[int, Tuple[Dict[int, float], Dict[int, int]]] = {} # tile -> (dist, parent) in its cluster
+        self.expanded = 0 # Nodes expanded by the last update() or find()
+        self.rebuilt_clusters = 0 # Clusters recomputed by the last update()
+
+    # --- Layout ---
+
+    def cluster_of(self, tile: int) -> int:
+        x, y = tile % self.width, tile // self.width
+        return (y // self.cluster_size) * self.columns + x // self.cluster_size
+
+    def _bounds(self, cluster: int) -> Tuple[int, int, int, int]:
+        cx, cy = cluster % self.columns, cluster // self.columns
+        x0, y0 = cx * self.cluster_size, cy * self.cluster_size
+        return x0, y0, min(x0 + self.cluster_size, self.width), min(y0 + self.cluster_size, self.height)
+
+    def _borders(self, cluster: int) -> List[Tuple[int, int]]:
+        """Borders (cluster, cluster to the right or below) touching a cluster."""
+        cx, cy = cluster % self.columns, cluster // self.columns
+        borders = []
+        if cx > 0:
+            borders.append((cluster - 1, cluster))
+        if cx < self.columns - 1:
+            borders.append((cluster, cluster + 1))
+        if cy > 0:
+            borders.append((cluster - self.columns, cluster))
+        if cy < self.rows - 1:
+            borders.append((cluster, cluster + self.columns))
+        return borders
+
+    def _cluster_changed(self, cluster: int, costs: List[Optional[float]]) -> bool:
+        x0, y0, x1, y1 = self._bounds(cluster)
+        for y in range(y0, y1):
+            start, end = y * self.width + x0, y * self.width + x1
+            if costs[start:end] != self.costs[start:end]:
+                return True
+        return False
+
+    # --- Construction ---
+
+    def _border_transitions(self, border: Tuple[int, int]) -> List[Tuple[int, int]]:
+        """Transitions of a border: one per run of open tile pairs with the same cost."""
+        first, second = border
+        x0, y0, x1, y1 = self._bounds(first)
+        if second == first + 1: # Vertical border between columns x1 - 1 and x1
+            pairs = [(y * self.width + x1 - 1, y * self.width + x1) for y in range(y0, y1)]
+        else: # Horizontal border between rows y1 - 1 and y1
+            pairs = [((y1 - 1) * self.width + x, y1 * self.width + x) for x in range(x0, x1)]
+
+        transitions = []
+        run: List[Tuple[int, int]] = []
+        run_cost = None
+        for a, b in pairs + [(None, None)]:
+            cost = None if a is None or self.costs[a] is None or self.costs[b] is None else max(self.costs[a], self.costs[b])
+            if run and cost != run_cost:
+                if len(run) < LONG_ENTRANCE:
+                    transitions.append(run[len(run) // 2])
+                else:
+                    transitions.extend((run[0], run[-1]))
+                run = []
+            if cost is not None:
+                run.append((a, b))
+                run_cost = cost
+        return transitions
+
+    def _dijkstra(self, source: int, cluster: int) -> Tuple[Dict[int, float], Dict[int, int]]:
+        """Costs and parents from source to every tile of its cluster reachable inside it."""
+        x0, y0, x1, y1 = self._bounds(cluster)
+        width, costs = self.width, self.costs
+        dist = {source: 0.0}
+        parent: Dict[int, int] = {}
+        heap = [(0.0, source)]
+        while heap:
+            d, tile = heapq.heappop(heap)
+            if d > dist[tile]:
+                continue
+            self.expanded += 1
+            x, y = tile % width, tile // width
+            for dx, dy in NEIGHBORS_8:
+                nx, ny = x + dx, y + dy
+                if not (x0 <= nx < x1 and y0 <= ny < y1):
+                    continue
+                neighbor = ny * width + nx
+                multiplier = costs[neighbor]
+                if multiplier is None:
+                    continue
+                nd = d + (DIAGONAL_COST if dx and dy else 1.0) * multiplier
+                if nd < dist.get(neighbor, float("inf")):
+                    dist[neighbor] = nd
+                    parent[neighbor] = tile
+                    heapq.heappush(heap, (nd, neighbor))
+        return dist, parent
+
+    def update(self, grid: List[List[int]]) -> None:
+        """Brings the graph in line with a pathfinding grid, recomputing only the clusters that changed."""
+        costs = tile_costs(grid, self.wall_multiplier, self.troop_is_flying)
+        self.expanded = self.rebuilt_clusters = 0
+        if costs == self.costs:
+            return
+        if self.costs is None:
+            changed = set(range(self.columns * self.rows))
+        else:
+            changed = {c for c in range(self.columns * self.rows) if self._cluster_changed(c, costs)}
+        self.costs = costs
+
+        borders = {border for cluster in changed for border in self._borders(cluster)}
+        for border in borders:
+            self.transitions[border] = self._border_transitions(border)
+
+        # Clusters whose tiles or transitions changed get new Dijkstra trees
+        stale = set(changed)
+        for cluster in {c for border in borders for c in border}:
+            tiles = sorted({tile for border in self._borders(cluster) for pair in self.transitions.get(border, ())
+                            for tile in pair if self.cluster_of(tile) == cluster})
+            if tiles != self.nodes.get(cluster):
+                stale.add(cluster)
+                self.nodes[cluster] = tiles
+
+        for cluster in stale:
+            for tile in [t for t in self.trees if self.cluster_of(t) == cluster]:
+                del self.trees[tile]
+            for tile in self.nodes[cluster]:
+                self.trees[tile] = self._dijkstra(tile, cluster)
+        self.rebuilt_clusters = len(stale)
+
+        self.links = {}
+        for pairs in self.transitions.values():
+            for a, b in pairs:
+                self.links.setdefault(a, []).append(b)
+                self.links.setdefault(b, []).append(a)
+
+    # --- Queries ---
+
+    def _heuristic(self, tile: int, goal: int) -> float:
+        dx = abs(tile % self.width - goal % self.width)
+        dy = abs(tile // self.width - goal // self.width)
+        return self.min_multiplier * (max(dx, dy) + (DIAGONAL_COST - 1.0) * min(dx, dy))
+
+    @staticmethod
+    def _walk(parent: Dict[int, int], source: int, target: int) -> List[int]:
+        """Tiles after source up to target, following a Dijkstra parent map."""
+        tiles = []
+        while target != source:
+            tiles.append(target)
+            target = parent[target]
+        return tiles[::-1]
+
+    def find(self, start: Tuple[int, int], goal: Tuple[int, int]) -> Optional[List[Tuple[int, int]]]:
+        """
+        Tile path from start to goal over the abstract graph, or None when start and goal share
+        a cluster or no route exists (the caller then runs a plain A*).
+        """
+        self.expanded = 0
+        start_tile = start[1] * self.width + start[0]
+        goal_tile = goal[1] * self.width + goal[0]
+        start_cluster, goal_cluster = self.cluster_of(start_tile), self.cluster_of(goal_tile)
+        if start_cluster == goal_cluster:
+            return None
+
+        start_dist, start_parent = self._dijkstra(start_tile, start_cluster)
+        goal_nodes = {tile for tile in self.nodes.get(goal_cluster, ()) if goal_tile in self.trees[tile][0]}
+        if not goal_nodes:
+            return None
+
+        # A* over transitions; None stands for the goal
+        best: Dict[Optional[int], float] = {}
+        came_from: Dict[Optional[int], Optional[int]] = {}
+        heap: List[Tuple[float, float, int, Optional[int]]] = []
+        counter = 0
+        for tile in self.nodes.get(start_cluster, ()):
+            if tile in start_dist:
+                best[tile] = start_dist[tile]
+                came_from[tile] = None
+                counter += 1
+                heapq.heappush(heap, (start_dist[tile] + self._heuristic(tile, goal_tile), start_dist[tile], counter, tile))
+
+        while heap:
+            _, d, _, tile = heapq.heappop(heap)
+            if d > best[tile]:
+                continue
+            self.expanded += 1
+            if tile is None:
+                break
+            edges = [(other, d + self.costs[other]) for other in self.links.get(tile, ())]
+            dist = self.trees[tile][0]
+            edges += [(other, d + dist[other]) for other in self.nodes[self.cluster_of(tile)]
+                      if other != tile and other in dist]
+            if tile in goal_nodes:
+                edges.append((None, d + dist[goal_tile]))
+            for other, nd in edges:
+                if nd < best.get(other, float("inf")):
+                    best[other] = nd
+                    came_from[other] = tile
+                    counter += 1
+                    h = 0.0 if other is None else self._heuristic(other, goal_tile)
+                    heapq.heappush(heap, (nd + h, nd, counter, other))
+        if None not in best:
+            return None
+
+        # Refinement: cached Dijkstra trees between transitions, the start search for the first leg
+        route = []
+        node = came_from[None]
+        while node is not None:
+            route.append(node)
+            node = came_from[node]
+        route.reverse()
+
+        tiles = [start_tile] + self._walk(start_parent, start_tile, route[0])
+        for previous, node in zip(route, route[1:]):
+            if self.cluster_of(previous) == self.cluster_of(node):
+                tiles += self._walk(self.trees[previous][1], previous, node)
+            else:
+                tiles.append(node)
+        tiles += self._walk(self.trees[route[-1]][1], route[-1], goal_tile)
+        return [(tile % self.width, tile // self.width) for tile in tiles]
+
+
+_GRAPHS: Dict[Tuple[int, int, int, float, bool], ClusterGraph] = {}
+
+
+def get_cluster_graph(grid: List[List[int]], cluster_size: int, wall_multiplier: float,
+                      troop_is_flying: bool) -> ClusterGraph:
+    """Cluster graph of a grid's size and traversal profile (cached per process), updated to the grid."""
+    height, width = len(grid), len(grid[0])
+    key = (width, height, cluster_size, wall_multiplier, troop_is_flying)
+    graph = _GRAPHS.get(key)
+    if graph is None:
+        graph = _GRAPHS[key] = ClusterGraph(width, height, cluster_size, wall_multiplier, troop_is_flying)
+    graph.update(grid)
+    return graph
@@ -0,0 +1,89 @@
+"""
+Regroupement des recherches de chemin d'un tick (PATHFINDING_CONFIG["batch_paths"])
+"""
+from typing import Dict, List, Optional, Tuple
+
+from ..core.config import PATHFINDING_CONFIG
+from .pathfinding import (PATHFINDING_STATS, astar_search, clamp_tile, create_pathfinding_grid, find_path, finish_path,
+                          has_uniform_cost, resolve_end_tile, shared_goal_search, use_cluster_graph, wall_multiplier)
+
+
+class PathRequest:
+    """Chemin demandé par une troupe pendant le tick"""
+
+    def __init__(self, troop, end_pos_world: Tuple[float, float], goal_tile: Optional[Tuple[int, int]]):
+        self.troop = troop
+        self.start_pos_world = (troop.x, troop.y)
+        self.end_pos_world = end_pos_world
+        self.goal_tile = goal_tile
+
+
+class PathBatch:
+    """Demandes de chemin d'un tick, résolues ensemble à la fin de la mise à jour des troupes.
+
+    Les troupes qui doivent recalculer leur chemin s'inscrivent au lieu d'appeler find_path et
+    attendent la fin du tick pour se déplacer. La résolution construit une seule grille par profil
+    (sol ou air) et regroupe les demandes par tuile d'arrivée et par profil de traversée (pénalité
+    de mur). Un groupe dont toutes les troupes partent de la même tuile ne lance qu'un A*, partagé;
+    sinon une seule recherche arrière depuis l'arrivée sert tous les départs (shared_goal_search).
+    Les troupes avec compartiments, les recherches par grappes et la JPS passent par find_path.
+    """
+
+    def __init__(self):
+        self.requests: Dict[object, PathRequest] = {} # Par troupe, dans l'ordre des demandes
+
+    def __len__(self) -> int:
+        return len(self.requests)
+
+    def request(self, troop, end_pos_world: Tuple[float, float], goal_tile: Optional[Tuple[int, int]]) -> None:
+        """Inscrit (ou remplace) la demande de chemin d'une troupe"""
+        self.requests[troop] = PathRequest(troop, end_pos_world, goal_tile)
+
+    def is_pending(self, troop) -> bool:
+        return troop in self.requests
+
+    def resolve(self, buildings: List, walls: List, current_time: float) -> List:
+        """Calcule les chemins demandés, les donne aux troupes et retourne ces troupes (ordre des demandes)"""
+        requests = list(self.requests.values())
+        self.requests = {}
+        grids = {}
+        groups: Dict[Tuple, List[Tuple[PathRequest, Tuple[int, int]]]] = {}
+        for request in requests:
+            troop = request.troop
+            grid = grids.get(troop.is_flying)
+            if grid is None:
+                grid = grids[troop.is_flying] = create_pathfinding_grid(buildings, walls, troop.is_flying)
+            height, width = len(grid), len(grid[0])
+            start_tile = clamp_tile(request.start_pos_world, width, height)
+            end_tile = None
+            if troop.compartments is None and \
+               not (PATHFINDING_CONFIG["jump_point_search"] and has_uniform_cost(grid, troop.is_flying)):
+                end_tile = resolve_end_tile(grid, request.end_pos_world, troop.type, troop.is_flying, request.goal_tile)
+                if end_tile is None: # Aucune tuile d'arrivée atteignable
+                    troop.set_path(None, request.end_pos_world, current_time)
+                    continue
+            if end_tile is not None and not use_cluster_graph(width, height, start_tile, end_tile):
+                key = (end_tile, wall_multiplier(troop.type), troop.is_flying)
+                groups.setdefault(key, []).append((request, start_tile))
+            else:
+                path = find_path(request.start_pos_world, request.end_pos_world, buildings, walls, troop.type,
+                                 troop.is_flying, goal_tile=request.goal_tile, compartments=troop.compartments,
+                                 grid=grid)
+                troop.set_path(path, request.end_pos_world, current_time)
+
+        for (end_tile, _, is_flying), members in groups.items():
+            grid = grids[is_flying]
+            troop_type = members[0][0].troop.type
+            starts = list(dict.fromkeys(start_tile for _, start_tile in members))
+            PATHFINDING_STATS["batch_searches"] += 1
+            PATHFINDING_STATS["batched_paths"] += len(members)
+            if len(starts) == 1:
+                grid_paths = {starts[0]: astar_search(grid, starts[0], end_tile, troop_type, is_flying)}
+            else:
+                grid_paths = shared_goal_search(grid, starts, end_tile, troop_type, is_flying)
+            for request, start_tile in members:
+                grid_path = grid_paths[start_tile]
+                path = None if grid_path is None else finish_path(
+                    grid_path, request.start_pos_world, request.end_pos_world, grid, is_flying)
+                request.troop.set_path(path, request.end_pos_world, current_time)
+        return [request.troop for request in requests]
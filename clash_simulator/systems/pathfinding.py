@@ -2,13 +2,36 @@
 Pathfinding module using A* algorithm
 """
 import heapq
-from typing import List, Tuple, Set, Optional
+import math
+from typing import Dict, List, Tuple, Set, Optional
 
 from ..core.config import GRID_SIZE, PATHFINDING_CONFIG, TILE_SIZE
+from .hierarchical_pathfinding import DIAGONAL_COST, get_cluster_graph
 # We'll need BaseLayout to get buildings and walls, but this creates a circular import
 # We'll likely need to pass buildings and walls directly to grid creation function
 # from .base_layout import BaseLayout
 
+# Global counters, read by the benchmark and the tick profiler (cheap integer increments)
+# goal_fallbacks: searches whose goal tile was blocked and needed the 7x7 replacement search
+# compartment_routes: hierarchical searches (compartment route, then local A* legs; see systems/compartments.py)
+# cluster_searches: searches answered by the cluster graph (see systems/hierarchical_pathfinding.py)
+# jump_point_searches: searches on a grid without walls, run with jump point search
+# direct_paths: straight-line paths of flying troops (Troop.calculate_direct_path, no grid)
+# smoothed_waypoints: waypoints removed by line-of-sight smoothing (PATHFINDING_CONFIG["smooth_paths"])
+# batch_searches / batched_paths: grouped searches of a tick and the paths they served (see systems/path_batch.py)
+PATHFINDING_STATS = {"calls": 0, "nodes_expanded": 0, "cache_hits": 0, "goal_fallbacks": 0, "compartment_routes": 0,
+                     "cluster_searches": 0, "jump_point_searches": 0, "direct_paths": 0, "smoothed_waypoints": 0,
+                     "batch_searches": 0, "batched_paths": 0}
+
+
+NEIGHBOR_OFFSETS = ((0, 1), (0, -1), (1, 0), (-1, 0), (1, 1), (1, -1), (-1, 1), (-1, -1))
+
+
+def reset_pathfinding_stats() -> None:
+    """Resets the global pathfinding counters."""
+    for key in PATHFINDING_STATS:
+        PATHFINDING_STATS[key] = 0
+
 
 class Node:
     """Represents a node in the A* pathfinding algorithm."""
@@ -31,33 +54,36 @@ class Node:
         return hash(self.position)
 
 
-def create_pathfinding_grid(buildings: List, walls: List, troop_is_flying: bool) -> List[List[int]]:
+def hitbox_tiles(building, width: int = GRID_SIZE, height: int = GRID_SIZE) -> List[Tuple[int, int]]:
+    """Tiles (x, y) covered by a building's hitbox, gap included, clipped to the grid."""
+    # Buildings are placed at (x, y) tile coordinates
+    # Their hitbox includes a gap
+    x1, y1, x2, y2 = building.get_hitbox()
+
+    # Iterate over the tiles covered by the hitbox
+    # Ensure coordinates are within grid boundaries
+    start_col = max(0, int(x1 / TILE_SIZE))
+    end_col = min(width - 1, int(x2 / TILE_SIZE))
+    start_row = max(0, int(y1 / TILE_SIZE))
+    end_row = min(height - 1, int(y2 / TILE_SIZE))
+    return [(c, r) for r in range(start_row, end_row + 1) for c in range(start_col, end_col + 1)]
+
+
+def create_pathfinding_grid(buildings: List, walls: List, troop_is_flying: bool,
+                            width: int = GRID_SIZE, height: int = GRID_SIZE) -> List[List[int]]:
     """
     Creates a grid representing the map, where:
     0 = walkable
     1 = occupied by building (not wall)
     2 = occupied by wall
     """
-    grid = [[0 for _ in range(GRID_SIZE)] for _ in range(GRID_SIZE)]
+    grid = [[0 for _ in range(width)] for _ in range(height)]
 
     # Mark areas occupied by buildings (excluding walls)
     for building in buildings:
         if building.type != "wall" and not building.is_destroyed:
-            # Buildings are placed at (x, y) tile coordinates
-            # Their hitbox includes a gap
-            x1, y1, x2, y2 = building.get_hitbox()
-            
-            # Iterate over the tiles covered by the hitbox
-            # Ensure coordinates are within grid boundaries
-            start_col = max(0, int(x1 / TILE_SIZE))
-            end_col = min(GRID_SIZE -1, int(x2 / TILE_SIZE))
-            start_row = max(0, int(y1 / TILE_SIZE))
-            end_row = min(GRID_SIZE -1, int(y2 / TILE_SIZE))
-            
-            for r in range(start_row, end_row + 1):
-                for c in range(start_col, end_col + 1):
-                    if 0 <= r < GRID_SIZE and 0 <= c < GRID_SIZE:
-                        grid[r][c] = 1 # Occupied by building
+            for c, r in hitbox_tiles(building, width, height):
+                grid[r][c] = 1 # Occupied by building
 
     # Mark areas occupied by walls (only if troop is not flying)
     if not troop_is_flying:
@@ -65,41 +91,59 @@ def create_pathfinding_grid(buildings: List, walls: List, troop_is_flying: bool)
             if not wall.is_destroyed:
                 # Walls are 1x1
                 wall_x, wall_y = int(wall.x / TILE_SIZE), int(wall.y / TILE_SIZE)
-                if 0 <= wall_x < GRID_SIZE and 0 <= wall_y < GRID_SIZE:
+                if 0 <= wall_x < width and 0 <= wall_y < height:
                     grid[wall_y][wall_x] = 2 # Occupied by wall
     return grid
 
 
+def wall_multiplier(troop_type: str) -> float:
+    """Traversal cost multiplier of a wall tile for a ground troop."""
+    if troop_type == "wall_breaker":
+        return PATHFINDING_CONFIG["wall_penalties"].get(troop_type, 0.1)
+    return PATHFINDING_CONFIG["wall_penalties"].get(troop_type, 15.0)
+
+
+def use_cluster_graph(width: int, height: int, start: Tuple[int, int], end: Tuple[int, int]) -> bool:
+    """Whether a search runs over the cluster graph (PATHFINDING_CONFIG["hierarchical"])."""
+    settings = PATHFINDING_CONFIG["hierarchical"]
+    if max(width, height) >= settings["min_grid_size"]:
+        return True
+    min_distance = settings["min_distance"]
+    return min_distance is not None and max(abs(start[0] - end[0]), abs(start[1] - end[1])) >= min_distance
+
+
 def heuristic(a: Tuple[int, int], b: Tuple[int, int]) -> float:
     """Manhattan distance heuristic for A*."""
     return abs(a[0] - b[0]) + abs(a[1] - b[1])
 
 
-def get_neighbors(node_pos: Tuple[int, int], grid: List[List[int]], troop_type: str, troop_is_flying: bool) -> List[Tuple[Tuple[int, int], float]]:
+def get_neighbors(node_pos: Tuple[int, int], grid: List[List[int]], troop_type: str, troop_is_flying: bool,
+                  allowed: Optional[bytearray] = None) -> List[Tuple[Tuple[int, int], float]]:
     """
     Gets walkable neighbors of a node.
+    allowed optionally restricts the search to tiles flagged 1 (indexed y * width + x).
     Returns a list of ((x, y), cost_multiplier).
     """
+    height, width = len(grid), len(grid[0])
     neighbors = []
     for dx, dy in [(0, 1), (0, -1), (1, 0), (-1, 0), (1, 1), (1, -1), (-1, 1), (-1, -1)]: # 8 directions
         x, y = node_pos[0] + dx, node_pos[1] + dy
 
-        if 0 <= x < GRID_SIZE and 0 <= y < GRID_SIZE:
+        if 0 <= x < width and 0 <= y < height:
+            if allowed is not None and not allowed[y * width + x]:
+                continue
             cost_multiplier = 1.0
             
             if grid[y][x] == 1 and not troop_is_flying: # Building occupied, not walkable for ground
                 continue
             elif grid[y][x] == 2 and not troop_is_flying: # Wall
-                if troop_type == "wall_breaker":
-                    cost_multiplier = PATHFINDING_CONFIG["wall_penalties"].get(troop_type, 0.1)
-                else:
-                    # Troops pathing around walls should have a high cost, but not infinite
-                    # This allows them to eventually break a wall if it's the only option,
-                    # but prefer open paths.
-                    # For A* to choose to go *through* a wall tile, that tile needs to be part of the path.
-                    # The actual "breaking" of the wall is handled by troop attack logic.
-                    # Here, we just assign a high traversal cost.
-                    cost_multiplier = PATHFINDING_CONFIG["wall_penalties"].get(troop_type, 15.0) 
+                # Troops pathing around walls should have a high cost, but not infinite
+                # This allows them to eventually break a wall if it's the only option,
+                # but prefer open paths.
+                # For A* to choose to go *through* a wall tile, that tile needs to be part of the path.
+                # The actual "breaking" of the wall is handled by troop attack logic.
+                # Here, we just assign a high traversal cost (low for wall breakers).
+                cost_multiplier = wall_multiplier(troop_type)
             
             # Diagonal movement cost is higher (sqrt(2) ~ 1.414)
             move_cost = 1.414 if abs(dx) == 1 and abs(dy) == 1 else 1.0
@@ -108,6 +152,15 @@ def get_neighbors(node_pos: Tuple[int, int], grid: List[List[int]], troop_type:
     return neighbors
 
 
+def path_cost(grid: List[List[int]], tiles: List[Tuple[int, int]], troop_type: str, troop_is_flying: bool) -> float:
+    """Cost of a tile path with the step costs of astar_search (base cost times get_neighbors multiplier)."""
+    total = 0.0
+    for a, b in zip(tiles, tiles[1:]):
+        multiplier = dict(get_neighbors(a, grid, troop_type, troop_is_flying))[b]
+        total += (1.414 if a[0] != b[0] and a[1] != b[1] else 1.0) * multiplier
+    return total
+
+
 def reconstruct_path(current_node: Node) -> List[Tuple[int, int]]:
     """Reconstructs the path from the end node to the start node."""
     path = []
@@ -117,62 +170,11 @@ def reconstruct_path(current_node: Node) -> List[Tuple[int, int]]:
     return path[::-1] # Return reversed path
 
 
-def find_path(
-    start_pos_world: Tuple[float, float], 
-    end_pos_world: Tuple[float, float], 
-    buildings: List, 
-    walls: List, 
-    troop_type: str, 
-    troop_is_flying: bool
-) -> Optional[List[Tuple[float, float]]]:
-    """
-    A* pathfinding algorithm.
-    Takes world coordinates, converts them to grid coordinates.
-    Returns a list of world coordinates for the path, or None if no path is found.
-    """
-    start_node_pos = (int(start_pos_world[0] / TILE_SIZE), int(start_pos_world[1] / TILE_SIZE))
-    end_node_pos = (int(end_pos_world[0] / TILE_SIZE), int(end_pos_world[1] / TILE_SIZE))
-
-    # Ensure start and end are within grid
-    start_node_pos = (max(0, min(start_node_pos[0], GRID_SIZE - 1)), max(0, min(start_node_pos[1], GRID_SIZE - 1)))
-    end_node_pos = (max(0, min(end_node_pos[0], GRID_SIZE - 1)), max(0, min(end_node_pos[1], GRID_SIZE - 1)))
-
-    grid = create_pathfinding_grid(buildings, walls, troop_is_flying)
-
-    # If end node is unwalkable for ground troops (and troop is ground), try to find a nearby walkable tile
-    if not troop_is_flying and grid[end_node_pos[1]][end_node_pos[0]] != 0:
-        original_unwalkable_grid_target = end_node_pos # This is a TUPLE (int,int) of grid coords
-        # end_pos_world is the original TUPLE (float,float) of the desired attack position
-
-        possible_alternatives = [] # List of ( (alt_grid_x, alt_grid_y), distance_sq_to_original_world_target )
-        
-        for dx_offset in range(-3, 4): # Search a 7x7 grid area
-            for dy_offset in range(-3, 4):
-                if dx_offset == 0 and dy_offset == 0:
-                    continue
-                
-                alt_gx, alt_gy = original_unwalkable_grid_target[0] + dx_offset, original_unwalkable_grid_target[1] + dy_offset
-                
-                if 0 <= alt_gx < GRID_SIZE and 0 <= alt_gy < GRID_SIZE and grid[alt_gy][alt_gx] == 0: # If tile is walkable
-                    # Calculate this alternative grid cell's world coordinates (center of tile)
-                    alt_wx = (alt_gx * TILE_SIZE) + (TILE_SIZE / 2.0)
-                    alt_wy = (alt_gy * TILE_SIZE) + (TILE_SIZE / 2.0)
-                    
-                    # Calculate squared distance from this alternative's world pos to the *original desired world attack position*
-                    dist_sq = (alt_wx - end_pos_world[0])**2 + (alt_wy - end_pos_world[1])**2
-                    possible_alternatives.append( ((alt_gx, alt_gy), dist_sq) )
-        
-        if possible_alternatives:
-            possible_alternatives.sort(key=lambda item: item[1]) # Sort by distance squared
-            chosen_alternative_grid_target = possible_alternatives[0][0]
-            # print(f"Pathfinding DEBUG: Original grid target {original_unwalkable_grid_target} (for world target {end_pos_world[0]:.1f},{end_pos_world[1]:.1f}) was unwalkable. New grid target is {chosen_alternative_grid_target} (closest to world target).")
-            end_node_pos = chosen_alternative_grid_target # Update end_node_pos for A*
-        else:
-            # No walkable alternative found within the 7x7 area
-            if not (troop_type == "wall_breaker" and grid[original_unwalkable_grid_target[1]][original_unwalkable_grid_target[0]] == 2) :
-                # print(f"Pathfinding DEBUG: Grid target {original_unwalkable_grid_target} (for world target {end_pos_world[0]:.1f},{end_pos_world[1]:.1f}) unwalkable, no alternative found within 7x7 search radius.")
-                return None
-
+def astar_search(grid: List[List[int]], start_node_pos: Tuple[int, int], end_node_pos: Tuple[int, int],
+                 troop_type: str, troop_is_flying: bool,
+                 allowed: Optional[bytearray] = None) -> Optional[List[Tuple[int, int]]]:
+    """A* over the tile grid (optionally restricted to the tiles flagged in allowed).
+    Returns the list of grid tiles from start to end, or None."""
     open_set = []
     closed_set: Set[Node] = set()
 
@@ -183,48 +185,14 @@ def find_path(
 
     while open_set:
         current_node = heapq.heappop(open_set)
+        PATHFINDING_STATS["nodes_expanded"] += 1
 
-        if current_node.position == end_node.position: # end_node.position is the (possibly alternative) grid cell tile
-            grid_path = reconstruct_path(current_node)
-            # Convert grid path to world coordinates (center of tiles initially)
-            world_path_tile_centers = [((x * TILE_SIZE) + (TILE_SIZE / 2.0), (y * TILE_SIZE) + (TILE_SIZE / 2.0)) for x, y in grid_path]
-
-            if not world_path_tile_centers: 
-                # print("Pathfinding DEBUG: A* found current_node == end_node but path reconstruction failed (empty grid_path)")
-                return None
-
-            # The A* algorithm targets 'end_node.position' (a grid cell).
-            # The troop's ultimate desired world coordinate was 'end_pos_world' (the precise attack spot).
-            last_astar_tile_center_x, last_astar_tile_center_y = world_path_tile_centers[-1]
-            
-            # Calculate squared distance from the center of the last A* grid cell to the precise desired world target.
-            dist_sq_final_hop = (last_astar_tile_center_x - end_pos_world[0])**2 + \
-                                (last_astar_tile_center_y - end_pos_world[1])**2
-
-            # If the center of the last A* tile is very close to the desired world target (e.g., within sqrt(2) * TILE_SIZE),
-            # it implies the troop is in the correct or adjacent tile. Make the final step go to the precise 'end_pos_world'.
-            # Threshold: (1.5 * TILE_SIZE)^2 = 2.25 * TILE_SIZE^2. Since TILE_SIZE=1, this is 2.25.
-            # This covers being in the same tile (dist < 0.5), or an adjacent cardinal (dist < 1.0) or diagonal (dist < 1.414)
-            if dist_sq_final_hop < (1.5 * TILE_SIZE)**2 : # Roughly, if desired world point is in same or adjacent tile as A* end tile
-                final_path_waypoints = []
-                if len(world_path_tile_centers) > 1:
-                    final_path_waypoints.extend(world_path_tile_centers[:-1]) # All but the last tile center
-                
-                # Add the precise world target as the last waypoint.
-                # Ensures that if the start A* tile IS the A* target tile, we still provide a path to the precise world coord.
-                final_path_waypoints.append(end_pos_world) 
-                
-                # print(f"Pathfinding DEBUG: Path ({len(final_path_waypoints)} wp) adjusted to end at precise world target {end_pos_world[0]:.1f},{end_pos_world[1]:.1f}.")
-                return final_path_waypoints
-            else:
-                # If the precise world target is too far from the center of the last A* tile,
-                # something might be off, or the A* couldn't get closer. Path to tile centers for now.
-                # print(f"Pathfinding DEBUG: Path ({len(world_path_tile_centers)} wp) ends at A* tile center {world_path_tile_centers[-1]}. Precise target {end_pos_world[0]:.1f},{end_pos_world[1]:.1f} was too far (dist_sq={dist_sq_final_hop:.1f}).")
-                return world_path_tile_centers
+        if current_node.position == end_node.position:
+            return reconstruct_path(current_node)
 
         closed_set.add(current_node)
 
-        for neighbor_pos, move_cost_multiplier in get_neighbors(current_node.position, grid, troop_type, troop_is_flying):
+        for neighbor_pos, move_cost_multiplier in get_neighbors(current_node.position, grid, troop_type, troop_is_flying, allowed):
             neighbor_node = Node(neighbor_pos, current_node)
 
             if neighbor_node in closed_set:
@@ -259,5 +227,436 @@ def find_path(
             
             heapq.heappush(open_set, neighbor_node)
             
-    # print(f"Pathfinding: No path found from {start_node_pos} to {end_node_pos} for {troop_type}")
-    return None 
\ No newline at end of file
+    return None
+
+
+def has_uniform_cost(grid: List[List[int]], troop_is_flying: bool) -> bool:
+    """True when every walkable tile costs the same (no wall on the grid, or a flying troop)."""
+    return troop_is_flying or not any(2 in row for row in grid)
+
+
+def _jump(grid: List[List[int]], position: Tuple[int, int], direction: Tuple[int, int],
+          end: Tuple[int, int], troop_is_flying: bool) -> Optional[Tuple[int, int]]:
+    """Follows direction from position until the goal, a forced neighbor or an obstacle.
+    Returns the jump point reached, or None."""
+    height, width = len(grid), len(grid[0])
+
+    def walkable(x: int, y: int) -> bool:
+        return 0 <= x < width and 0 <= y < height and (troop_is_flying or grid[y][x] == 0)
+
+    x, y = position
+    dx, dy = direction
+    while True:
+        x, y = x + dx, y + dy
+        if not walkable(x, y):
+            return None
+        if (x, y) == end:
+            return x, y
+        if dx and dy:
+            # Diagonal move: forced neighbors behind the obstacles, then a straight jump on each axis
+            if (not walkable(x - dx, y) and walkable(x - dx, y + dy)) or \
+               (not walkable(x, y - dy) and walkable(x + dx, y - dy)):
+                return x, y
+            if _jump(grid, (x, y), (dx, 0), end, troop_is_flying) or _jump(grid, (x, y), (0, dy), end, troop_is_flying):
+                return x, y
+        elif dx:
+            if (not walkable(x, y + 1) and walkable(x + dx, y + 1)) or \
+               (not walkable(x, y - 1) and walkable(x + dx, y - 1)):
+                return x, y
+        elif (not walkable(x + 1, y) and walkable(x + 1, y + dy)) or \
+             (not walkable(x - 1, y) and walkable(x - 1, y + dy)):
+            return x, y
+
+
+def _pruned_directions(grid: List[List[int]], position: Tuple[int, int], parent: Optional[Tuple[int, int]],
+                       troop_is_flying: bool) -> List[Tuple[int, int]]:
+    """Directions left to explore from a jump point: natural neighbors plus forced ones."""
+    if parent is None:
+        return [(0, 1), (0, -1), (1, 0), (-1, 0), (1, 1), (1, -1), (-1, 1), (-1, -1)]
+    height, width = len(grid), len(grid[0])
+    x, y = position
+    dx = (x > parent[0]) - (x < parent[0])
+    dy = (y > parent[1]) - (y < parent[1])
+
+    def blocked(bx: int, by: int) -> bool:
+        return not (0 <= bx < width and 0 <= by < height and (troop_is_flying or grid[by][bx] == 0))
+
+    if dx and dy:
+        directions = [(dx, dy), (dx, 0), (0, dy)]
+        if blocked(x - dx, y):
+            directions.append((-dx, dy))
+        if blocked(x, y - dy):
+            directions.append((dx, -dy))
+    elif dx:
+        directions = [(dx, 0)] + [(dx, side) for side in (1, -1) if blocked(x, y + side)]
+    else:
+        directions = [(0, dy)] + [(side, dy) for side in (1, -1) if blocked(x + side, y)]
+    return directions
+
+
+def jump_point_search(grid: List[List[int]], start_node_pos: Tuple[int, int], end_node_pos: Tuple[int, int],
+                      troop_is_flying: bool) -> Optional[List[Tuple[int, int]]]:
+    """
+    Jump point search over a grid where every walkable tile costs the same (see has_uniform_cost).
+    Same moves and step costs as astar_search (8 directions, diagonals may cut corners), but
+    straight and diagonal runs are skipped up to the next jump point instead of expanded tile by tile.
+    Returns the list of grid tiles from start to end, or None.
+    """
+    def octile(a: Tuple[int, int]) -> float:
+        dx, dy = abs(a[0] - end_node_pos[0]), abs(a[1] - end_node_pos[1])
+        return max(dx, dy) + (DIAGONAL_COST - 1.0) * min(dx, dy)
+
+    g = {start_node_pos: 0.0}
+    parents = {start_node_pos: None}
+    closed: Set[Tuple[int, int]] = set()
+    open_set = [(octile(start_node_pos), 0, start_node_pos)]
+    counter = 0
+    while open_set:
+        _, _, position = heapq.heappop(open_set)
+        if position in closed:
+            continue
+        closed.add(position)
+        PATHFINDING_STATS["nodes_expanded"] += 1
+        if position == end_node_pos:
+            jump_points = []
+            while position is not None:
+                jump_points.append(position)
+                position = parents[position]
+            jump_points.reverse()
+            # Fill in the tiles of each straight or diagonal run
+            tiles = [jump_points[0]]
+            for target in jump_points[1:]:
+                x, y = tiles[-1]
+                dx = (target[0] > x) - (target[0] < x)
+                dy = (target[1] > y) - (target[1] < y)
+                while (x, y) != target:
+                    x, y = x + dx, y + dy
+                    tiles.append((x, y))
+            return tiles
+
+        for direction in _pruned_directions(grid, position, parents[position], troop_is_flying):
+            jump_point = _jump(grid, position, direction, end_node_pos, troop_is_flying)
+            if jump_point is None or jump_point in closed:
+                continue
+            steps = max(abs(jump_point[0] - position[0]), abs(jump_point[1] - position[1]))
+            tentative_g = g[position] + steps * (DIAGONAL_COST if direction[0] and direction[1] else 1.0)
+            if tentative_g < g.get(jump_point, float("inf")):
+                g[jump_point] = tentative_g
+                parents[jump_point] = position
+                counter += 1
+                heapq.heappush(open_set, (tentative_g + octile(jump_point), counter, jump_point))
+    return None
+
+
+def _to_world_path(grid_path: List[Tuple[int, int]], end_pos_world: Tuple[float, float]) -> Optional[List[Tuple[float, float]]]:
+    """Converts an A* tile path to world waypoints ending on the precise end_pos_world."""
+    # Convert grid path to world coordinates (center of tiles initially)
+    world_path_tile_centers = [((x * TILE_SIZE) + (TILE_SIZE / 2.0), (y * TILE_SIZE) + (TILE_SIZE / 2.0)) for x, y in grid_path]
+
+    if not world_path_tile_centers: 
+        # print("Pathfinding DEBUG: A* found current_node == end_node but path reconstruction failed (empty grid_path)")
+        return None
+
+    # The A* algorithm targets 'end_node.position' (a grid cell).
+    # The troop's ultimate desired world coordinate was 'end_pos_world' (the precise attack spot).
+    last_astar_tile_center_x, last_astar_tile_center_y = world_path_tile_centers[-1]
+
+    # Calculate squared distance from the center of the last A* grid cell to the precise desired world target.
+    dist_sq_final_hop = (last_astar_tile_center_x - end_pos_world[0])**2 + \
+                        (last_astar_tile_center_y - end_pos_world[1])**2
+
+    # If the center of the last A* tile is very close to the desired world target (e.g., within sqrt(2) * TILE_SIZE),
+    # it implies the troop is in the correct or adjacent tile. Make the final step go to the precise 'end_pos_world'.
+    # Threshold: (1.5 * TILE_SIZE)^2 = 2.25 * TILE_SIZE^2. Since TILE_SIZE=1, this is 2.25.
+    # This covers being in the same tile (dist < 0.5), or an adjacent cardinal (dist < 1.0) or diagonal (dist < 1.414)
+    if dist_sq_final_hop < (1.5 * TILE_SIZE)**2 : # Roughly, if desired world point is in same or adjacent tile as A* end tile
+        final_path_waypoints = []
+        if len(world_path_tile_centers) > 1:
+            final_path_waypoints.extend(world_path_tile_centers[:-1]) # All but the last tile center
+
+        # Add the precise world target as the last waypoint.
+        # Ensures that if the start A* tile IS the A* target tile, we still provide a path to the precise world coord.
+        final_path_waypoints.append(end_pos_world) 
+
+        # print(f"Pathfinding DEBUG: Path ({len(final_path_waypoints)} wp) adjusted to end at precise world target {end_pos_world[0]:.1f},{end_pos_world[1]:.1f}.")
+        return final_path_waypoints
+    else:
+        # If the precise world target is too far from the center of the last A* tile,
+        # something might be off, or the A* couldn't get closer. Path to tile centers for now.
+        # print(f"Pathfinding DEBUG: Path ({len(world_path_tile_centers)} wp) ends at A* tile center {world_path_tile_centers[-1]}. Precise target {end_pos_world[0]:.1f},{end_pos_world[1]:.1f} was too far (dist_sq={dist_sq_final_hop:.1f}).")
+        return world_path_tile_centers
+
+
+def shared_goal_search(grid: List[List[int]], starts: List[Tuple[int, int]], end_node_pos: Tuple[int, int],
+                       troop_type: str, troop_is_flying: bool) -> Dict[Tuple[int, int], Optional[List[Tuple[int, int]]]]:
+    """
+    Paths from several start tiles to one goal tile with a single backward search from the goal.
+    Same moves and step costs as astar_search (entering a tile costs its multiplier). The starts
+    are reached one after the other, nearest first: the open and closed sets are kept between
+    them (only the open set is re-ordered for the next start), so later starts reuse the frontier
+    already explored. The heuristic (octile distance times the cheapest multiplier) is consistent,
+    so every closed tile keeps its optimal cost whatever the start being searched.
+    Returns {start: list of grid tiles from start to goal, or None}.
+    """
+    height, width = len(grid), len(grid[0])
+    wall_cost = wall_multiplier(troop_type)
+    min_multiplier = 1.0 if troop_is_flying else min(1.0, wall_cost)
+
+    def multiplier(x: int, y: int) -> Optional[float]:
+        """Cost multiplier of entering a tile, None if it cannot be entered."""
+        if troop_is_flying or grid[y][x] == 0:
+            return 1.0
+        return wall_cost if grid[y][x] == 2 else None
+
+    def octile(a: Tuple[int, int], b: Tuple[int, int]) -> float:
+        dx, dy = abs(a[0] - b[0]), abs(a[1] - b[1])
+        return min_multiplier * (max(dx, dy) + (DIAGONAL_COST - 1.0) * min(dx, dy))
+
+    paths = {start: None for start in starts}
+    if multiplier(*end_node_pos) is None:
+        return paths
+    start_set = set(starts)
+    g = {end_node_pos: 0.0}
+    next_tile = {end_node_pos: None}
+    closed: Set[Tuple[int, int]] = set()
+    counter = 0
+    for target in sorted(start_set, key=lambda start: octile(start, end_node_pos)):
+        if target not in closed:
+            open_set = []
+            for tile, cost in g.items():
+                if tile not in closed:
+                    counter += 1
+                    open_set.append((cost + octile(tile, target), counter, tile))
+            heapq.heapify(open_set)
+            while open_set:
+                _, _, tile = heapq.heappop(open_set)
+                if tile in closed:
+                    continue
+                closed.add(tile)
+                PATHFINDING_STATS["nodes_expanded"] += 1
+                # Expanded even when it is the target: a closed tile never gets another chance.
+                # A start inside a building is reached but never crossed.
+                entry_cost = multiplier(*tile)
+                for dx, dy in ([] if entry_cost is None else NEIGHBOR_OFFSETS):
+                    x, y = tile[0] + dx, tile[1] + dy
+                    if not (0 <= x < width and 0 <= y < height) or (x, y) in closed:
+                        continue
+                    if multiplier(x, y) is None and (x, y) not in start_set:
+                        continue
+                    tentative_g = g[tile] + (DIAGONAL_COST if dx and dy else 1.0) * entry_cost
+                    if tentative_g < g.get((x, y), float("inf")):
+                        g[(x, y)] = tentative_g
+                        next_tile[(x, y)] = tile
+                        counter += 1
+                        heapq.heappush(open_set, (tentative_g + octile((x, y), target), counter, (x, y)))
+                if tile == target:
+                    break
+        if target in closed:
+            path = []
+            tile = target
+            while tile is not None:
+                path.append(tile)
+                tile = next_tile[tile]
+            paths[target] = path
+    return paths
+
+
+def line_of_sight(grid: List[List[int]], a: Tuple[float, float], b: Tuple[float, float],
+                  troop_is_flying: bool) -> bool:
+    """
+    True when the straight segment a -> b (world coordinates) only crosses walkable tiles,
+    the tiles of a and b excepted. Buildings and walls block the line for ground troops,
+    so a smoothed segment never goes through a wall the path had to cross (or avoid).
+    A segment through a tile corner steps diagonally, like A* diagonals.
+    """
+    if troop_is_flying:
+        return True
+    height, width = len(grid), len(grid[0])
+    x, y = int(a[0] / TILE_SIZE), int(a[1] / TILE_SIZE)
+    end = (int(b[0] / TILE_SIZE), int(b[1] / TILE_SIZE))
+    dx, dy = b[0] - a[0], b[1] - a[1]
+    step_x, step_y = (1 if dx > 0 else -1), (1 if dy > 0 else -1)
+    # Segment parameter t (0 at a, 1 at b) of the next vertical and horizontal tile borders
+    t_max_x = ((x + (step_x > 0)) * TILE_SIZE - a[0]) / dx if dx else math.inf
+    t_max_y = ((y + (step_y > 0)) * TILE_SIZE - a[1]) / dy if dy else math.inf
+    t_delta_x = TILE_SIZE / abs(dx) if dx else math.inf
+    t_delta_y = TILE_SIZE / abs(dy) if dy else math.inf
+    while (x, y) != end and min(t_max_x, t_max_y) < 1.0:
+        if t_max_x < t_max_y:
+            x += step_x
+            t_max_x += t_delta_x
+        elif t_max_y < t_max_x:
+            y += step_y
+            t_max_y += t_delta_y
+        else: # Through a tile corner
+            x, y = x + step_x, y + step_y
+            t_max_x += t_delta_x
+            t_max_y += t_delta_y
+        if (x, y) != end and not (0 <= x < width and 0 <= y < height and grid[y][x] == 0):
+            return False
+    return True
+
+
+def smooth_path(world_path: List[Tuple[float, float]], start_pos_world: Tuple[float, float],
+                grid: List[List[int]], troop_is_flying: bool) -> List[Tuple[float, float]]:
+    """
+    Line-of-sight string pulling: from the troop's position, each waypoint is replaced by
+    the farthest following one still in line of sight (see line_of_sight). Collinear and
+    visible segments collapse into one; the last waypoint is always kept.
+    """
+    smoothed = []
+    anchor = start_pos_world
+    i = 0
+    while i < len(world_path):
+        j = i
+        while j + 1 < len(world_path) and line_of_sight(grid, anchor, world_path[j + 1], troop_is_flying):
+            j += 1
+        smoothed.append(world_path[j])
+        anchor = world_path[j]
+        i = j + 1
+    return smoothed
+
+
+def finish_path(grid_path: List[Tuple[int, int]], start_pos_world: Tuple[float, float],
+                 end_pos_world: Tuple[float, float], grid: List[List[int]],
+                 troop_is_flying: bool) -> Optional[List[Tuple[float, float]]]:
+    """World waypoints of a tile path, smoothed if PATHFINDING_CONFIG["smooth_paths"]."""
+    world_path = _to_world_path(grid_path, end_pos_world)
+    if world_path and PATHFINDING_CONFIG["smooth_paths"]:
+        smoothed = smooth_path(world_path, start_pos_world, grid, troop_is_flying)
+        PATHFINDING_STATS["smoothed_waypoints"] += len(world_path) - len(smoothed)
+        return smoothed
+    return world_path
+
+
+def clamp_tile(pos_world: Tuple[float, float], width: int, height: int) -> Tuple[int, int]:
+    """Grid tile of a world position, clamped to the grid."""
+    tile_x, tile_y = int(pos_world[0] / TILE_SIZE), int(pos_world[1] / TILE_SIZE)
+    return max(0, min(tile_x, width - 1)), max(0, min(tile_y, height - 1))
+
+
+def resolve_end_tile(grid: List[List[int]], end_pos_world: Tuple[float, float], troop_type: str,
+                     troop_is_flying: bool, goal_tile: Optional[Tuple[int, int]] = None) -> Optional[Tuple[int, int]]:
+    """
+    Tile a search should aim for to reach end_pos_world: goal_tile when it is still walkable,
+    else the tile of end_pos_world, replaced for ground troops by the closest walkable tile of
+    the surrounding 7x7 area when it is blocked. Returns None when no tile can be reached.
+    """
+    height, width = len(grid), len(grid[0])
+    end_node_pos = clamp_tile(end_pos_world, width, height)
+    if goal_tile is not None and grid[goal_tile[1]][goal_tile[0]] == 0:
+        end_node_pos = goal_tile
+
+    # If end node is unwalkable for ground troops (and troop is ground), try to find a nearby walkable tile
+    if not troop_is_flying and grid[end_node_pos[1]][end_node_pos[0]] != 0:
+        PATHFINDING_STATS["goal_fallbacks"] += 1
+        original_unwalkable_grid_target = end_node_pos # This is a TUPLE (int,int) of grid coords
+        # end_pos_world is the original TUPLE (float,float) of the desired attack position
+
+        possible_alternatives = [] # List of ( (alt_grid_x, alt_grid_y), distance_sq_to_original_world_target )
+        
+        for dx_offset in range(-3, 4): # Search a 7x7 grid area
+            for dy_offset in range(-3, 4):
+                if dx_offset == 0 and dy_offset == 0:
+                    continue
+                
+                alt_gx, alt_gy = original_unwalkable_grid_target[0] + dx_offset, original_unwalkable_grid_target[1] + dy_offset
+                
+                if 0 <= alt_gx < width and 0 <= alt_gy < height and grid[alt_gy][alt_gx] == 0: # If tile is walkable
+                    # Calculate this alternative grid cell's world coordinates (center of tile)
+                    alt_wx = (alt_gx * TILE_SIZE) + (TILE_SIZE / 2.0)
+                    alt_wy = (alt_gy * TILE_SIZE) + (TILE_SIZE / 2.0)
+                    
+                    # Calculate squared distance from this alternative's world pos to the *original desired world attack position*
+                    dist_sq = (alt_wx - end_pos_world[0])**2 + (alt_wy - end_pos_world[1])**2
+                    possible_alternatives.append( ((alt_gx, alt_gy), dist_sq) )
+        
+        if possible_alternatives:
+            possible_alternatives.sort(key=lambda item: item[1]) # Sort by distance squared
+            chosen_alternative_grid_target = possible_alternatives[0][0]
+            # print(f"Pathfinding DEBUG: Original grid target {original_unwalkable_grid_target} (for world target {end_pos_world[0]:.1f},{end_pos_world[1]:.1f}) was unwalkable. New grid target is {chosen_alternative_grid_target} (closest to world target).")
+            end_node_pos = chosen_alternative_grid_target # Update end_node_pos for A*
+        else:
+            # No walkable alternative found within the 7x7 area
+            if not (troop_type == "wall_breaker" and grid[original_unwalkable_grid_target[1]][original_unwalkable_grid_target[0]] == 2) :
+                # print(f"Pathfinding DEBUG: Grid target {original_unwalkable_grid_target} (for world target {end_pos_world[0]:.1f},{end_pos_world[1]:.1f}) unwalkable, no alternative found within 7x7 search radius.")
+                return None
+    return end_node_pos
+
+
+def find_path(
+    start_pos_world: Tuple[float, float], 
+    end_pos_world: Tuple[float, float], 
+    buildings: List, 
+    walls: List, 
+    troop_type: str, 
+    troop_is_flying: bool,
+    goal_tile: Optional[Tuple[int, int]] = None,
+    compartments=None,
+    grid_size: Optional[Tuple[int, int]] = None,
+    grid: Optional[List[List[int]]] = None
+) -> Optional[List[Tuple[float, float]]]:
+    """
+    A* pathfinding algorithm.
+    Takes world coordinates, converts them to grid coordinates.
+    goal_tile is the walkable tile precomputed for end_pos_world by a compiled base
+    (see base_model.AttackPositions); when it is still walkable, the search for a
+    replacement goal tile is skipped.
+    compartments is the battle's CompartmentMap (PATHFINDING_CONFIG["use_compartments"]):
+    ground searches first route over the compartment graph, then run one local A* per
+    compartment of the route (up to the wall to break, then to the goal), and fall back
+    to the whole grid when a leg fails.
+    grid_size is the (width, height) of the map in tiles (GRID_SIZE by default). On
+    large maps or for long-range queries (PATHFINDING_CONFIG["hierarchical"]), the
+    search runs over a cluster graph first (see hierarchical_pathfinding.py) and falls
+    back to the whole grid when start and goal share a cluster.
+    On a grid without walls (or for flying troops), the whole-grid search is a jump point
+    search (PATHFINDING_CONFIG["jump_point_search"]); weighted wall tiles keep the A*.
+    With PATHFINDING_CONFIG["smooth_paths"], the waypoints are smoothed by line of sight
+    (see smooth_path) before being returned, so the troop caches the smoothed path.
+    grid is an already built pathfinding grid for this troop (shared by the searches of a
+    tick, see systems/path_batch.py); it is built from buildings and walls otherwise.
+    Returns a list of world coordinates for the path, or None if no path is found.
+    """
+    PATHFINDING_STATS["calls"] += 1
+    if grid is None:
+        width, height = grid_size if grid_size is not None else (GRID_SIZE, GRID_SIZE)
+        grid = create_pathfinding_grid(buildings, walls, troop_is_flying, width, height)
+    height, width = len(grid), len(grid[0])
+    start_node_pos = clamp_tile(start_pos_world, width, height)
+    end_node_pos = resolve_end_tile(grid, end_pos_world, troop_type, troop_is_flying, goal_tile)
+    if end_node_pos is None:
+        return None
+
+    if compartments is not None and not troop_is_flying:
+        legs = compartments.plan(start_node_pos, end_node_pos, wall_multiplier(troop_type))
+        if legs is not None:
+            PATHFINDING_STATS["compartment_routes"] += 1
+            grid_path = [start_node_pos]
+            for leg_goal, allowed in legs:
+                leg_path = astar_search(grid, grid_path[-1], leg_goal, troop_type, troop_is_flying, allowed)
+                if leg_path is None:
+                    break
+                grid_path.extend(leg_path[1:])
+            else:
+                return finish_path(grid_path, start_pos_world, end_pos_world, grid, troop_is_flying)
+
+    if use_cluster_graph(width, height, start_node_pos, end_node_pos):
+        graph = get_cluster_graph(grid, PATHFINDING_CONFIG["hierarchical"]["cluster_size"],
+                                  wall_multiplier(troop_type), troop_is_flying)
+        PATHFINDING_STATS["nodes_expanded"] += graph.expanded
+        grid_path = graph.find(start_node_pos, end_node_pos)
+        PATHFINDING_STATS["nodes_expanded"] += graph.expanded
+        if grid_path is not None:
+            PATHFINDING_STATS["cluster_searches"] += 1
+            return finish_path(grid_path, start_pos_world, end_pos_world, grid, troop_is_flying)
+
+    if PATHFINDING_CONFIG["jump_point_search"] and has_uniform_cost(grid, troop_is_flying):
+        PATHFINDING_STATS["jump_point_searches"] += 1
+        grid_path = jump_point_search(grid, start_node_pos, end_node_pos, troop_is_flying)
+    else:
+        grid_path = astar_search(grid, start_node_pos, end_node_pos, troop_type, troop_is_flying)
+    if grid_path is None:
+        # print(f"Pathfinding: No path found from {start_node_pos} to {end_node_pos} for {troop_type}")
+        return None
+    return finish_path(grid_path, start_pos_world, end_pos_world, grid, troop_is_flying)
@@ -0,0 +1,413 @@
+"""
+Enregistrement compact des batailles (images clés + deltas) et relecture par mmap
+"""
+import array
+import bisect
+import json
+import mmap
+import os
+import struct
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from ..core.config import TROOP_STATS, DEFENSE_BUILDINGS
+from ..entities.troop import TroopState
+
+REPLAY_DIRECTORY = "logs/replays" # Répertoire par défaut des replays
+REPLAY_VERSION = 1
+DEFAULT_KEYFRAME_INTERVAL = 100 # Une image clé tous les N frames (accès aléatoire rapide)
+
+# En-tête: magie, version, taille du bloc JSON (tables statiques)
+HEADER_PREFIX = struct.Struct("<4sHI")
+HEADER_MAGIC = b"CCRP"
+# Enregistrement de taille fixe: tick, entité, type, drapeaux, trois valeurs
+RECORD = struct.Struct("<IHBBfff")
+# Pied de fichier: offset de l'index des frames, offset des images clés, nb frames, nb images clés, magie
+TRAILER = struct.Struct("<QQII4s")
+TRAILER_MAGIC = b"CCRE"
+
+# Types d'enregistrement
+FRAME = 0        # Début de frame: a=temps, b=destruction, c=étoiles, flags=état de la bataille
+TROOP_SPAWN = 1  # Nouvelle troupe: flags=type, a=x, b=y, c=niveau
+TROOP = 2        # État d'une troupe: a=x, b=y, c=pv, flags=état
+BUILDING = 3     # État d'un bâtiment: a=pv, flags=détruit
+PROJECTILE = 4   # Projectile en vol (non delta, répété à chaque frame): a=cible x, b=cible y
+TROOP_TARGET = 5 # Cible d'une troupe: a=indice du bâtiment (-1 = aucune)
+
+TROOP_TYPES = list(TROOP_STATS.keys())
+TROOP_STATES = list(TroopState)
+
+
+class TroopView(NamedTuple):
+    """Vue immuable d'une troupe (mêmes attributs que Troop pour l'affichage)"""
+    type: str
+    level: int
+    x: float
+    y: float
+    hp: float
+    max_hp: float
+    state: TroopState
+    target_type: Optional[str] = None
+
+    def is_alive(self) -> bool:
+        return self.hp > 0
+
+
+class BuildingView(NamedTuple):
+    """Vue immuable d'un bâtiment (mêmes attributs que Building pour l'affichage)"""
+    type: str
+    level: int
+    x: int
+    y: int
+    size: int
+    hp: float
+    max_hp: float
+    is_destroyed: bool
+
+
+class BattleFrame(NamedTuple):
+    """Instantané immuable d'une bataille, à afficher sans accès au simulateur"""
+    tick: int
+    time: float
+    battle_duration: float
+    state: str
+    destruction_percentage: float
+    stars: int
+    troops: Tuple[TroopView, ...]
+    buildings: Tuple[BuildingView, ...]
+    projectiles: Tuple[Tuple[float, float], ...]
+
+    @classmethod
+    def from_simulator(cls, simulator) -> 'BattleFrame':
+        """Instantané de l'état courant d'un simulateur (copie, indépendante des ticks suivants)"""
+        troops = tuple(TroopView(t.type, t.level, t.x, t.y, t.hp, t.max_hp, t.state,
+                                 t.target.type if t.target is not None else None)
+                       for t in simulator.troops)
+        buildings = tuple(BuildingView(b.type, b.level, b.x, b.y, b.size, b.hp, b.max_hp, b.is_destroyed)
+                          for b in simulator.base_layout.get_all_buildings())
+        projectiles = [(p.target_x, p.target_y) for p in simulator.projectiles]
+        for building in simulator.base_layout.buildings:
+            projectiles.extend((p['target_x'], p['target_y']) for p in getattr(building, 'projectiles', []))
+        return cls(simulator.current_tick, simulator.current_time, simulator.battle_duration, simulator.state.value,
+                   simulator.base_layout.get_destruction_percentage(), simulator.base_layout.get_stars(),
+                   troops, buildings, tuple(projectiles))
+
+    def get_statistics(self) -> Dict:
+        """Mêmes clés principales que BattleSimulator.get_statistics"""
+        return {
+            'duration': self.time,
+            'state': self.state,
+            'destruction_percentage': self.destruction_percentage,
+            'stars': self.stars,
+            'troops_deployed': len(self.troops),
+            'troops_lost': sum(1 for t in self.troops if not t.is_alive()),
+            'buildings_destroyed': sum(1 for b in self.buildings if b.is_destroyed),
+            'defenses_destroyed': sum(1 for b in self.buildings if b.is_destroyed and b.type in DEFENSE_BUILDINGS),
+            'tick_count': self.tick,
+        }
+
+    def get_remaining_time(self) -> float:
+        return max(0, self.battle_duration - self.time)
+
+
+class ReplayRecorder:
+    """Écrit un replay: image clé initiale, puis seulement ce qui change à chaque frame.
+
+    Les enregistrements ont une taille fixe (RECORD, 20 octets); une image clé complète
+    est réécrite tous les keyframe_interval frames pour que la relecture puisse sauter
+    n'importe où sans rejouer tout le début.
+    """
+
+    def __init__(self, path: str, keyframe_interval: int = DEFAULT_KEYFRAME_INTERVAL, flush_bytes: int = 1 << 16):
+        if keyframe_interval < 1:
+            raise ValueError(f"Intervalle d'images clés invalide : {keyframe_interval}")
+        self.path = path
+        self.keyframe_interval = keyframe_interval
+        self.flush_bytes = flush_bytes
+        self._file = None
+        self._records_start = 0
+        self._buffer = bytearray()
+        self._records_written = 0
+        self._frame_offsets = array.array('I') # Premier enregistrement de chaque frame
+        self._keyframes = array.array('I')     # Indices des frames qui sont des images clés
+        self._troops: List[Tuple[float, float, float, int]] = []
+        self._targets: List[int] = []
+        self._building_index: Dict[int, int] = {}
+        self._buildings: List[Tuple[float, bool]] = []
+        self._battle_states: List[str] = []
+        self.closed = False
+
+    def start(self, simulator) -> None:
+        """Écrit l'en-tête (tables statiques) et l'image clé initiale"""
+        buildings = simulator.base_layout.get_all_buildings()
+        self._battle_states = [s.value for s in type(simulator.state)]
+        header = {
+            'version': REPLAY_VERSION,
+            'base_name': simulator.base_layout.name,
+            'tick_rate': simulator.tick_rate,
+            'battle_duration': simulator.battle_duration,
+            'seed': simulator.seed,
+            'troop_types': TROOP_TYPES,
+            'troop_states': [s.value for s in TROOP_STATES],
+            'battle_states': self._battle_states,
+            'buildings': [[b.type, b.level, b.x, b.y, b.size, b.max_hp] for b in buildings],
+        }
+        encoded = json.dumps(header).encode('utf-8')
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self._file = open(self.path, 'wb')
+        self._file.write(HEADER_PREFIX.pack(HEADER_MAGIC, REPLAY_VERSION, len(encoded)))
+        self._file.write(encoded)
+        self._records_start = self._file.tell()
+        self._buildings = [(-1.0, False)] * len(buildings)
+        self._building_index = {id(b): i for i, b in enumerate(buildings)}
+        self.record_frame(simulator)
+
+    def _write(self, tick: int, entity: int, kind: int, flags: int, a: float, b: float = 0.0, c: float = 0.0) -> None:
+        self._buffer += RECORD.pack(tick, entity, kind, flags, a, b, c)
+        self._records_written += 1
+
+    def record_frame(self, simulator) -> None:
+        """Enregistre l'état courant du simulateur (delta par rapport à la frame précédente)"""
+        if self.closed:
+            return
+        frame_index = len(self._frame_offsets)
+        keyframe = frame_index % self.keyframe_interval == 0
+        tick = simulator.current_tick
+        self._frame_offsets.append(self._records_written)
+        if keyframe:
+            self._keyframes.append(frame_index)
+
+        self._write(tick, 0, FRAME, self._battle_states.index(simulator.state.value), simulator.current_time,
+                    simulator.base_layout.get_destruction_percentage(), simulator.base_layout.get_stars())
+
+        for index, troop in enumerate(simulator.troops):
+            state_code = TROOP_STATES.index(troop.state)
+            current = (troop.x, troop.y, troop.hp, state_code)
+            target = self._building_index.get(id(troop.target), -1) if troop.target is not None else -1
+            spawned = index >= len(self._troops)
+            if spawned or keyframe:
+                self._write(tick, index, TROOP_SPAWN, TROOP_TYPES.index(troop.type), troop.x, troop.y, troop.level)
+                if spawned:
+                    self._troops.append(current)
+                    self._targets.append(-1)
+            if spawned or keyframe or self._troops[index] != current:
+                self._write(tick, index, TROOP, state_code, troop.x, troop.y, troop.hp)
+                self._troops[index] = current
+            if spawned or keyframe or self._targets[index] != target:
+                self._write(tick, index, TROOP_TARGET, 0, target)
+                self._targets[index] = target
+
+        for index, building in enumerate(simulator.base_layout.get_all_buildings()):
+            current = (building.hp, building.is_destroyed)
+            if keyframe or self._buildings[index] != current:
+                self._write(tick, index, BUILDING, int(building.is_destroyed), building.hp)
+                self._buildings[index] = current
+
+        for projectile in simulator.projectiles:
+            self._write(tick, 0, PROJECTILE, 0, projectile.target_x, projectile.target_y)
+
+        if len(self._buffer) >= self.flush_bytes:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._buffer and self._file is not None:
+            self._file.write(self._buffer)
+            self._buffer = bytearray()
+
+    def close(self) -> None:
+        """Écrit les index et le pied de fichier; le replay devient lisible"""
+        if self.closed or self._file is None:
+            return
+        self.flush()
+        records_start = self._records_start
+        index_offset = self._file.tell()
+        self._file.write(self._frame_offsets.tobytes())
+        keyframes_offset = self._file.tell()
+        self._file.write(self._keyframes.tobytes())
+        self._file.write(TRAILER.pack(index_offset - records_start, keyframes_offset - records_start,
+                                      len(self._frame_offsets), len(self._keyframes), TRAILER_MAGIC))
+        self._file.close()
+        self.closed = True
+
+
+class _PlaybackState:
+    """État mutable reconstruit en appliquant les enregistrements d'un replay"""
+
+    def __init__(self, reader: 'ReplayReader'):
+        self.reader = reader
+        self.troops: List[Optional[list]] = []
+        self.buildings = [[max_hp, False] for _, _, _, _, _, max_hp in reader.header['buildings']]
+        self.projectiles: List[Tuple[float, float]] = []
+        self.tick = 0
+        self.time = 0.0
+        self.state = ""
+        self.destruction = 0.0
+        self.stars = 0
+
+    def apply(self, records) -> None:
+        self.projectiles = []
+        for tick, entity, kind, flags, a, b, c in records:
+            if kind == TROOP:
+                troop = self.troops[entity]
+                troop[2], troop[3], troop[4], troop[5] = a, b, c, flags
+            elif kind == BUILDING:
+                self.buildings[entity] = [a, bool(flags)]
+            elif kind == TROOP_SPAWN:
+                while len(self.troops) <= entity:
+                    self.troops.append(None)
+                if self.troops[entity] is None:
+                    level = int(c)
+                    troop_type = self.reader.troop_types[flags]
+                    max_hp = TROOP_STATS[troop_type][level]["hp"]
+                    self.troops[entity] = [troop_type, level, a, b, max_hp, 0, max_hp, -1]
+            elif kind == TROOP_TARGET:
+                self.troops[entity][7] = int(a)
+            elif kind == FRAME:
+                self.tick, self.time, self.destruction, self.stars = tick, a, b, int(c)
+                self.state = self.reader.battle_states[flags]
+            elif kind == PROJECTILE:
+                self.projectiles.append((a, b))
+
+    def freeze(self) -> BattleFrame:
+        building_types = [b[0] for b in self.reader.header['buildings']]
+        troops = tuple(TroopView(t[0], t[1], t[2], t[3], t[4], t[6], TROOP_STATES[t[5]],
+                                 building_types[t[7]] if t[7] >= 0 else None)
+                       for t in self.troops if t is not None)
+        buildings = tuple(BuildingView(b_type, level, x, y, size, hp, max_hp, destroyed)
+                          for (b_type, level, x, y, size, max_hp), (hp, destroyed) in zip(self.reader.header['buildings'], self.buildings))
+        return BattleFrame(self.tick, self.time, self.reader.header['battle_duration'], self.state,
+                           self.destruction, self.stars, troops, buildings, tuple(self.projectiles))
+
+
+class ReplayReader:
+    """Relecture d'un replay par projection mémoire (mmap): accès direct à n'importe quelle frame"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"Replay vide ou illisible : {path}")
+
+        magic, version, header_size = HEADER_PREFIX.unpack_from(self._mm, 0)
+        if magic != HEADER_MAGIC or version != REPLAY_VERSION:
+            self.close()
+            raise ValueError(f"Fichier de replay invalide ou version non supportée : {path}")
+        header_start = HEADER_PREFIX.size
+        self.header = json.loads(self._mm[header_start:header_start + header_size].decode('utf-8'))
+        self._records_start = header_start + header_size
+
+        if len(self._mm) < self._records_start + TRAILER.size:
+            self.close()
+            raise ValueError(f"Replay incomplet (bataille interrompue ?) : {path}")
+        index_offset, keyframes_offset, frame_count, keyframe_count, trailer_magic = TRAILER.unpack_from(self._mm, len(self._mm) - TRAILER.size)
+        if trailer_magic != TRAILER_MAGIC:
+            self.close()
+            raise ValueError(f"Replay incomplet (bataille interrompue ?) : {path}")
+
+        self.frame_count = frame_count
+        self._frame_offsets = array.array('I')
+        start = self._records_start + index_offset
+        self._frame_offsets.frombytes(self._mm[start:start + 4 * frame_count])
+        self._frame_offsets.append(index_offset // RECORD.size) # Sentinelle: fin des enregistrements
+        self._keyframes = array.array('I')
+        start = self._records_start + keyframes_offset
+        self._keyframes.frombytes(self._mm[start:start + 4 * keyframe_count])
+
+        self.troop_types = self.header['troop_types']
+        self.battle_states = self.header['battle_states']
+
+    def _frame_records(self, frame: int):
+        start = self._records_start + self._frame_offsets[frame] * RECORD.size
+        end = self._records_start + self._frame_offsets[frame + 1] * RECORD.size
+        return RECORD.iter_unpack(self._mm[start:end])
+
+    def frame_at(self, frame: int) -> BattleFrame:
+        """Reconstruit la frame demandée depuis l'image clé précédente"""
+        if not 0 <= frame < self.frame_count:
+            raise ValueError(f"Frame hors du replay : {frame} (0..{self.frame_count - 1})")
+        keyframe = self._keyframes[bisect.bisect_right(self._keyframes, frame) - 1]
+        state = _PlaybackState(self)
+        for index in range(keyframe, frame + 1):
+            state.apply(self._frame_records(index))
+        return state.freeze()
+
+    def iter_frames(self, start: int = 0, stop: Optional[int] = None, step: int = 1) -> Iterator[BattleFrame]:
+        """Parcourt les frames dans l'ordre en appliquant les deltas au fil de l'eau"""
+        stop = self.frame_count if stop is None else min(stop, self.frame_count)
+        if start >= stop:
+            return
+        keyframe = self._keyframes[bisect.bisect_right(self._keyframes, start) - 1]
+        state = _PlaybackState(self)
+        for index in range(keyframe, stop):
+            state.apply(self._frame_records(index))
+            if index >= start and (index - start) % step == 0:
+                yield state.freeze()
+
+    def close(self) -> None:
+        if getattr(self, '_mm', None) is not None:
+            self._mm.close()
+            self._mm = None
+        self._file.close()
+
+    def __len__(self) -> int:
+        return self.frame_count
+
+    def __enter__(self) -> 'ReplayReader':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class ReplayPlayer:
+    """Curseur de lecture d'un replay: position, déplacement dans le temps, avance rapide et retour"""
+
+    def __init__(self, reader: ReplayReader):
+        self.reader = reader
+        self.tick_rate = reader.header['tick_rate']
+        self.position = 0
+        self._cached: Optional[Tuple[int, BattleFrame]] = None
+
+    @property
+    def last_position(self) -> int:
+        return len(self.reader) - 1
+
+    def at_end(self) -> bool:
+        return self.position >= self.last_position
+
+    def frame(self) -> BattleFrame:
+        """Frame à la position courante"""
+        if self._cached is None or self._cached[0] != self.position:
+            self._cached = (self.position, self.reader.frame_at(self.position))
+        return self._cached[1]
+
+    def seek(self, position: int) -> BattleFrame:
+        """Va à la frame demandée (bornée au replay)"""
+        self.position = max(0, min(position, self.last_position))
+        return self.frame()
+
+    def seek_time(self, seconds: float) -> BattleFrame:
+        """Va au temps de bataille demandé (la frame i correspond au tick i)"""
+        return self.seek(int(round(seconds * self.tick_rate)))
+
+    def fast_forward(self, seconds: float = 5.0) -> BattleFrame:
+        return self.seek(self.position + int(round(seconds * self.tick_rate)))
+
+    def rewind(self, seconds: float = 5.0) -> BattleFrame:
+        return self.seek(self.position - int(round(seconds * self.tick_rate)))
+
+    def play(self, step: int = 1) -> Iterator[BattleFrame]:
+        """Lecture en avant depuis la position courante, une frame sur `step` (et toujours la dernière)"""
+        step = max(1, step)
+        last = None
+        for offset, frame in enumerate(self.reader.iter_frames(self.position, step=step)):
+            self.position = min(self.position + (step if offset else 0), self.last_position)
+            self._cached = (self.position, frame)
+            last = frame
+            yield frame
+        if last is not None and self.position != self.last_position:
+            yield self.seek(self.last_position)
@@ -0,0 +1,159 @@
+"""
+Bases compilées et résultats de lots en mémoire partagée (workers de BattleRunner.run_batch)
+"""
+import atexit
+import pickle
+import struct
+from collections import OrderedDict
+from multiprocessing import shared_memory
+from typing import List, Optional, Sequence
+
+from .base_model import BaseModel
+
+# En-tête du segment d'un modèle: taille de l'occupation, de la grille d'obstacles, des tables picklées
+MODEL_HEADER = struct.Struct("<III")
+ATTACHED_SEGMENTS = 8 # Segments gardés ouverts par processus (les lots successifs publient de nouveaux segments)
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Ouvre un segment existant. Les workers partagent le resource_tracker du processus
+    principal (fork comme spawn sous POSIX): seul le créateur détruit le segment."""
+    return shared_memory.SharedMemory(name=name)
+
+
+class SharedBaseModel:
+    """Un BaseModel publié une fois dans un segment de mémoire partagée.
+
+    Le segment contient l'occupation et la grille d'obstacles brutes, suivies des
+    tables des bâtiments picklées. Les workers l'ouvrent par son nom (attach_model):
+    les tableaux restent dans le segment (memoryview, sans copie) et les tables ne
+    sont décodées qu'une fois par processus, quel que soit le nombre de tâches.
+    """
+
+    def __init__(self, model: BaseModel):
+        tables = pickle.dumps((model.name, model.width, model.height, model.specs, model.building_count,
+                               model.attack_positions, model.defense_coverage), protocol=pickle.HIGHEST_PROTOCOL)
+        occupancy, obstacles = bytes(model.occupancy), bytes(model.obstacles)
+        header = MODEL_HEADER.pack(len(occupancy), len(obstacles), len(tables))
+        self.segment = shared_memory.SharedMemory(create=True, size=len(header) + len(occupancy) + len(obstacles) + len(tables))
+        self.segment.buf[:len(header)] = header
+        offset = len(header)
+        for block in (occupancy, obstacles, tables):
+            self.segment.buf[offset:offset + len(block)] = block
+            offset += len(block)
+
+    @property
+    def name(self) -> str:
+        return self.segment.name
+
+    def close(self) -> None:
+        """Libère le segment (les workers qui l'ont ouvert gardent leur vue)"""
+        self.segment.close()
+        self.segment.unlink()
+
+    def __enter__(self) -> 'SharedBaseModel':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class SharedResultBuffer:
+    """Tableau partagé de `n_rows` lignes de `n_fields` flottants (une ligne par tâche).
+
+    Les workers écrivent leurs résultats dans leur ligne au lieu de les renvoyer
+    picklés; le processus principal les relit au fur et à mesure.
+    """
+
+    def __init__(self, n_rows: int, n_fields: int, name: Optional[str] = None):
+        self.n_rows = n_rows
+        self.n_fields = n_fields
+        self.row = struct.Struct(f"<{n_fields}d")
+        self.owner = name is None
+        if self.owner:
+            self.segment = shared_memory.SharedMemory(create=True, size=max(1, n_rows * self.row.size))
+        else:
+            self.segment = _attach(name)
+
+    @property
+    def name(self) -> str:
+        return self.segment.name
+
+    def write_row(self, index: int, values: Sequence[float]) -> None:
+        self.row.pack_into(self.segment.buf, index * self.row.size, *values)
+
+    def read_row(self, index: int) -> List[float]:
+        return list(self.row.unpack_from(self.segment.buf, index * self.row.size))
+
+    def close(self) -> None:
+        self.segment.close()
+        if self.owner:
+            self.segment.unlink()
+
+    def __enter__(self) -> 'SharedResultBuffer':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+# Segments ouverts par ce processus: nom -> (segment, modèle ou tampon de résultats)
+_ATTACHED: 'OrderedDict[str, tuple]' = OrderedDict()
+# Segments évincés dont un modèle est encore utilisé: fermés à la sortie du processus
+_LINGERING: List[tuple] = []
+
+
+def _remember(name: str, segment: shared_memory.SharedMemory, value) -> None:
+    _ATTACHED[name] = (segment, value)
+    while len(_ATTACHED) > ATTACHED_SEGMENTS:
+        _, (old_segment, old_value) = _ATTACHED.popitem(last=False)
+        try:
+            old_segment.close()
+        except BufferError:
+            _LINGERING.append((old_segment, old_value))
+
+
+@atexit.register
+def _close_attached() -> None:
+    """Libère les vues des modèles puis ferme les segments (sinon __del__ échoue à la sortie)"""
+    entries = list(_ATTACHED.values()) + _LINGERING
+    _ATTACHED.clear()
+    _LINGERING.clear()
+    for segment, value in entries:
+        if isinstance(value, BaseModel):
+            for view in (value.occupancy, value.obstacles):
+                if isinstance(view, memoryview):
+                    view.release()
+        try:
+            segment.close()
+        except BufferError:
+            pass
+
+
+def attach_model(name: str) -> BaseModel:
+    """Modèle publié par SharedBaseModel, ouvert une seule fois par processus"""
+    entry = _ATTACHED.get(name)
+    if entry is not None:
+        _ATTACHED.move_to_end(name)
+        return entry[1]
+    segment = _attach(name)
+    occupancy_size, obstacles_size, tables_size = MODEL_HEADER.unpack_from(segment.buf)
+    offset = MODEL_HEADER.size
+    occupancy = segment.buf[offset:offset + occupancy_size].toreadonly()
+    obstacles = segment.buf[offset + occupancy_size:offset + occupancy_size + obstacles_size].toreadonly()
+    start = offset + occupancy_size + obstacles_size
+    name_, width, height, specs, building_count, attack_positions, coverage = pickle.loads(segment.buf[start:start + tables_size])
+    model = BaseModel(name_, width, height, specs, building_count, occupancy, obstacles, attack_positions, coverage)
+    _remember(name, segment, model)
+    return model
+
+
+def attach_results(name: str, n_rows: int, n_fields: int) -> SharedResultBuffer:
+    """Tampon de résultats créé par le processus principal, ouvert une seule fois par processus"""
+    entry = _ATTACHED.get(name)
+    if entry is not None:
+        _ATTACHED.move_to_end(name)
+        return entry[1]
+    results = SharedResultBuffer(n_rows, n_fields, name=name)
+    _remember(name, results.segment, results)
+    return results
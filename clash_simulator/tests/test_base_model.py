@@ -0,0 +1,106 @@
+"""
+Tests du modèle de base compilé (BaseModel)
+"""
+import pickle
+
+import pytest
+
+from clash_simulator.data.army_configs import ARMY_CONFIGURATIONS
+from clash_simulator.data.base_configs import get_base_layout_from_config
+from clash_simulator.systems.base_layout import BaseLayout
+from clash_simulator.systems.base_model import BUILDING, WALL
+from clash_simulator.systems.battle_simulator import BattleRunner, BattleSimulator
+from clash_simulator.systems.pathfinding import PATHFINDING_STATS, create_pathfinding_grid, reset_pathfinding_stats
+from clash_simulator.entities.troop_types import create_troop
+
+
+def test_instances_match_validated_layout():
+    """Une instance du modèle est identique à la base chargée et validée, et indépendante des autres"""
+    base = get_base_layout_from_config("Simple TH3 Par Défaut")
+    model = base.compile()
+    first, second = model.instantiate(), model.instantiate()
+
+    assert [(b.type, b.level, b.x, b.y, b.hp) for b in first.get_all_buildings()] == \
+           [(b.type, b.level, b.x, b.y, b.hp) for b in base.get_all_buildings()]
+    assert [[cell is not None for cell in row] for row in first.grid] == \
+           [[cell is not None for cell in row] for row in base.grid]
+    assert first.building_counts == base.building_counts
+    assert first.model is second.model is model
+
+    first.buildings[0].take_damage(100)
+    first.get_defenses()[-1].projectiles.append("obus")
+    assert second.buildings[0].hp == second.buildings[0].max_hp
+    assert second.get_defenses()[-1].projectiles == []
+
+
+def test_model_is_immutable_and_shared():
+    """Le modèle refuse toute modification et n'est copié ni par fork ni par pickle"""
+    base = get_base_layout_from_config("Base Test Minima")
+    model = base.compile()
+    with pytest.raises(AttributeError):
+        model.name = "autre"
+
+    simulator = BattleSimulator(model.instantiate(), [create_troop("barbarian", 1, (1.0, 1.0))], log_to_file=False)
+    simulator.start()
+    assert simulator.fork().base_layout.model is model
+
+    restored = pickle.loads(pickle.dumps(model))
+    assert restored.specs == model.specs and restored.obstacles == model.obstacles
+    assert restored.save_to_dict() == base.save_to_dict()
+
+
+def test_precomputed_tables():
+    """Occupation, grille de pathfinding, positions d'attaque et couverture des défenses"""
+    base = get_base_layout_from_config("Simple TH3 Par Défaut")
+    model = base.compile()
+
+    grid = create_pathfinding_grid(base.buildings, base.walls, False)
+    assert model.obstacles == bytes(cell for row in grid for cell in row)
+    for y in range(model.height):
+        for x in range(model.width):
+            cell = base.grid[y][x]
+            expected = 0 if cell is None else (WALL if cell.type == "wall" else BUILDING)
+            assert model.tile(x, y) == expected
+
+    town_hall = base.buildings[0]
+    assert model.get_attack_positions(0, 0.4).positions == tuple(town_hall.get_attack_positions(0.4))
+
+    coverage = {model.specs[c.index].type: c for c in model.defense_coverage}
+    assert coverage["cannon"].targets_ground and not coverage["cannon"].targets_air
+    assert coverage["archer_tower"].targets_air
+    assert coverage["mortar"].range_min == 4 and not coverage["mortar"].targets_air
+
+
+def test_battles_from_model_match_layout():
+    """Un BaseModel remplace la base dans BattleRunner sans changer les résultats"""
+    base = get_base_layout_from_config("Base Test Minima")
+    army = ARMY_CONFIGURATIONS["Armée Test Minima"]
+    model = base.compile()
+    validated = BaseLayout()
+    validated.load_from_dict(base.save_to_dict())
+    reference = BattleSimulator(validated, [create_troop(*troop) for troop in army], seed=3, log_to_file=False)
+    reference.simulate_battle()
+
+    assert BattleRunner.run_seeded_battle(model, army, seed=3) == reference.get_statistics()
+    assert BattleRunner.run_seeded_battle(base, army, seed=3) == reference.get_statistics()
+    assert BattleRunner.run_batch(model, [(army, 1), (army, 2)]) == BattleRunner.run_batch(base, [(army, 1), (army, 2)])
+
+
+def test_attack_positions_target_walkable_tiles():
+    """Chaque position d'attaque au sol vise une tuile libre: A* ne cherche plus de tuile de remplacement"""
+    base = get_base_layout_from_config("Simple TH3 Par Défaut")
+    model = base.compile()
+    for (index, attack_range), table in model.attack_positions.items():
+        assert set(table.walkable) <= set(table.positions)
+        for goal in table.goals:
+            assert goal is None or model.obstacles[goal[1] * model.width + goal[0]] == 0
+
+    archer_table = model.get_attack_positions(0, 3.5)
+    position, goal = model.closest_attack_position(0, 3.5, 0.0, 0.0)
+    assert position == min(archer_table.walkable, key=lambda p: p[0] ** 2 + p[1] ** 2)
+    assert abs(goal[0] - int(position[0])) <= 3 and abs(goal[1] - int(position[1])) <= 3
+    assert model.get_attack_positions(0, 2.25) is model.get_attack_positions(0, 2.25)
+
+    reset_pathfinding_stats()
+    BattleRunner.run_seeded_battle(model, ARMY_CONFIGURATIONS["Armée Mixte TH3 (Main)"], seed=1)
+    assert PATHFINDING_STATS["calls"] > 0 and PATHFINDING_STATS["goal_fallbacks"] == 0
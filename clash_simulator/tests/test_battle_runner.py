@@ -0,0 +1,96 @@
+"""
+Tests des simulations reproductibles et des comparaisons appariées
+"""
+from clash_simulator.systems.battle_simulator import BattleRunner
+from clash_simulator.data.base_configs import get_base_layout_from_config
+from clash_simulator.data.army_configs import ARMY_CONFIGURATIONS
+from clash_simulator.utils.random_streams import RandomStreams, make_rng
+from clash_simulator.utils.result_cache import ResultCache, battle_key
+from clash_simulator.utils.stats import student_t_quantile
+
+
+def test_antithetic_stream_mirrors_normal_stream():
+    """Le flux antithétique renvoie 1 - u pour chaque tirage du flux normal"""
+    normal = make_rng(42)
+    mirrored = make_rng(42, antithetic=True)
+    for _ in range(10):
+        u = normal.random()
+        assert abs(mirrored.random() - (1.0 - u)) < 1e-12
+
+
+def test_antithetic_stream_mirrors_integer_draws():
+    """choice, randrange et shuffle du flux antithétique tirent l'indice miroir n - 1 - k"""
+    normal = make_rng(1)
+    mirrored = make_rng(1, antithetic=True)
+    items = list(range(10))
+    for _ in range(20):
+        assert normal.choice(items) + mirrored.choice(items) == 9
+        assert normal.randrange(3, 20) + mirrored.randrange(3, 20) == 3 + 19
+    normal_order, mirrored_order = list(range(6)), list(range(6))
+    normal.shuffle(normal_order)
+    mirrored.shuffle(mirrored_order)
+    assert normal_order != mirrored_order
+    assert sorted(mirrored_order) == list(range(6))
+
+
+def test_random_streams_are_reproducible():
+    """Deux distributeurs de même graine produisent les mêmes sous-flux"""
+    first = RandomStreams(7)
+    second = RandomStreams(7)
+    for _ in range(3):
+        assert first.spawn().random() == second.spawn().random()
+
+
+def test_student_t_quantile():
+    """Quelques valeurs de référence de la loi de Student"""
+    assert abs(student_t_quantile(0.975, 1) - 12.706) < 1e-3
+    assert abs(student_t_quantile(0.975, 2) - 4.303) < 1e-3
+    assert abs(student_t_quantile(0.975, 5) - 2.571) < 1e-2
+    assert abs(student_t_quantile(0.975, 30) - 2.042) < 1e-3
+
+
+def test_seeded_battle_is_reproducible():
+    """Même base, même armée, même graine : mêmes statistiques, base modèle intacte"""
+    base = get_base_layout_from_config("Base Test Minima")
+    army = ARMY_CONFIGURATIONS["Petite Armée Custom Battle"]
+
+    first = BattleRunner.run_seeded_battle(base, army, seed=3)
+    second = BattleRunner.run_seeded_battle(base, army, seed=3)
+
+    assert first == second
+    assert not any(b.is_destroyed for b in base.get_all_buildings())
+
+
+def test_paired_comparison_of_identical_armies():
+    """Deux variantes identiques ont une différence nulle avec un intervalle nul"""
+    base = get_base_layout_from_config("Base Test Minima")
+    army = ARMY_CONFIGURATIONS["Armée Test Minima"]
+
+    result = BattleRunner.run_paired_comparison(base, army, list(army), n_pairs=3, antithetic=True)
+
+    assert result['n_pairs'] == 3
+    assert result['mean_difference'] == 0
+    assert result['ci_low'] == result['ci_high'] == 0
+
+
+def test_result_cache_hit_and_eviction(tmp_path):
+    """Une bataille déjà simulée est relue du cache; les entrées anciennes sont évincées"""
+    base = get_base_layout_from_config("Base Test Minima")
+    army = ARMY_CONFIGURATIONS["Armée Test Minima"]
+    cache = ResultCache(str(tmp_path / "results.sqlite"))
+
+    first = BattleRunner.run_batch(base, [(army, 1), (army, 2)], cache=cache)
+    assert cache.misses == 2 and len(cache) == 2
+    second = BattleRunner.run_batch(base, [(army, 1), (army, 2), (army, None)], cache=cache)
+    assert cache.hits == 2 and len(cache) == 2
+    assert second[:2] == first
+
+    key = battle_key(base.save_to_dict(), army, 1)
+    assert key != battle_key(base.save_to_dict(), army, 1, fidelity="coarse")
+    assert BattleRunner.run_seeded_battle(base, army, 1, cache=cache) == first[0]
+
+    small = ResultCache(str(tmp_path / "small.sqlite"), max_size_bytes=1000)
+    for i in range(20):
+        small.put(f"key{i}", first[0])
+    assert small.total_size() <= 1000
+    assert "key19" in small and "key0" not in small
@@ -0,0 +1,19 @@
+"""
+Tests du module de benchmark
+"""
+from clash_simulator.benchmark import compare_to_baseline, run_benchmark
+
+
+def test_benchmark_report_and_regression_check():
+    """Le rapport contient les mesures attendues; un ralentissement est signalé"""
+    report = run_benchmark(["Base Test Minima"], ["Armée Test Minima"], repeat=1, measure_memory=True, verbose=False)
+
+    scenario = report['scenarios'][0]
+    assert scenario['ticks'] > 0 and scenario['ticks_per_second'] > 0
+    assert scenario['astar_calls'] > 0 and scenario['nodes_expanded'] >= scenario['astar_calls']
+    assert scenario['peak_memory_bytes'] > 0
+    assert compare_to_baseline(report, report) == []
+
+    faster_baseline = {'scenarios': [dict(scenario, wall_time=scenario['wall_time'] / 2)]}
+    regressions = compare_to_baseline(report, faster_baseline, threshold=0.1)
+    assert [r['metric'] for r in regressions] == ['wall_time']
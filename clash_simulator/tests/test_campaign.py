@@ -0,0 +1,87 @@
+"""
+Tests des campagnes reprenables (points de reprise)
+"""
+import json
+
+import pytest
+
+from clash_simulator.data.army_configs import ARMY_CONFIGURATIONS
+from clash_simulator.data.base_configs import get_base_layout_from_config
+from clash_simulator.search.campaign import CampaignManager
+from clash_simulator.search.deployment_optimizer import DeploymentOptimizer, composition_from_config
+from clash_simulator.utils.result_sink import ResultSink
+
+
+class InterruptingSink(ResultSink):
+    """Simule un Ctrl-C après `limit` résultats"""
+
+    def __init__(self, limit: int):
+        super().__init__(flush_every=1)
+        self.limit = limit
+        self.received = 0
+
+    def _write_batch(self, records):
+        self.received += len(records)
+        if self.received == self.limit:
+            raise KeyboardInterrupt
+
+
+def _optimizer(base):
+    army = ARMY_CONFIGURATIONS["Armée Test Minima"]
+    return DeploymentOptimizer(base, composition_from_config(army), initial_army=army,
+                               population_size=4, iterations=3, seed=7)
+
+
+def test_interrupted_optimisation_resumes_exactly(tmp_path):
+    """Une campagne interrompue puis reprise donne le même résultat qu'une exécution d'une traite"""
+    base = get_base_layout_from_config("Base Test Minima")
+    reference = CampaignManager(str(tmp_path / "reference.json"), optimizer=_optimizer(base), chunk_size=3).run()
+
+    path = str(tmp_path / "campaign.json")
+    with pytest.raises(KeyboardInterrupt):
+        CampaignManager(path, optimizer=_optimizer(base), chunk_size=3, sink=InterruptingSink(6)).run()
+    with open(path, 'r', encoding='utf-8') as f:
+        checkpoint = json.load(f)
+    assert checkpoint['optimizer']['iteration'] == 1
+    assert sum(result is not None for result in checkpoint['results']) == 2
+
+    resumed = CampaignManager(path, optimizer=_optimizer(base), chunk_size=3).run()
+    assert resumed['resumed'] and resumed['finished']
+    assert resumed['history'] == reference['history']
+    assert resumed['best_army'] == reference['best_army']
+    assert resumed['evaluations'] == reference['evaluations'] == 12
+
+
+def test_task_campaign_keeps_completed_results(tmp_path):
+    """Une campagne de tâches reprend uniquement les batailles manquantes"""
+    base = get_base_layout_from_config("Base Test Minima")
+    army = ARMY_CONFIGURATIONS["Armée Test Minima"]
+    tasks = [(army, seed) for seed in range(5)]
+    path = str(tmp_path / "tasks.json")
+
+    partial = CampaignManager(path, base_layout=base, tasks=tasks, chunk_size=2).run(time_budget=0.0)
+    assert not partial['finished'] and partial['completed'] == 0
+
+    with pytest.raises(KeyboardInterrupt):
+        CampaignManager(path, base_layout=base, tasks=tasks, chunk_size=2, sink=InterruptingSink(3)).run()
+    manager = CampaignManager(path, base_layout=base, tasks=tasks, chunk_size=2)
+    summary = manager.run()
+    assert summary['finished'] and summary['completed'] == 5
+    assert summary['results'] == CampaignManager(str(tmp_path / "ref.json"), base_layout=base, tasks=tasks).run()['results']
+
+    other_tasks = [(army, seed) for seed in range(6)]
+    with pytest.raises(ValueError):
+        CampaignManager(path, base_layout=base, tasks=other_tasks).run()
+
+
+def test_checkpoint_rejects_other_optimizer_settings(tmp_path):
+    """Un point de reprise n'est pas repris par un optimiseur configuré autrement (même composition)"""
+    base = get_base_layout_from_config("Base Test Minima")
+    army = ARMY_CONFIGURATIONS["Armée Test Minima"]
+    path = str(tmp_path / "campaign.json")
+    with pytest.raises(KeyboardInterrupt):
+        CampaignManager(path, optimizer=_optimizer(base), chunk_size=3, sink=InterruptingSink(6)).run()
+    other = DeploymentOptimizer(base, composition_from_config(army), initial_army=army,
+                                population_size=6, iterations=3, seed=7)
+    with pytest.raises(ValueError):
+        CampaignManager(path, optimizer=other, chunk_size=3).run()
@@ -0,0 +1,41 @@
+"""
+Tests de l'interface en ligne de commande
+"""
+import json
+import subprocess
+import sys
+
+from clash_simulator.cli import main
+
+
+def test_run_and_batch_write_results(tmp_path, capsys):
+    """run et batch acceptent des noms de configuration ou des fichiers JSON"""
+    army_file = tmp_path / "army.json"
+    army_file.write_text(json.dumps({"troops": [["barbarian", 1, [2, 2]], ["archer", 1, [3, 2]]]}))
+
+    output = tmp_path / "run.json"
+    assert main(["run", "--base", "Base Test Minima", "--army", str(army_file), "--output", str(output)]) == 0
+    result = json.loads(output.read_text())
+    assert result['army'] == "army"
+    assert result['stats']['troops_deployed'] == 2
+
+    output = tmp_path / "batch.json"
+    assert main(["batch", "--base", "Base Test Minima", "--army", "Armée Test Minima", "--army", str(army_file),
+                 "--repeat", "2", "--seed", "5", "--output", str(output)]) == 0
+    records = json.loads(output.read_text())['results']
+    assert [(r['army'], r['seed']) for r in records] == [
+        ("Armée Test Minima", 5), ("Armée Test Minima", 6), ("army", 5), ("army", 6)]
+
+
+def test_invalid_configuration_is_reported(capsys):
+    """Une configuration inconnue donne un message d'erreur et un code de retour non nul"""
+    assert main(["run", "--army", "inconnue"]) == 2
+    assert "inconnue" in capsys.readouterr().err
+
+
+def test_startup_does_not_import_engine_or_visualization():
+    """Le démarrage de la CLI n'importe ni le moteur, ni la visualisation, ni les démos"""
+    code = ("import sys, clash_simulator.cli; "
+            "print(sorted(m for m in sys.modules if m.startswith('clash_simulator.')))")
+    modules = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    assert modules.strip() == "['clash_simulator.cli']"
@@ -0,0 +1,105 @@
+"""
+Tests des compartiments fermés par les murs (CompartmentMap) et du pathfinding hiérarchique
+"""
+from clash_simulator.core.config import PATHFINDING_CONFIG
+from clash_simulator.data.army_configs import ARMY_CONFIGURATIONS
+from clash_simulator.systems.base_layout import BaseLayout
+from clash_simulator.systems.battle_simulator import BattleRunner
+from clash_simulator.systems.compartments import CompartmentMap
+from clash_simulator.systems.pathfinding import PATHFINDING_STATS, find_path, reset_pathfinding_stats
+
+
+def _walled_base() -> BaseLayout:
+    """Hôtel de ville dans une enceinte, canon dans une seconde enceinte qui partage un côté"""
+    base = BaseLayout("Compartiments")
+    assert base.add_building("town_hall", 3, (19, 19))
+    assert base.add_building("cannon", 3, (26, 20))
+    assert base.add_building("gold_mine", 2, (5, 5))
+    ring = {(x, y) for x in range(17, 26) for y in (17, 25)} | {(x, y) for x in (17, 25) for y in range(17, 26)}
+    ring |= {(x, y) for x in range(25, 31) for y in (19, 23)} | {(30, y) for y in range(19, 24)}
+    for position in sorted(ring):
+        assert base.add_building("wall", 3, position)
+    return base
+
+
+def test_flood_fill_and_wall_graph():
+    """L'enceinte forme un compartiment relié à l'extérieur par ses murs"""
+    base = _walled_base()
+    compartments = base.get_compartments()
+    outside = compartments.compartment_at(0.5, 0.5)
+    inside = compartments.compartment_at(24.5, 24.0)
+    assert outside == 0 and inside not in (None, outside)
+    assert compartments.compartment_at(17.5, 20.5) is None # Mur
+
+    town_hall, cannon, gold_mine = base.buildings
+    assert compartments.compartments_of(town_hall) == {inside}
+    assert compartments.compartments_of(gold_mine) == {outside}
+    # La seconde enceinte est remplie par la hitbox du canon: il s'attaque depuis l'extérieur ou l'enceinte
+    assert compartments.compartments_of(cannon) <= {outside, inside}
+    assert compartments.neighbors(outside) == [inside]
+    assert (20, 25) in compartments.edges[(outside, inside)]
+
+
+def test_graph_follows_destroyed_walls():
+    """Un mur détruit fusionne les compartiments comme un remplissage complet; une base réinitialisée est recalculée"""
+    base = _walled_base()
+    compartments = base.get_compartments()
+    wall = next(w for w in base.walls if (w.x, w.y) == (20, 25))
+    wall.take_damage(wall.max_hp)
+    assert compartments.sync()
+    assert compartments.compartment_at(24.5, 24.0) == compartments.compartment_at(0.5, 0.5)
+    assert compartments.edges == {}
+
+    rebuilt = CompartmentMap(base.buildings, base.walls, 44, 44)
+    assert compartments.compartments() == rebuilt.compartments() == [0]
+    assert not compartments.sync()
+
+    base.reset()
+    assert base.get_compartments() is compartments
+    assert compartments.compartment_at(24.5, 24.0) != compartments.compartment_at(0.5, 0.5)
+
+
+def test_hierarchical_path_crosses_one_wall():
+    """La recherche hiérarchique va au mur par l'extérieur, le traverse et finit dans l'enceinte"""
+    base = _walled_base()
+    compartments = base.get_compartments()
+    legs = compartments.plan((40, 21), (24, 20), PATHFINDING_CONFIG["wall_penalties"]["barbarian"])
+    assert len(legs) == 3 and legs[-1][0] == (24, 20)
+
+    reset_pathfinding_stats()
+    path = find_path((40.5, 21.5), (24.5, 20.5), base.buildings, base.walls, "barbarian", False, compartments=compartments)
+    hierarchical_nodes = PATHFINDING_STATS["nodes_expanded"]
+    assert PATHFINDING_STATS["compartment_routes"] == 1
+    reset_pathfinding_stats()
+    flat = find_path((40.5, 21.5), (24.5, 20.5), base.buildings, base.walls, "barbarian", False)
+    assert path[-1] == flat[-1] == (24.5, 20.5)
+    assert hierarchical_nodes < PATHFINDING_STATS["nodes_expanded"]
+
+
+def test_battle_with_compartments(monkeypatch):
+    """Avec use_compartments, les troupes cherchent par compartiments et la bataille se déroule"""
+    army = ARMY_CONFIGURATIONS["Armée Mixte TH3 (Main)"]
+    monkeypatch.setitem(PATHFINDING_CONFIG, "use_compartments", True)
+    reset_pathfinding_stats()
+    stats = BattleRunner.run_seeded_battle(_walled_base(), army, seed=1)
+    assert PATHFINDING_STATS["compartment_routes"] > 0
+    assert stats["destruction_percentage"] > 0
+    assert BattleRunner.run_seeded_battle(_walled_base(), army, seed=1) == stats
+
+
+def test_forked_battle_keeps_its_own_compartments(monkeypatch):
+    """Une bataille forkée suit ses propres murs: la copie et l'original divergent sans se mélanger"""
+    monkeypatch.setitem(PATHFINDING_CONFIG, "use_compartments", True)
+    army = ARMY_CONFIGURATIONS["Armée Mixte TH3 (Main)"]
+    simulator = BattleRunner.build_battle(_walled_base(), army, seed=2, log_to_file=False)
+    simulator.advance_until(2.0)
+    branch = simulator.fork()
+    assert branch.compartments is not simulator.compartments
+    assert branch.troops[0].compartments is branch.compartments
+
+    wall = next(w for w in branch.base_layout.walls if (w.x, w.y) == (20, 25))
+    wall.take_damage(wall.max_hp)
+    assert branch.compartments.sync() and not simulator.compartments.sync()
+    town_hall = branch.base_layout.buildings[0]
+    assert branch.compartments.compartments_of(town_hall) == {0}
+    assert 0 not in simulator.compartments.compartments_of(simulator.base_layout.buildings[0])
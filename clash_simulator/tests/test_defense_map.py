@@ -0,0 +1,71 @@
+"""
+Tests de la carte de couverture des défenses (BaseModel.coverage_masks et DPS par tuile)
+"""
+from clash_simulator.data.army_configs import ARMY_CONFIGURATIONS
+from clash_simulator.data.base_configs import get_base_layout_from_config
+from clash_simulator.entities.defense_buildings import DefenseBuilding, Mortar
+from clash_simulator.entities.troop_types import create_troop
+from clash_simulator.search.deployment_optimizer import DeploymentOptimizer, composition_from_config
+from clash_simulator.systems.battle_simulator import BattleRunner
+
+
+def test_coverage_mask_is_conservative():
+    """Toute position réellement attaquable par une défense est dans le masque de sa tuile"""
+    base = get_base_layout_from_config("Simple TH3 Par Défaut")
+    model = base.compile()
+    defenses = {defense.model_index: defense for defense in model.instantiate().get_defenses()}
+    troop = create_troop("barbarian", 1, (0.0, 0.0))
+    step = 0.25
+    for i in range(int(model.width / step)):
+        for j in range(int(model.height / step)):
+            troop.x, troop.y = i * step + 0.1, j * step + 0.1
+            for index, defense in defenses.items():
+                # Conditions de DefenseBuilding.find_target (portée) et de Mortar.find_target (zone de tir)
+                reachable = defense.can_target(troop) and (isinstance(defense, Mortar) or defense.is_in_range(troop))
+                if reachable:
+                    assert model.may_be_in_range(index, troop.x, troop.y)
+    assert not all(model.coverage_masks)
+
+
+def test_incoming_dps_map():
+    """Le DPS reçu au centre d'une tuile est la somme des défenses qui l'atteignent"""
+    model = get_base_layout_from_config("Simple TH3 Par Défaut").compile()
+    assert model.incoming_dps(0.5, 0.5) == 0.0
+    assert model.incoming_dps(-3, 5) == 0.0
+    for coverage in model.defense_coverage:
+        spec = model.specs[coverage.index]
+        x, y = spec.x + spec.size + 0.5, spec.y + 0.5
+        expected = sum(c.dps for c in model.defense_coverage if c.targets_ground and c.covers(x, y))
+        assert model.incoming_dps(x, y) == expected
+        assert model.incoming_dps(x, y, flying=True) == sum(
+            c.dps for c in model.defense_coverage if c.targets_air and c.covers(x, y))
+
+    town_hall = model.specs[0].center
+    assert model.path_exposure([(0.0, 0.0), (0.0, 4.0)], speed=1.0) == 0.0
+    assert model.path_exposure([(0.0, 0.0), town_hall], speed=1.0) > model.path_exposure([(0.0, 0.0), town_hall], speed=2.0)
+    assert model.spawn_exposure("barbarian", 1, (0, 0)) >= 0.0
+
+
+def test_battles_unchanged_by_coverage_filter(monkeypatch):
+    """Le filtre des cibles ne change pas les batailles"""
+    base = get_base_layout_from_config("Simple TH3 Par Défaut")
+    army = ARMY_CONFIGURATIONS["Armée Mixte TH3 (Main)"]
+    model = base.compile()
+    filtered = [BattleRunner.run_seeded_battle(model, army, seed=seed) for seed in (1, 2)]
+    monkeypatch.setattr(DefenseBuilding, "troops_in_reach", lambda self, troops: troops)
+    assert filtered == [BattleRunner.run_seeded_battle(model, army, seed=seed) for seed in (1, 2)]
+
+
+def test_optimizer_screens_exposed_candidates():
+    """Avec screen_factor, seuls les candidats les moins exposés sont évalués"""
+    base = get_base_layout_from_config("Base Test Minima")
+    army = ARMY_CONFIGURATIONS["Armée Test Minima"]
+    optimizer = DeploymentOptimizer(base, composition_from_config(army), initial_army=army,
+                                    population_size=3, screen_factor=4, seed=5)
+    unscreened = DeploymentOptimizer(base, composition_from_config(army), initial_army=army,
+                                     population_size=12, seed=5)
+    _, armies, _ = optimizer.ask()
+    _, candidates, _ = unscreened.ask()
+    assert len(armies) == 3
+    exposures = sorted(optimizer.exposure(candidate) for candidate in candidates)
+    assert sorted(optimizer.exposure(army) for army in armies) == exposures[:3]
@@ -0,0 +1,35 @@
+"""
+Tests de l'optimiseur de positions de déploiement
+"""
+from clash_simulator.core.config import TH3_HOUSING_CAPACITY
+from clash_simulator.data.army_configs import ARMY_CONFIGURATIONS
+from clash_simulator.data.base_configs import get_base_layout_from_config
+from clash_simulator.search.deployment_optimizer import (
+    DeploymentOptimizer, composition_from_config, housing_of, optimize_deployment
+)
+
+
+def test_optimizer_returns_army_in_config_format():
+    """La meilleure armée garde la composition et le format (type, niveau, (x, y))"""
+    base = get_base_layout_from_config("Base Test Minima")
+    army = ARMY_CONFIGURATIONS["Armée Test Minima"]
+
+    result = optimize_deployment(base, army, population_size=4, iterations=2, seed=0)
+
+    assert result['iterations'] == 2
+    assert result['evaluations'] == 8
+    assert sorted((t, l) for t, l, _ in result['best_army']) == sorted((t, l) for t, l, _ in army)
+    deployable = set(base.get_deployable_tiles())
+    for _, _, position in result['best_army']:
+        assert position in deployable
+
+
+def test_sampled_counts_respect_housing_capacity():
+    """Les effectifs tirés ne dépassent jamais la capacité des camps"""
+    base = get_base_layout_from_config("Base Test Minima")
+    composition = composition_from_config(ARMY_CONFIGURATIONS["Armée Mixte TH3 (Main)"])
+    optimizer = DeploymentOptimizer(base, composition, optimize_counts=True, seed=1)
+
+    for _ in range(20):
+        army = optimizer.candidate_to_army(optimizer.sample_candidate())
+        assert sum(housing_of(t, l) for t, l, _ in army) <= TH3_HOUSING_CAPACITY
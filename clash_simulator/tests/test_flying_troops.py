@@ -0,0 +1,101 @@
+"""
+Tests du chemin direct des troupes aériennes et de l'index spatial des bâtiments
+"""
+import math
+import random
+
+from clash_simulator.core.config import PATHFINDING_CONFIG
+from clash_simulator.data.army_configs import ARMY_CONFIGURATIONS
+from clash_simulator.data.base_configs import get_base_layout_from_config
+from clash_simulator.entities.troop_types import create_troop
+from clash_simulator.systems.battle_simulator import BattleSimulator
+from clash_simulator.systems.pathfinding import PATHFINDING_STATS, reset_pathfinding_stats
+
+
+def _flying_troop(troop_type, position, seed=None):
+    troop = create_troop(troop_type, 1, position)
+    troop.is_flying = True
+    troop.rng = random.Random(seed) if seed is not None else None
+    return troop
+
+
+def test_nearest_buildings_match_sorted_distances():
+    """L'index spatial rend les mêmes candidats que le tri complet par distance"""
+    base = get_base_layout_from_config("Simple TH3 Par Défaut").compile().instantiate()
+    model = base.model
+    for building in base.buildings[::3]:
+        building.take_damage(building.max_hp)
+    valid = [b for b in base.get_all_buildings() if not b.is_destroyed and b.type != "wall"]
+    candidates = {b.model_index: b for b in valid}
+    rng = random.Random(4)
+    for _ in range(200):
+        x, y = rng.uniform(-10, 54), rng.uniform(-10, 54)
+        count = rng.randint(1, 8)
+        troop = create_troop("archer", 1, (x, y))
+        expected = sorted(valid, key=troop.distance_to_building)[:count]
+        assert model.nearest_buildings(x, y, count, candidates) == expected
+
+
+def test_flying_troop_flies_straight_to_the_front():
+    """Une troupe aérienne vise une position tirée sur la face avant, sans passer par find_path"""
+    base = get_base_layout_from_config("Simple TH3 Par Défaut").compile().instantiate()
+    town_hall = base.buildings[0]
+    center_x, center_y = town_hall.get_center()
+    reset_pathfinding_stats()
+    chosen = set()
+    for seed in range(20):
+        troop = _flying_troop("archer", (center_x, 0.5), seed)
+        path = troop.calculate_path(town_hall, base.get_all_buildings(), base.walls, 0.0)
+        assert len(path) == 1 and path[0] in town_hall.get_attack_positions(troop.range)
+        # Face avant: du côté de la troupe (au-dessus du bâtiment)
+        angle = math.atan2(path[0][1] - center_y, path[0][0] - center_x)
+        assert abs(angle + math.pi / 2) <= math.radians(PATHFINDING_CONFIG["flying_front_angle"]) + 1e-9
+        assert troop.calculate_path(town_hall, base.get_all_buildings(), base.walls, 5.0) is path
+        chosen.add(path[0])
+    assert len(chosen) > 1
+    assert PATHFINDING_STATS["calls"] == 0 and PATHFINDING_STATS["direct_paths"] == 20
+
+
+def test_air_battle_skips_pathfinding():
+    """Une bataille d'archers volants se joue sans aucune recherche de chemin, et reste reproductible"""
+    base = get_base_layout_from_config("Simple TH3 Par Défaut")
+    model = base.compile()
+    army = ARMY_CONFIGURATIONS["Armée Mixte TH3 (Main)"]
+
+    def play():
+        troops = [create_troop(*troop) for troop in army]
+        for troop in troops:
+            troop.is_flying = True
+        simulator = BattleSimulator(model.instantiate(), troops, seed=3, log_to_file=False)
+        simulator.simulate_battle()
+        return simulator.get_statistics()
+
+    reset_pathfinding_stats()
+    stats = play()
+    assert PATHFINDING_STATS["calls"] == 0 and PATHFINDING_STATS["direct_paths"] > 0
+    assert stats["destruction_percentage"] > 0
+    assert play() == stats
+
+
+def test_antithetic_simulator_mirrors_front_position():
+    """Avec la même graine, le simulateur antithétique choisit l'indice miroir sur la face avant"""
+    model = get_base_layout_from_config("Simple TH3 Par Défaut").compile()
+    max_angle = math.radians(PATHFINDING_CONFIG["flying_front_angle"])
+    mirrored_pairs = 0
+    for seed in range(10):
+        indices = []
+        for antithetic in (False, True):
+            troop = _flying_troop("archer", (5.5, 0.5))
+            simulator = BattleSimulator(model.instantiate(), [troop], seed=seed, antithetic=antithetic, log_to_file=False)
+            simulator.start() # Donne son sous-flux à la troupe
+            town_hall = simulator.base_layout.buildings[0]
+            center_x, center_y = town_hall.get_center()
+            to_troop = math.atan2(troop.y - center_y, troop.x - center_x)
+            front = [p for p in town_hall.get_attack_positions(troop.range)
+                     if abs((math.atan2(p[1] - center_y, p[0] - center_x) - to_troop + math.pi) % (2 * math.pi) - math.pi) <= max_angle]
+            path = troop.calculate_direct_path(town_hall, 0.0)
+            indices.append((front.index(path[0]), len(front)))
+        (normal, count), (mirrored, _) = indices
+        assert normal + mirrored == count - 1
+        mirrored_pairs += normal != mirrored
+    assert mirrored_pairs > 0
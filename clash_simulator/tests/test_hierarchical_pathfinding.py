@@ -0,0 +1,82 @@
+"""
+Tests de la recherche hiérarchique par grappes (ClusterGraph) sur de grandes cartes
+"""
+from clash_simulator.core.config import PATHFINDING_CONFIG
+from clash_simulator.data.base_configs import get_base_layout_from_config
+from clash_simulator.entities.other_buildings import create_building
+from clash_simulator.systems.hierarchical_pathfinding import ClusterGraph
+from clash_simulator.systems.pathfinding import (PATHFINDING_STATS, astar_search, create_pathfinding_grid, find_path,
+                                                 path_cost, reset_pathfinding_stats)
+
+SIZE = 120
+
+
+def _large_map():
+    """Carte 120x120: une grille de mines d'or et une ligne de murs qui coupe la carte en deux"""
+    buildings = [create_building("gold_mine", 2, (x, y)) for x in range(4, SIZE - 4, 13) for y in range(4, 50, 11)]
+    walls = [create_building("wall", 3, (x, 60)) for x in range(SIZE)]
+    return buildings, walls
+
+
+def _tiles(world_path):
+    return [(int(x), int(y)) for x, y in world_path]
+
+
+def test_large_map_uses_cluster_graph():
+    """Sur une grande carte, find_path passe par les grappes: chemin proche de l'A* et moins de noeuds développés"""
+    buildings, walls = _large_map()
+    grid = create_pathfinding_grid(buildings, walls, False, SIZE, SIZE)
+    find_path((1.5, 1.5), (2.5, 2.5), buildings, walls, "barbarian", False, grid_size=(SIZE, SIZE)) # Construction
+
+    reset_pathfinding_stats()
+    path = find_path((1.5, 1.5), (115.5, 110.5), buildings, walls, "barbarian", False, grid_size=(SIZE, SIZE))
+    assert PATHFINDING_STATS["cluster_searches"] == 1
+    hierarchical_nodes = PATHFINDING_STATS["nodes_expanded"]
+    assert path[-1] == (115.5, 110.5)
+
+    reset_pathfinding_stats()
+    flat = astar_search(grid, (1, 1), (115, 110), "barbarian", False)
+    assert hierarchical_nodes < PATHFINDING_STATS["nodes_expanded"]
+    tiles = _tiles(path)
+    assert path_cost(grid, tiles, "barbarian", False) <= 1.2 * path_cost(grid, flat, "barbarian", False)
+    # Pénalité de mur: la ligne est franchie une seule fois
+    assert sum(grid[y][x] == 2 for x, y in tiles) == 1
+
+
+def test_destroyed_wall_updates_nearby_clusters():
+    """Un mur détruit ne recalcule que les grappes voisines et le chemin passe par la brèche"""
+    buildings, walls = _large_map()
+    graph = ClusterGraph(SIZE, SIZE, 10, PATHFINDING_CONFIG["wall_penalties"]["barbarian"], False)
+    graph.update(create_pathfinding_grid(buildings, walls, False, SIZE, SIZE))
+    assert graph.rebuilt_clusters == 144
+
+    next(wall for wall in walls if wall.x == 35).take_damage(10 ** 6)
+    grid = create_pathfinding_grid(buildings, walls, False, SIZE, SIZE)
+    graph.update(grid)
+    assert 0 < graph.rebuilt_clusters <= 4
+    tiles = graph.find((25, 55), (40, 70))
+    assert tiles[0] == (25, 55) and tiles[-1] == (40, 70)
+    assert (35, 60) in tiles and all(grid[y][x] == 0 for x, y in tiles)
+
+    # Le sapeur préfère toujours traverser un mur, et les troupes aériennes ignorent la ligne
+    breaker = ClusterGraph(SIZE, SIZE, 10, PATHFINDING_CONFIG["wall_penalties"]["wall_breaker"], False)
+    breaker.update(grid)
+    assert any(grid[y][x] == 2 for x, y in breaker.find((80, 50), (80, 70)))
+    flying = ClusterGraph(SIZE, SIZE, 10, 15.0, True)
+    flying.update(grid)
+    assert len(flying.find((80, 50), (80, 70))) == 21
+
+
+def test_default_grid_keeps_plain_astar(monkeypatch):
+    """Sur la grille 44x44, seules les longues requêtes (min_distance) passent par les grappes"""
+    base = get_base_layout_from_config("Simple TH3 Par Défaut")
+    reset_pathfinding_stats()
+    plain = find_path((0.5, 0.5), (40.5, 40.5), base.buildings, base.walls, "barbarian", False)
+    assert PATHFINDING_STATS["cluster_searches"] == 0
+
+    monkeypatch.setitem(PATHFINDING_CONFIG, "hierarchical", dict(PATHFINDING_CONFIG["hierarchical"], min_distance=20))
+    path = find_path((0.5, 0.5), (40.5, 40.5), base.buildings, base.walls, "barbarian", False)
+    assert PATHFINDING_STATS["cluster_searches"] == 1
+    assert path[-1] == plain[-1] == (40.5, 40.5)
+    find_path((0.5, 0.5), (5.5, 5.5), base.buildings, base.walls, "barbarian", False)
+    assert PATHFINDING_STATS["cluster_searches"] == 1
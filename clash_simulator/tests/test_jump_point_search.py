@@ -0,0 +1,49 @@
+"""
+Tests de la jump point search (grilles sans murs)
+"""
+from clash_simulator.core.config import PATHFINDING_CONFIG
+from clash_simulator.data.base_configs import get_base_layout_from_config
+from clash_simulator.systems.pathfinding import (PATHFINDING_STATS, astar_search, create_pathfinding_grid, find_path,
+                                                 jump_point_search, path_cost, reset_pathfinding_stats)
+
+
+def test_open_field_expands_fewer_nodes():
+    """Autour d'un bloc de bâtiments, la JPS trouve un chemin au plus aussi cher que l'A* en développant moins de noeuds"""
+    grid = [[0] * 44 for _ in range(44)]
+    for y in range(10, 20):
+        for x in range(15, 25):
+            grid[y][x] = 1
+
+    reset_pathfinding_stats()
+    jumped = jump_point_search(grid, (0, 0), (40, 38), False)
+    jump_nodes = PATHFINDING_STATS["nodes_expanded"]
+    reset_pathfinding_stats()
+    expanded = astar_search(grid, (0, 0), (40, 38), "barbarian", False)
+    assert jump_nodes < PATHFINDING_STATS["nodes_expanded"]
+
+    assert jumped[0] == (0, 0) and jumped[-1] == (40, 38)
+    assert all(grid[y][x] == 0 for x, y in jumped)
+    assert path_cost(grid, jumped, "barbarian", False) <= path_cost(grid, expanded, "barbarian", False) + 1e-9
+    assert jump_point_search([[0, 1, 0], [0, 1, 0], [0, 1, 0]], (0, 0), (2, 2), False) is None
+
+
+def test_find_path_uses_jps_without_walls(monkeypatch):
+    """find_path passe à la JPS quand les murs sont détruits ou pour les troupes aériennes, et garde l'A* sinon"""
+    base = get_base_layout_from_config("Simple TH3 Par Défaut")
+    reset_pathfinding_stats()
+    find_path((0.5, 0.5), (40.5, 40.5), base.buildings, base.walls, "barbarian", False)
+    assert PATHFINDING_STATS["jump_point_searches"] == 0
+    flying = find_path((0.5, 0.5), (40.5, 40.5), base.buildings, base.walls, "barbarian", True)
+    assert PATHFINDING_STATS["jump_point_searches"] == 1
+    assert len(flying) == 41
+
+    for wall in base.walls:
+        wall.take_damage(wall.max_hp)
+    path = find_path((0.5, 0.5), (40.5, 40.5), base.buildings, base.walls, "barbarian", False)
+    assert PATHFINDING_STATS["jump_point_searches"] == 2
+    grid = create_pathfinding_grid(base.buildings, base.walls, False)
+    assert path[-1] == (40.5, 40.5) and all(grid[int(y)][int(x)] == 0 for x, y in path[:-1])
+
+    monkeypatch.setitem(PATHFINDING_CONFIG, "jump_point_search", False)
+    assert find_path((0.5, 0.5), (40.5, 40.5), base.buildings, base.walls, "barbarian", False)[-1] == (40.5, 40.5)
+    assert PATHFINDING_STATS["jump_point_searches"] == 2
@@ -0,0 +1,51 @@
+"""
+Tests de l'API de déploiement temporisé, du fork du simulateur et du MCTS
+"""
+from clash_simulator.data.army_configs import ARMY_CONFIGURATIONS
+from clash_simulator.data.base_configs import get_base_layout_from_config
+from clash_simulator.search.deployment_optimizer import composition_from_config
+from clash_simulator.search.mcts import DeploymentMCTS
+from clash_simulator.systems.battle_simulator import BattleRunner, BattleSimulator
+
+
+def test_scheduled_deployment_happens_at_requested_time():
+    """Une troupe programmée n'apparaît qu'au tick de son temps de déploiement"""
+    base = get_base_layout_from_config("Base Test Minima")
+    simulator = BattleSimulator(base, [], log_to_file=False)
+    simulator.schedule_deployment("barbarian", 1, (2, 2), 1.0)
+
+    simulator.advance_until(0.5)
+    assert simulator.troops == []
+    simulator.advance_until(1.5)
+    assert len(simulator.troops) == 1
+    assert abs(simulator.troops[0].spawn_time - 1.0) < 1e-9
+
+
+def test_fork_continues_like_original():
+    """Une branche forkée en cours de bataille finit exactement comme l'original"""
+    base = get_base_layout_from_config("Base Test Minima")
+    simulator = BattleRunner.build_battle(base, ARMY_CONFIGURATIONS["Petite Armée Custom Battle"], seed=5)
+    simulator.advance_until(3.0)
+
+    branch = simulator.fork()
+    simulator.simulate_battle()
+    branch.simulate_battle()
+
+    assert branch.get_statistics() == simulator.get_statistics()
+
+
+def test_mcts_returns_timed_action_sequence():
+    """Le MCTS renvoie une séquence complète d'actions (type, niveau, (x, y), temps)"""
+    base = get_base_layout_from_config("Base Test Minima")
+    army = ARMY_CONFIGURATIONS["Armée Test Minima"]
+    composition = composition_from_config(army)
+    search = DeploymentMCTS(base, composition, delays=(0.0, 2.0), seed=0)
+
+    result = search.search(time_budget=30.0, max_iterations=3)
+
+    assert result['iterations'] == 3
+    assert len(result['best_actions']) == sum(count for _, _, count in composition)
+    for troop_type, level, position, deploy_time in result['best_actions']:
+        assert (troop_type, level) in search.groups
+        assert len(position) == 2
+        assert deploy_time >= 0
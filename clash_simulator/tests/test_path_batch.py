@@ -0,0 +1,52 @@
+"""
+Tests des recherches de chemin regroupées par tick (PathBatch et shared_goal_search)
+"""
+from clash_simulator.core.config import PATHFINDING_CONFIG
+from clash_simulator.data.army_configs import ARMY_CONFIGURATIONS
+from clash_simulator.data.base_configs import get_base_layout_from_config
+from clash_simulator.systems.battle_simulator import BattleRunner
+from clash_simulator.systems.pathfinding import (PATHFINDING_STATS, create_pathfinding_grid, path_cost,
+                                                 reset_pathfinding_stats, shared_goal_search)
+
+
+def test_shared_search_reuses_its_frontier():
+    """Une recherche arrière pour plusieurs départs donne les mêmes coûts que des recherches séparées, en moins de noeuds"""
+    base = get_base_layout_from_config("Simple TH3 Par Défaut")
+    grid = create_pathfinding_grid(base.buildings, base.walls, False)
+    starts = [(0, 0), (1, 0), (0, 43), (43, 20), (5, 30)]
+    goal = (14, 14)
+    assert grid[goal[1]][goal[0]] == 0
+
+    reset_pathfinding_stats()
+    shared = shared_goal_search(grid, starts, goal, "barbarian", False)
+    shared_nodes = PATHFINDING_STATS["nodes_expanded"]
+    reset_pathfinding_stats()
+    separate = {start: shared_goal_search(grid, [start], goal, "barbarian", False)[start] for start in starts}
+    assert shared_nodes < PATHFINDING_STATS["nodes_expanded"]
+    for start in starts:
+        assert shared[start][0] == start and shared[start][-1] == goal
+        shared_cost = path_cost(grid, shared[start], "barbarian", False)
+        assert abs(shared_cost - path_cost(grid, separate[start], "barbarian", False)) < 1e-9
+
+    blocked = next((x, y) for y in range(44) for x in range(44) if grid[y][x] == 1)
+    assert shared_goal_search(grid, [(0, 0)], blocked, "barbarian", False) == {(0, 0): None}
+
+
+def test_battle_with_batched_paths(monkeypatch):
+    """Avec batch_paths, les chemins du premier tick sont regroupés et la bataille reste reproductible"""
+    monkeypatch.setitem(PATHFINDING_CONFIG, "batch_paths", True)
+    model = get_base_layout_from_config("Simple TH3 Par Défaut").compile()
+    army = ARMY_CONFIGURATIONS["Armée Mixte TH3 (Main)"]
+    simulator = BattleRunner.build_battle(model, army, seed=1, log_to_file=False)
+    reset_pathfinding_stats()
+    simulator.advance_until(1.0 / simulator.tick_rate)
+    assert PATHFINDING_STATS["calls"] == 0
+    assert 0 < PATHFINDING_STATS["batch_searches"] < PATHFINDING_STATS["batched_paths"]
+    assert not simulator.path_batch
+
+    branch = simulator.fork()
+    assert branch.path_batch is not simulator.path_batch and branch.troops[0].path_batch is branch.path_batch
+    simulator.simulate_battle()
+    stats = simulator.get_statistics()
+    assert stats["destruction_percentage"] > 0
+    assert BattleRunner.run_seeded_battle(model, army, seed=1) == stats
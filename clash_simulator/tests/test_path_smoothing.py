@@ -0,0 +1,54 @@
+"""
+Tests du lissage des chemins par ligne de vue (PATHFINDING_CONFIG["smooth_paths"])
+"""
+from clash_simulator.core.config import PATHFINDING_CONFIG
+from clash_simulator.data.army_configs import ARMY_CONFIGURATIONS
+from clash_simulator.data.base_configs import get_base_layout_from_config
+from clash_simulator.entities.other_buildings import create_building
+from clash_simulator.systems.battle_simulator import BattleRunner
+from clash_simulator.systems.pathfinding import (PATHFINDING_STATS, create_pathfinding_grid, find_path, line_of_sight,
+                                                 reset_pathfinding_stats)
+
+
+def test_line_of_sight():
+    """Un bâtiment ou un mur coupe la ligne de vue des troupes au sol, pas celle des troupes aériennes"""
+    buildings = [create_building("gold_mine", 2, (10, 10))]
+    walls = [create_building("wall", 3, (20, y)) for y in range(5, 15)]
+    grid = create_pathfinding_grid(buildings, walls, False)
+    assert line_of_sight(grid, (0.5, 0.5), (30.5, 4.5), False)
+    assert not line_of_sight(grid, (5.5, 11.5), (16.5, 11.5), False)
+    assert not line_of_sight(grid, (15.5, 10.5), (25.5, 10.5), False)
+    assert line_of_sight(grid, (15.5, 10.5), (25.5, 10.5), True)
+
+
+def test_smoothed_path_is_shorter_and_visible(monkeypatch):
+    """Le chemin lissé a moins de points, chaque segment est en ligne de vue et le mur franchi reste un point"""
+    buildings = [create_building("gold_mine", 2, (10, 10))]
+    walls = [create_building("wall", 3, (20, y)) for y in range(0, 44)]
+    grid = create_pathfinding_grid(buildings, walls, False)
+    start, end = (2.5, 12.3), (35.5, 11.5)
+    raw = find_path(start, end, buildings, walls, "barbarian", False)
+
+    monkeypatch.setitem(PATHFINDING_CONFIG, "smooth_paths", True)
+    reset_pathfinding_stats()
+    smoothed = find_path(start, end, buildings, walls, "barbarian", False)
+    assert smoothed[-1] == raw[-1] == end
+    assert len(smoothed) < len(raw)
+    assert PATHFINDING_STATS["smoothed_waypoints"] == len(raw) - len(smoothed)
+    assert set(smoothed) <= set(raw)
+    for a, b in zip([start] + smoothed, smoothed):
+        assert line_of_sight(grid, a, b, False)
+    wall_tiles = [(x, y) for x, y in raw if grid[int(y)][int(x)] == 2]
+    assert len(wall_tiles) == 1 and wall_tiles[0] in smoothed
+
+
+def test_battle_with_smoothing(monkeypatch):
+    """Avec smooth_paths, la bataille se déroule, reste reproductible et les troupes suivent moins de points"""
+    base = get_base_layout_from_config("Simple TH3 Par Défaut").compile()
+    army = ARMY_CONFIGURATIONS["Armée Mixte TH3 (Main)"]
+    monkeypatch.setitem(PATHFINDING_CONFIG, "smooth_paths", True)
+    reset_pathfinding_stats()
+    stats = BattleRunner.run_seeded_battle(base, army, seed=1)
+    assert PATHFINDING_STATS["smoothed_waypoints"] > 0
+    assert stats["destruction_percentage"] > 0
+    assert BattleRunner.run_seeded_battle(base, army, seed=1) == stats
@@ -0,0 +1,26 @@
+"""
+Tests de l'évaluation groupée par préfixe de déploiement commun
+"""
+from clash_simulator.data.base_configs import get_base_layout_from_config
+from clash_simulator.search.prefix_evaluator import PrefixSharingEvaluator
+from clash_simulator.systems.battle_simulator import BattleRunner
+
+
+def test_prefix_sharing_matches_independent_battles():
+    """Mêmes résultats que des batailles indépendantes, avec moins de ticks simulés"""
+    base = get_base_layout_from_config("Base Test Minima")
+    common = [("barbarian", 2, (0, 10), 0.0), ("archer", 2, (0, 11), 0.0)]
+    candidates = [
+        common + [("giant", 1, (0, 12), 4.0)],
+        common + [("giant", 1, (1, 0), 4.0)],
+        common + [("barbarian", 2, (0, 12), 6.0)],
+        common,
+        common + [("giant", 1, (0, 12), 4.0)],
+    ]
+
+    evaluator = PrefixSharingEvaluator(base, seed=2)
+    results = evaluator.evaluate(candidates)
+
+    for actions, result in zip(candidates, results):
+        assert result == BattleRunner.run_timed_battle(base, actions, seed=2)
+    assert evaluator.ticks_simulated < evaluator.ticks_naive
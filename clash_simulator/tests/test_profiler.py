@@ -0,0 +1,38 @@
+"""
+Tests du profileur de ticks
+"""
+from clash_simulator.data.army_configs import ARMY_CONFIGURATIONS
+from clash_simulator.data.base_configs import get_base_layout_from_config
+from clash_simulator.systems.battle_simulator import BattleRunner
+from clash_simulator.utils.profiler import TICK_PHASES
+
+
+def test_profile_in_statistics_without_changing_results():
+    """Le profil apparaît dans get_statistics et ne modifie pas la bataille"""
+    base = get_base_layout_from_config("Base Test Minima")
+    army = ARMY_CONFIGURATIONS["Petite Armée Custom Battle"]
+
+    plain = BattleRunner.run_seeded_battle(base, army, seed=1)
+    simulator = BattleRunner.build_battle(base, army, seed=1, profile=True)
+    simulator.simulate_battle()
+    profiled = simulator.get_statistics()
+
+    profile = profiled.pop('profile')
+    assert profiled == plain
+    assert 'profile' not in plain
+    assert profile['ticks_sampled'] == plain['tick_count']
+    assert set(profile['phase_ns']) == set(TICK_PHASES)
+    assert profile['counters']['astar_calls'] > 0
+    assert profile['counters']['troop_searches'] > 0
+    assert "A*" in simulator.profiler.format_report()
+
+
+def test_profile_sampling():
+    """Avec un échantillonnage 1/5, seul un tick sur cinq est mesuré"""
+    base = get_base_layout_from_config("Base Test Minima")
+    simulator = BattleRunner.build_battle(base, ARMY_CONFIGURATIONS["Armée Test Minima"], seed=1,
+                                          profile=True, profile_sample_every=5)
+    simulator.simulate_battle()
+    profile = simulator.get_statistics()['profile']
+
+    assert profile['ticks_sampled'] == (profile['ticks_seen'] + 4) // 5
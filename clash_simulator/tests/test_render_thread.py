@@ -0,0 +1,46 @@
+"""
+Tests du rendu découplé (thread d'affichage avec abandon des frames périmées)
+"""
+import time
+
+from clash_simulator.data.army_configs import ARMY_CONFIGURATIONS
+from clash_simulator.data.base_configs import get_base_layout_from_config
+from clash_simulator.systems.battle_simulator import BattleRunner
+from clash_simulator.visualization.render_thread import RenderThread
+from clash_simulator.visualization.terminal_display import BattleVisualizer
+
+
+def test_slow_renderer_drops_stale_frames():
+    """Un affichage lent ne bloque pas le producteur et finit sur la dernière frame"""
+    drawn = []
+
+    def slow_draw(frame):
+        time.sleep(0.01)
+        drawn.append(frame)
+
+    renderer = RenderThread(slow_draw)
+    renderer.start()
+    start = time.perf_counter()
+    for i in range(200):
+        renderer.publish(i)
+    publish_time = time.perf_counter() - start
+    renderer.stop()
+
+    assert publish_time < 0.5
+    assert drawn[-1] == 199
+    assert drawn == sorted(drawn)
+    assert renderer.rendered == len(drawn) < 200
+    assert renderer.dropped + renderer.rendered == 200
+
+
+def test_live_visualizer_runs_simulation_to_completion(capsys):
+    """La simulation tourne à sa cadence cible et l'état final est affiché"""
+    base = get_base_layout_from_config("Base Test Minima")
+    simulator = BattleRunner.build_battle(base, ARMY_CONFIGURATIONS["Armée Test Minima"], seed=0)
+    visualizer = BattleVisualizer(simulator)
+    visualizer.run(speed_multiplier=1e6, show_legend=False, update_frequency=0.05)
+
+    assert simulator.is_finished()
+    assert visualizer.frames_rendered >= 1
+    assert visualizer.frames_rendered + visualizer.frames_dropped == simulator.current_tick
+    assert "Simulation terminée" in capsys.readouterr().out
@@ -0,0 +1,62 @@
+"""
+Tests de l'enregistrement et de la relecture des replays
+"""
+import pytest
+
+from clash_simulator.data.army_configs import ARMY_CONFIGURATIONS
+from clash_simulator.data.base_configs import get_base_layout_from_config
+from clash_simulator.systems.battle_simulator import BattleRunner
+from clash_simulator.systems.replay import RECORD, ReplayReader, ReplayRecorder
+
+
+def test_replay_matches_simulation(tmp_path):
+    """Chaque frame relue (séquentielle ou par accès direct) correspond à l'état simulé"""
+    base = get_base_layout_from_config("Base Test Minima")
+    path = str(tmp_path / "battle.replay")
+    simulator = BattleRunner.build_battle(base, ARMY_CONFIGURATIONS["Petite Armée Custom Battle"], seed=0, replay_path=path)
+    simulator.replay_recorder.keyframe_interval = 16
+    simulator.start()
+    expected = {}
+    while not simulator.is_finished():
+        simulator.simulate_tick()
+        expected[simulator.current_tick] = (
+            [(t.type, round(t.x, 3), round(t.y, 3), t.hp) for t in simulator.troops],
+            [b.hp for b in simulator.base_layout.get_all_buildings()],
+        )
+
+    with ReplayReader(path) as reader:
+        assert len(reader) == simulator.current_tick + 1
+        frames = list(reader.iter_frames())
+        for frame in frames[1:]:
+            troops, buildings = expected[frame.tick]
+            assert [(t.type, round(t.x, 3), round(t.y, 3), t.hp) for t in frame.troops] == troops
+            assert [b.hp for b in frame.buildings] == buildings
+        assert reader.frame_at(37) == frames[37]
+        assert frames[-1].state == simulator.state.value
+        assert frames[-1].get_statistics()['troops_lost'] == simulator.get_statistics()['troops_lost']
+
+
+def test_replay_deltas_are_smaller_than_keyframes(tmp_path):
+    """Les frames delta n'enregistrent que ce qui change"""
+    base = get_base_layout_from_config("Base Test Minima")
+    path = str(tmp_path / "battle.replay")
+    simulator = BattleRunner.build_battle(base, ARMY_CONFIGURATIONS["Armée Test Minima"], seed=0, replay_path=path)
+    simulator.simulate_battle()
+
+    recorder = simulator.replay_recorder
+    assert recorder.closed
+    full_size = RECORD.size * (1 + 2 * len(simulator.troops) + len(base.get_all_buildings())) * len(recorder._frame_offsets)
+    assert recorder._records_written * RECORD.size < full_size / 2
+
+
+def test_incomplete_replay_is_rejected(tmp_path):
+    """Un replay non finalisé (bataille interrompue) est refusé clairement"""
+    base = get_base_layout_from_config("Base Test Minima")
+    path = str(tmp_path / "battle.replay")
+    simulator = BattleRunner.build_battle(base, ARMY_CONFIGURATIONS["Armée Test Minima"], seed=0, replay_path=path)
+    simulator.advance_until(1.0)
+    simulator.replay_recorder.flush()
+    simulator.replay_recorder._file.close()
+
+    with pytest.raises(ValueError):
+        ReplayReader(path)
@@ -0,0 +1,67 @@
+"""
+Tests de la visualisation pilotée par replay
+"""
+import pytest
+
+from clash_simulator.data.army_configs import ARMY_CONFIGURATIONS
+from clash_simulator.data.base_configs import get_base_layout_from_config
+from clash_simulator.systems.battle_simulator import BattleRunner
+from clash_simulator.systems.replay import BattleFrame, ReplayPlayer, ReplayReader
+from clash_simulator.visualization.improved_display import CompactBattleVisualizer
+from clash_simulator.visualization.terminal_display import BattleVisualizer, TerminalDisplay
+
+
+@pytest.fixture
+def replay_path(tmp_path):
+    base = get_base_layout_from_config("Base Test Minima")
+    path = str(tmp_path / "battle.replay")
+    simulator = BattleRunner.build_battle(base, ARMY_CONFIGURATIONS["Armée Test Minima"], seed=0, replay_path=path)
+    simulator.simulate_battle()
+    return path
+
+
+def test_player_seek_fast_forward_and_rewind(replay_path):
+    """Les déplacements dans le temps sont bornés au replay et reconstruisent la bonne frame"""
+    with ReplayReader(replay_path) as reader:
+        player = ReplayPlayer(reader)
+        frame = player.seek_time(2.0)
+        assert frame.tick == 2 * player.tick_rate
+        assert player.fast_forward(1.0).tick == 3 * player.tick_rate
+        assert player.rewind(10.0).tick == 0
+        assert player.fast_forward(10_000).tick == player.last_position
+        assert player.at_end()
+
+        player.seek(0)
+        played = list(player.play(step=7))
+        assert [f.tick for f in played[:3]] == [0, 7, 14]
+        assert played[-1].tick == player.last_position
+        assert played[-1] == reader.frame_at(player.last_position)
+
+
+def test_display_renders_live_and_replay_frames(replay_path, capsys):
+    """Le même rendu sert à la simulation en cours et au replay"""
+    base = get_base_layout_from_config("Base Test Minima")
+    simulator = BattleRunner.build_battle(base, ARMY_CONFIGURATIONS["Armée Test Minima"], seed=0)
+    simulator.simulate_battle()
+    live = BattleFrame.from_simulator(simulator)
+
+    display = TerminalDisplay()
+    display.render_frame(live)
+    live_output = capsys.readouterr().out
+
+    with ReplayReader(replay_path) as reader:
+        display.render_frame(reader.frame_at(len(reader) - 1))
+    assert capsys.readouterr().out == live_output
+
+
+def test_visualizers_require_one_source(replay_path):
+    """Un visualiseur prend soit un simulateur, soit un replay"""
+    with pytest.raises(ValueError):
+        BattleVisualizer()
+    with pytest.raises(ValueError):
+        CompactBattleVisualizer()
+    with pytest.raises(ValueError):
+        BattleVisualizer(simulator=object(), replay=replay_path)
+    visualizer = CompactBattleVisualizer(replay=replay_path)
+    assert visualizer.player.last_position > 0
+    visualizer.player.reader.close()
@@ -0,0 +1,68 @@
+"""
+Tests de l'écriture en flux des résultats de lots
+"""
+from concurrent.futures import Executor
+
+import pytest
+
+from clash_simulator.data.army_configs import ARMY_CONFIGURATIONS
+from clash_simulator.data.base_configs import get_base_layout_from_config
+from clash_simulator.systems.battle_simulator import BattleRunner
+from clash_simulator.utils.result_sink import (
+    JsonlResultSink, open_result_sink, parquet_available, read_jsonl_results,
+)
+
+
+class InterruptedExecutor(Executor):
+    """Exécute la première tâche puis simule un Ctrl-C"""
+
+    def map(self, fn, *iterables, **kwargs):
+        for payload in iterables[0]:
+            yield fn(payload)
+            raise KeyboardInterrupt
+
+
+def test_run_batch_streams_records(tmp_path):
+    """Chaque bataille produit un enregistrement avec hash de configuration, graine, stats et temps"""
+    base = get_base_layout_from_config("Base Test Minima")
+    army_a = ARMY_CONFIGURATIONS["Armée Test Minima"]
+    army_b = ARMY_CONFIGURATIONS["Petite Armée Custom Battle"]
+    path = str(tmp_path / "results.jsonl")
+
+    with JsonlResultSink(path, flush_every=2) as sink:
+        results = BattleRunner.run_batch(base, [(army_a, 1), (army_a, 2), (army_b, 1)], sink=sink)
+    records = list(read_jsonl_results(path))
+
+    assert [r['task'] for r in records] == [0, 1, 2]
+    assert [r['seed'] for r in records] == [1, 2, 1]
+    assert [r['stats'] for r in records] == results
+    assert records[0]['config_hash'] == records[1]['config_hash'] != records[2]['config_hash']
+    assert all(r['wall_time'] > 0 and not r['cached'] for r in records)
+
+
+def test_sink_survives_interruption(tmp_path):
+    """Les résultats déjà calculés sont écrits même si le lot est interrompu"""
+    base = get_base_layout_from_config("Base Test Minima")
+    army = ARMY_CONFIGURATIONS["Armée Test Minima"]
+    path = str(tmp_path / "results.jsonl")
+
+    sink = JsonlResultSink(path)
+    with pytest.raises(KeyboardInterrupt):
+        BattleRunner.run_batch(base, [(army, 1), (army, 2)], executor=InterruptedExecutor(), sink=sink)
+    assert [r['seed'] for r in read_jsonl_results(path)] == [1]
+
+    # Une écriture coupée au milieu d'une ligne est retirée à la réouverture
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"seed": 2, "sta')
+    with JsonlResultSink(path) as sink:
+        sink.write({'seed': 3})
+    assert [r['seed'] for r in read_jsonl_results(path)] == [1, 3]
+
+
+@pytest.mark.skipif(parquet_available(), reason="pyarrow est installé")
+def test_parquet_requires_pyarrow(tmp_path):
+    """Sans pyarrow, le format Parquet est refusé avec un message explicite"""
+    with pytest.raises(ValueError):
+        open_result_sink(str(tmp_path / "results.parquet"))
+    with pytest.raises(ValueError):
+        open_result_sink(str(tmp_path / "results.csv"))
@@ -0,0 +1,53 @@
+"""
+Tests des bases compilées en mémoire partagée
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+from clash_simulator.data.army_configs import ARMY_CONFIGURATIONS
+from clash_simulator.data.base_configs import get_base_layout_from_config
+from clash_simulator.systems.battle_simulator import BattleRunner
+from clash_simulator.systems.shared_model import SharedBaseModel, SharedResultBuffer, attach_model, attach_results
+
+
+def test_attached_model_matches_original():
+    """Le modèle relu depuis le segment partagé est identique, ses tableaux restent dans le segment"""
+    model = get_base_layout_from_config("Simple TH3 Par Défaut").compile()
+    with SharedBaseModel(model) as shared:
+        attached = attach_model(shared.name)
+        assert attached is attach_model(shared.name)
+        assert isinstance(attached.obstacles, memoryview)
+        assert attached.obstacles == model.obstacles and attached.occupancy == model.occupancy
+        assert attached.specs == model.specs and attached.attack_positions == model.attack_positions
+        assert attached.save_to_dict() == model.save_to_dict()
+        layout = attached.instantiate()
+        assert [b.type for b in layout.get_all_buildings()] == [s.type for s in model.specs]
+
+
+def test_result_buffer_rows():
+    """Les lignes écrites par un autre lecteur du segment sont relues par le créateur"""
+    with SharedResultBuffer(3, 2) as buffer:
+        attach_results(buffer.name, 3, 2).write_row(2, [1.5, 7])
+        assert buffer.read_row(2) == [1.5, 7.0]
+        assert buffer.read_row(0) == [0.0, 0.0]
+
+
+def test_shared_batch_matches_serial_batch():
+    """Un lot réparti sur des processus via la mémoire partagée donne les mêmes statistiques"""
+    base = get_base_layout_from_config("Base Test Minima")
+    army_a = ARMY_CONFIGURATIONS["Armée Test Minima"]
+    army_b = ARMY_CONFIGURATIONS["Petite Armée Custom Battle"]
+    tasks = [(army_a, 1), (army_b, 2), (army_a, 3)]
+
+    serial = BattleRunner.run_batch(base, tasks)
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        shared = BattleRunner.run_batch(base, tasks, executor=executor)
+        pickled = BattleRunner.run_batch(base, tasks, executor=executor, shared_memory=False)
+    assert shared == serial == pickled
+
+
+def test_shared_batch_keeps_profile():
+    """Avec profile=True, un lot forcé en mémoire partagée garde les statistiques de profilage"""
+    base = get_base_layout_from_config("Base Test Minima")
+    tasks = [(ARMY_CONFIGURATIONS["Armée Test Minima"], seed) for seed in range(2)]
+    results = BattleRunner.run_batch(base, tasks, workers=2, shared_memory=True, profile=True)
+    assert all('profile' in stats for stats in results)
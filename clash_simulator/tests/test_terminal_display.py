@@ -0,0 +1,54 @@
+"""
+Tests du rendu différentiel du terminal
+"""
+from clash_simulator.data.army_configs import ARMY_CONFIGURATIONS
+from clash_simulator.data.base_configs import get_base_layout_from_config
+from clash_simulator.systems.battle_simulator import BattleRunner
+from clash_simulator.systems.replay import BattleFrame
+from clash_simulator.visualization.terminal_display import CLEAR_SCREEN, TerminalDisplay
+
+
+def test_draw_frame_emits_only_changes(capsys):
+    """Le premier dessin est complet, les suivants ne réécrivent que les cellules modifiées"""
+    base = get_base_layout_from_config("Base Test Minima")
+    simulator = BattleRunner.build_battle(base, ARMY_CONFIGURATIONS["Armée Test Minima"], seed=0)
+    simulator.start()
+    for _ in range(20):
+        simulator.simulate_tick()
+
+    display = TerminalDisplay()
+    display.enable_colors = True
+    display.draw_frame(BattleFrame.from_simulator(simulator))
+    full = capsys.readouterr().out
+    assert full.startswith(CLEAR_SCREEN)
+
+    display.draw_frame(BattleFrame.from_simulator(simulator))
+    unchanged = capsys.readouterr().out
+    assert CLEAR_SCREEN not in unchanged
+    assert len(unchanged) < 20
+
+    simulator.simulate_tick()
+    display.draw_frame(BattleFrame.from_simulator(simulator))
+    delta = capsys.readouterr().out
+    assert CLEAR_SCREEN not in delta
+    assert 0 < len(delta) < len(full) / 4
+
+    display.invalidate()
+    display.draw_frame(BattleFrame.from_simulator(simulator))
+    assert capsys.readouterr().out.startswith(CLEAR_SCREEN)
+
+
+def test_draw_frame_without_ansi_falls_back_to_full_render(capsys):
+    """Sans terminal ANSI (sortie redirigée), draw_frame affiche la frame complète"""
+    base = get_base_layout_from_config("Base Test Minima")
+    simulator = BattleRunner.build_battle(base, ARMY_CONFIGURATIONS["Armée Test Minima"], seed=0)
+    simulator.start()
+    frame = BattleFrame.from_simulator(simulator)
+
+    display = TerminalDisplay()
+    display.enable_colors = False
+    display.draw_frame(frame)
+    drawn = capsys.readouterr().out
+    display.render_frame(frame)
+    assert drawn == capsys.readouterr().out
+    assert "\033[" not in drawn
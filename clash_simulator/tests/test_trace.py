@@ -0,0 +1,27 @@
+"""
+Tests de l'export de trace Chrome/Perfetto
+"""
+import json
+
+from clash_simulator.data.army_configs import ARMY_CONFIGURATIONS
+from clash_simulator.data.base_configs import get_base_layout_from_config
+from clash_simulator.systems.battle_simulator import BattleRunner
+
+
+def test_trace_contains_ticks_astar_and_targeting(tmp_path):
+    """La trace contient une plage par tick, les A* par troupe et les acquisitions de cibles"""
+    base = get_base_layout_from_config("Simple TH3 Par Défaut")
+    simulator = BattleRunner.build_battle(base, ARMY_CONFIGURATIONS["Petite Armée Custom Battle"], seed=0, trace=True)
+    simulator.simulate_battle()
+
+    path = simulator.save_trace(str(tmp_path / "battle.trace.json"))
+    with open(path, encoding='utf-8') as f:
+        events = json.load(f)["traceEvents"]
+
+    ticks = [e for e in events if e["ph"] == "X" and e["name"] == "tick"]
+    astar = [e for e in events if e["ph"] == "X" and e["name"] == "A*"]
+    targeting = [e for e in events if e["ph"] == "i" and e["cat"] == "targeting"]
+    assert len(ticks) >= simulator.current_tick - 1
+    assert astar and all(e["args"]["nodes_expanded"] >= 0 and e["tid"] > 2 for e in astar)
+    assert targeting
+    assert all(e["ts"] >= 0 for e in ticks + astar + targeting)
@@ -18,6 +18,7 @@ class BattleLogger:
             
         self.log_to_console = log_to_console
         self.log_to_file = log_to_file
+        self.enabled = log_to_console or log_to_file # Sans sortie, log() ne fait rien (simulations en lot)
         self.logger = logging.getLogger(self.battle_id)
         self.logger.setLevel(logging.DEBUG) # Capture tous les niveaux, les handlers décident quoi afficher/écrire
         
@@ -53,6 +54,8 @@ class BattleLogger:
 
 
     def log(self, message: str, level: int = logging.INFO, tick: Optional[int] = None, sim_time: Optional[float] = None, **kwargs):
+        if not self.enabled:
+            return
         extra_info = {'tick': tick, 'sim_time': sim_time}
         extra_info.update(kwargs)
         self.logger.log(level, message, extra=extra_info)
@@ -0,0 +1,91 @@
+"""
+Profileur de ticks: temps par phase de BattleSimulator.simulate_tick et compteurs internes
+"""
+from time import perf_counter_ns
+from typing import Dict
+
+from ..entities.troop import TARGETING_STATS
+from ..systems.pathfinding import PATHFINDING_STATS
+
+# Phases de simulate_tick, dans l'ordre d'exécution
+TICK_PHASES = ["deployments", "troops", "defenses", "projectiles", "end_conditions", "record_state"]
+
+
+class TickProfiler:
+    """Accumule le temps (perf_counter_ns) de chaque phase d'un tick.
+
+    Seul un tick sur `sample_every` est mesuré, ce qui permet de le laisser actif en
+    production. Les compteurs globaux (A*, recherches de cibles) sont lus avant et
+    après chaque tick échantillonné: seules les différences sont attribuées à la
+    bataille, même si plusieurs batailles tournent dans le même processus.
+    """
+
+    def __init__(self, sample_every: int = 1):
+        if sample_every < 1:
+            raise ValueError(f"Période d'échantillonnage invalide : {sample_every}")
+        self.sample_every = sample_every
+        self.phase_ns: Dict[str, int] = {phase: 0 for phase in TICK_PHASES}
+        self.counters: Dict[str, int] = {}
+        for key in PATHFINDING_STATS:
+            self.counters[f"astar_{key}"] = 0
+        for key in TARGETING_STATS:
+            self.counters[key] = 0
+        self.ticks_sampled = 0
+        self.ticks_seen = 0
+        self._counter_snapshot: Dict[str, int] = {}
+
+    def should_sample(self, tick: int) -> bool:
+        self.ticks_seen += 1
+        return tick % self.sample_every == 0
+
+    def start_tick(self) -> int:
+        """Début d'un tick échantillonné; retourne l'horodatage de départ"""
+        self._counter_snapshot = self._read_counters()
+        return perf_counter_ns()
+
+    def lap(self, phase: str, mark: int) -> int:
+        """Attribue le temps écoulé depuis mark à la phase; retourne le nouvel horodatage"""
+        now = perf_counter_ns()
+        self.phase_ns[phase] += now - mark
+        return now
+
+    def end_tick(self) -> None:
+        current = self._read_counters()
+        for key, value in current.items():
+            self.counters[key] += value - self._counter_snapshot[key]
+        self.ticks_sampled += 1
+
+    @staticmethod
+    def _read_counters() -> Dict[str, int]:
+        values = {f"astar_{key}": value for key, value in PATHFINDING_STATS.items()}
+        values.update(TARGETING_STATS)
+        return values
+
+    def summary(self) -> Dict:
+        """Totaux sérialisables (inclus dans BattleSimulator.get_statistics)"""
+        total_ns = sum(self.phase_ns.values())
+        return {
+            'sample_every': self.sample_every,
+            'ticks_sampled': self.ticks_sampled,
+            'ticks_seen': self.ticks_seen,
+            'total_ns': total_ns,
+            'phase_ns': dict(self.phase_ns),
+            'counters': dict(self.counters),
+        }
+
+    def format_report(self) -> str:
+        """Rapport texte compact"""
+        summary = self.summary()
+        total_ns = summary['total_ns'] or 1
+        ticks = max(1, self.ticks_sampled)
+        lines = [f"Profil: {self.ticks_sampled} ticks mesurés sur {self.ticks_seen} "
+                 f"(1/{self.sample_every}), {summary['total_ns'] / 1e6:.1f} ms"]
+        for phase in TICK_PHASES:
+            ns = self.phase_ns[phase]
+            lines.append(f"  {phase:<15} {ns / 1e6:8.2f} ms {100 * ns / total_ns:5.1f}%  {ns / ticks / 1e3:8.1f} µs/tick")
+        c = self.counters
+        lines.append(f"  A*: {c['astar_calls']} appels, {c['astar_nodes_expanded']} nœuds, "
+                     f"{c['astar_cache_hits']} chemins réutilisés")
+        lines.append(f"  Cibles: {c['troop_searches']} recherches troupes ({c['troop_candidates']} candidats), "
+                     f"{c['defense_searches']} recherches défenses ({c['defense_candidates']} candidats)")
+        return "\n".join(lines)
@@ -0,0 +1,50 @@
+"""
+Flux aléatoires reproductibles pour la simulation (graines, flux antithétiques)
+"""
+import random
+from typing import Optional
+
+
+class AntitheticRandom(random.Random):
+    """Générateur antithétique : chaque tirage uniforme u est remplacé par 1 - u.
+
+    Les tirages réels (uniform, gauss, ...) dérivent de random(). Les tirages entiers
+    (randrange, randint, choice, shuffle, sample) passent par _randbelow, qui est
+    miroité à part : k devient n - 1 - k. Un même état produit ainsi des tirages
+    "miroirs" du flux normal. getrandbits n'est pas miroité.
+    """
+
+    def random(self) -> float:
+        u = super().random()
+        return 1.0 - u if u > 0.0 else 0.0
+
+    def _randbelow(self, n: int) -> int:
+        return n - 1 - super()._randbelow(n)
+
+
+def make_rng(seed: Optional[int] = None, antithetic: bool = False) -> random.Random:
+    """Crée un générateur, antithétique ou non, initialisé avec la graine donnée."""
+    if antithetic:
+        return AntitheticRandom(seed)
+    return random.Random(seed)
+
+
+class RandomStreams:
+    """Distribue des sous-flux indépendants dérivés d'une graine unique.
+
+    Chaque source d'aléa (simulateur, troupe i, ...) reçoit son propre flux, dérivé
+    dans un ordre fixe. Deux simulations avec la même graine consomment donc les
+    mêmes nombres pour les mêmes sources, même si une variante tire plus souvent
+    que l'autre ailleurs (nombres aléatoires communs).
+    """
+
+    def __init__(self, seed: Optional[int] = None, antithetic: bool = False):
+        self.seed = seed
+        self.antithetic = antithetic
+        # Le dériveur de graines n'est jamais antithétique : les deux membres d'une
+        # paire antithétique doivent recevoir les mêmes graines de sous-flux.
+        self._seeder = random.Random(seed)
+
+    def spawn(self) -> random.Random:
+        """Retourne le prochain sous-flux."""
+        return make_rng(self._seeder.getrandbits(64), self.antithetic)
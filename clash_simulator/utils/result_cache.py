@@ -0,0 +1,128 @@
+"""
+Cache persistant des résultats de simulation, adressé par le contenu
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from typing import Dict, Optional, Sequence
+
+from ..core import config
+
+CACHE_DIRECTORY = "cache" # Répertoire du cache par défaut
+DEFAULT_CACHE_PATH = os.path.join(CACHE_DIRECTORY, "results.sqlite")
+DEFAULT_MAX_SIZE_BYTES = 64 * 1024 * 1024
+
+# À incrémenter quand le comportement du moteur change: invalide toutes les entrées existantes
+ENGINE_VERSION = 3
+
+# Constantes de configuration qui influencent le résultat d'une bataille (pas l'affichage)
+CACHE_CONFIG_KEYS = [
+    "GRID_SIZE", "TICK_RATE", "TILE_SIZE", "MAX_BATTLE_DURATION", "SIMULATION_FIDELITY",
+    "TROOP_STATS", "DEFENSE_STATS", "BUILDING_STATS", "PATHFINDING_CONFIG", "BUILDING_GAPS",
+]
+
+# Paramètres du simulateur sans effet sur le résultat
+IGNORED_SIMULATOR_KWARGS = {"battle_id", "log_to_console", "log_to_file", "trace", "replay_path"}
+
+
+def _canonical_json(value) -> str:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), default=repr)
+
+
+def config_fingerprint() -> str:
+    """Empreinte des constantes de configuration pertinentes et de la version du moteur"""
+    snapshot = {key: getattr(config, key, None) for key in CACHE_CONFIG_KEYS}
+    snapshot["engine_version"] = ENGINE_VERSION
+    return hashlib.sha256(_canonical_json(snapshot).encode("utf-8")).hexdigest()
+
+
+def battle_key(base_data: Dict, deployments: Sequence, seed: int, antithetic: bool = False,
+               **simulator_kwargs) -> str:
+    """Clé sha256 canonique d'une bataille.
+
+    base_data vient de BaseLayout.save_to_dict() (le nom de la base est ignoré, l'ordre
+    des bâtiments est conservé car il influence le ciblage); deployments est une armée
+    (type, niveau, (x, y)) ou une liste d'actions temporisées (type, niveau, (x, y), temps).
+    """
+    payload = {
+        "base": {"buildings": base_data.get("buildings", []), "walls": base_data.get("walls", [])},
+        "deployments": [list(d) for d in deployments],
+        "seed": seed,
+        "antithetic": antithetic,
+        "simulator": {k: v for k, v in simulator_kwargs.items() if k not in IGNORED_SIMULATOR_KWARGS},
+        "config": config_fingerprint(),
+    }
+    return hashlib.sha256(_canonical_json(payload).encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """Cache SQLite clé -> statistiques de bataille, avec éviction LRU au-delà d'une taille maximale"""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_size_bytes: int = DEFAULT_MAX_SIZE_BYTES):
+        if max_size_bytes <= 0:
+            raise ValueError(f"Taille maximale du cache invalide : {max_size_bytes}")
+        self.path = path
+        self.max_size_bytes = max_size_bytes
+        self.hits = 0
+        self.misses = 0
+
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self.connection = sqlite3.connect(path, timeout=30)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "key TEXT PRIMARY KEY, stats TEXT NOT NULL, size INTEGER NOT NULL, last_access REAL NOT NULL)"
+        )
+        self.connection.commit()
+
+    def get(self, key: str) -> Optional[dict]:
+        row = self.connection.execute("SELECT stats FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.connection.execute("UPDATE results SET last_access = ? WHERE key = ?", (time.time(), key))
+        self.connection.commit()
+        return json.loads(row[0])
+
+    def put(self, key: str, stats: dict) -> None:
+        encoded = json.dumps(stats, sort_keys=True)
+        self.connection.execute(
+            "INSERT OR REPLACE INTO results (key, stats, size, last_access) VALUES (?, ?, ?, ?)",
+            (key, encoded, len(encoded) + len(key), time.time())
+        )
+        self._evict()
+        self.connection.commit()
+
+    def _evict(self) -> None:
+        """Supprime les entrées les moins récemment utilisées tant que la taille dépasse la limite"""
+        total = self.total_size()
+        if total <= self.max_size_bytes:
+            return
+        rows = self.connection.execute("SELECT key, size FROM results ORDER BY last_access ASC").fetchall()
+        to_delete = []
+        for key, size in rows:
+            if total <= self.max_size_bytes:
+                break
+            to_delete.append((key,))
+            total -= size
+        self.connection.executemany("DELETE FROM results WHERE key = ?", to_delete)
+
+    def total_size(self) -> int:
+        return self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+
+    def clear(self) -> None:
+        self.connection.execute("DELETE FROM results")
+        self.connection.commit()
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __len__(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def __contains__(self, key: str) -> bool:
+        return self.connection.execute("SELECT 1 FROM results WHERE key = ?", (key,)).fetchone() is not None
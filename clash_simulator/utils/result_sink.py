@@ -0,0 +1,165 @@
+"""
+Écriture en flux des résultats de batailles (JSONL, Parquet si pyarrow est disponible)
+"""
+import json
+import os
+from typing import Dict, Iterator, List
+
+DEFAULT_FLUSH_EVERY = 100 # Enregistrements gardés en mémoire avant écriture
+
+
+class ResultSink:
+    """Puits d'enregistrements en ajout seul, écrit par lots de `flush_every`.
+
+    Un enregistrement de BattleRunner.run_batch contient: config_hash (sha256 de la
+    base, de l'armée et des paramètres, sans la graine), seed, task (indice dans le
+    lot), cached, wall_time (secondes), finished_at (horodatage) et stats.
+    """
+
+    def __init__(self, flush_every: int = DEFAULT_FLUSH_EVERY):
+        if flush_every < 1:
+            raise ValueError(f"Taille de lot invalide : {flush_every}")
+        self.flush_every = flush_every
+        self.written = 0
+        self._buffer: List[Dict] = []
+
+    def write(self, record: Dict) -> None:
+        self._buffer.append(record)
+        if len(self._buffer) >= self.flush_every:
+            self.flush()
+
+    def flush(self) -> None:
+        """Écrit les enregistrements en attente"""
+        if not self._buffer:
+            return
+        self._write_batch(self._buffer)
+        self.written += len(self._buffer)
+        self._buffer = []
+
+    def _write_batch(self, records: List[Dict]) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        self.flush()
+
+    def __enter__(self) -> 'ResultSink':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class JsonlResultSink(ResultSink):
+    """Un enregistrement JSON par ligne, ajouté à la fin du fichier.
+
+    Chaque lot se termine par un saut de ligne: après une interruption, seule une
+    dernière ligne incomplète peut manquer, et elle est retirée à la réouverture.
+    """
+
+    def __init__(self, path: str, flush_every: int = DEFAULT_FLUSH_EVERY, fsync: bool = False):
+        super().__init__(flush_every)
+        self.path = path
+        self.fsync = fsync
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        _truncate_partial_line(path)
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def _write_batch(self, records: List[Dict]) -> None:
+        self._file.write("".join(json.dumps(r, sort_keys=True, ensure_ascii=False) + "\n" for r in records))
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        super().close()
+        self._file.close()
+
+
+class ParquetResultSink(ResultSink):
+    """Fichiers Parquet en colonnes dans un répertoire, un fichier part-NNNNN.parquet par lot.
+
+    Un fichier Parquet n'est lisible qu'une fois fermé: écrire chaque lot dans son
+    propre fichier garantit que tout lot écrit survit à une interruption. Les
+    statistiques deviennent des colonnes; les valeurs imbriquées sont stockées en JSON.
+    """
+
+    def __init__(self, directory: str, flush_every: int = 1000):
+        super().__init__(flush_every)
+        self._pyarrow, self._parquet = _load_pyarrow()
+        if self._pyarrow is None:
+            raise ValueError("L'écriture Parquet nécessite pyarrow (pip install pyarrow)")
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._next_part = sum(1 for name in os.listdir(directory) if name.endswith(".parquet"))
+
+    def _write_batch(self, records: List[Dict]) -> None:
+        table = self._pyarrow.Table.from_pylist([_flatten_record(r) for r in records])
+        path = os.path.join(self.directory, f"part-{self._next_part:05d}.parquet")
+        self._parquet.write_table(table, path + ".tmp")
+        os.replace(path + ".tmp", path)
+        self._next_part += 1
+
+
+def _load_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        return None, None
+    return pyarrow, pyarrow.parquet
+
+
+def parquet_available() -> bool:
+    return _load_pyarrow()[0] is not None
+
+
+def _flatten_record(record: Dict) -> Dict:
+    row = {key: value for key, value in record.items() if key != 'stats'}
+    for key, value in record.get('stats', {}).items():
+        row[key] = json.dumps(value, sort_keys=True) if isinstance(value, (dict, list)) else value
+    return row
+
+
+def _truncate_partial_line(path: str, chunk_size: int = 1 << 16) -> None:
+    """Retire une éventuelle dernière ligne incomplète (écriture interrompue)"""
+    if not os.path.exists(path):
+        return
+    with open(path, 'rb+') as f:
+        end = f.seek(0, os.SEEK_END)
+        if end == 0:
+            return
+        f.seek(end - 1)
+        if f.read(1) == b"\n":
+            return
+        position = end
+        while position > 0:
+            start = max(0, position - chunk_size)
+            f.seek(start)
+            newline = f.read(position - start).rfind(b"\n")
+            if newline >= 0:
+                f.truncate(start + newline + 1)
+                return
+            position = start
+        f.truncate(0)
+
+
+def open_result_sink(path: str, flush_every: int = DEFAULT_FLUSH_EVERY) -> ResultSink:
+    """Puits adapté à l'extension: .jsonl (fichier) ou .parquet (répertoire de fichiers)"""
+    if path.endswith(".jsonl"):
+        return JsonlResultSink(path, flush_every)
+    if path.endswith(".parquet"):
+        return ParquetResultSink(path, flush_every)
+    raise ValueError(f"Format de résultats non reconnu (attendu .jsonl ou .parquet) : {path}")
+
+
+def read_jsonl_results(path: str) -> Iterator[Dict]:
+    """Relit les enregistrements d'un fichier JSONL (ignore une dernière ligne incomplète)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.endswith("\n"):
+                break
+            yield json.loads(line)
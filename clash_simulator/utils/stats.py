@@ -0,0 +1,54 @@
+"""
+Outils statistiques légers (intervalles de confiance) sans dépendance externe
+"""
+import math
+from statistics import NormalDist, mean, stdev
+from typing import Dict, List, Sequence
+
+
+def student_t_quantile(p: float, df: int) -> float:
+    """Quantile de la loi de Student.
+
+    Formules exactes pour 1 et 2 degrés de liberté, développement de
+    Cornish-Fisher au-delà (erreur < 1e-3 dès df >= 3).
+    """
+    if df < 1:
+        raise ValueError(f"Degrés de liberté invalides : {df}")
+    if df == 1:
+        return math.tan(math.pi * (p - 0.5))
+    if df == 2:
+        return (2 * p - 1) / math.sqrt(2 * p * (1 - p))
+
+    z = NormalDist().inv_cdf(p)
+    g1 = (z**3 + z) / 4
+    g2 = (5 * z**5 + 16 * z**3 + 3 * z) / 96
+    g3 = (3 * z**7 + 19 * z**5 + 17 * z**3 - 15 * z) / 384
+    g4 = (79 * z**9 + 776 * z**7 + 1482 * z**5 - 1920 * z**3 - 945 * z) / 92160
+    return z + g1 / df + g2 / df**2 + g3 / df**3 + g4 / df**4
+
+
+def mean_confidence_interval(samples: Sequence[float], confidence: float = 0.95) -> Dict[str, float]:
+    """Moyenne, écart-type et intervalle de confiance (Student) d'un échantillon."""
+    n = len(samples)
+    if n == 0:
+        raise ValueError("Impossible de calculer un intervalle sur un échantillon vide.")
+
+    sample_mean = mean(samples)
+    if n == 1:
+        return {'mean': sample_mean, 'std': 0.0, 'ci_low': -math.inf, 'ci_high': math.inf}
+
+    sample_std = stdev(samples)
+    half_width = student_t_quantile(0.5 + confidence / 2, n - 1) * sample_std / math.sqrt(n)
+    return {
+        'mean': sample_mean,
+        'std': sample_std,
+        'ci_low': sample_mean - half_width,
+        'ci_high': sample_mean + half_width,
+    }
+
+
+def paired_differences(samples_a: Sequence[float], samples_b: Sequence[float]) -> List[float]:
+    """Différences a_i - b_i de deux échantillons appariés."""
+    if len(samples_a) != len(samples_b):
+        raise ValueError("Les échantillons appariés doivent avoir la même taille.")
+    return [a - b for a, b in zip(samples_a, samples_b)]
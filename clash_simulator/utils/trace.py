@@ -0,0 +1,76 @@
+"""
+Export des traces de simulation au format Chrome trace event (Perfetto, about:tracing)
+"""
+import json
+import os
+from time import perf_counter_ns
+from typing import Dict, List, Optional
+
+TRACE_DIRECTORY = "logs/traces" # Répertoire par défaut des fichiers de trace
+
+# Pistes fixes; les troupes reçoivent les pistes suivantes dans l'ordre de déploiement
+TICK_TRACK = 1
+DEFENSE_TRACK = 2
+
+
+class TraceRecorder:
+    """Collecte des événements de trace (temps réel en microsecondes depuis la création).
+
+    Chaque piste (tid) apparaît comme une ligne du visualiseur: les ticks du
+    simulateur, les acquisitions de cibles des défenses, puis une piste par troupe
+    pour ses calculs A*.
+    """
+
+    def __init__(self, name: str = "battle"):
+        self.name = name
+        self.origin_ns = perf_counter_ns()
+        self.events: List[Dict] = []
+        self._next_tid = DEFENSE_TRACK + 1
+        self._metadata("process_name", 0, {"name": name})
+        self._metadata("thread_name", TICK_TRACK, {"name": "ticks"})
+        self._metadata("thread_name", DEFENSE_TRACK, {"name": "defenses"})
+
+    def _metadata(self, name: str, tid: int, args: Dict) -> None:
+        self.events.append({"name": name, "ph": "M", "pid": 1, "tid": tid, "args": args})
+
+    def now(self) -> int:
+        """Horodatage courant (ns), à passer ensuite à complete()"""
+        return perf_counter_ns()
+
+    def register_track(self, name: str) -> int:
+        """Crée une nouvelle piste nommée et retourne son identifiant"""
+        tid = self._next_tid
+        self._next_tid += 1
+        self._metadata("thread_name", tid, {"name": name})
+        return tid
+
+    def complete(self, name: str, category: str, start_ns: int, tid: int, args: Optional[Dict] = None,
+                 end_ns: Optional[int] = None) -> None:
+        """Ajoute une plage (événement 'X') de start_ns à end_ns (maintenant par défaut)"""
+        end_ns = perf_counter_ns() if end_ns is None else end_ns
+        self.events.append({
+            "name": name, "cat": category, "ph": "X", "pid": 1, "tid": tid,
+            "ts": (start_ns - self.origin_ns) / 1000.0, "dur": (end_ns - start_ns) / 1000.0,
+            "args": args or {},
+        })
+
+    def instant(self, name: str, category: str, tid: int, args: Optional[Dict] = None) -> None:
+        """Ajoute un événement ponctuel (événement 'i', portée piste)"""
+        self.events.append({
+            "name": name, "cat": category, "ph": "i", "s": "t", "pid": 1, "tid": tid,
+            "ts": (perf_counter_ns() - self.origin_ns) / 1000.0, "args": args or {},
+        })
+
+    def to_dict(self) -> Dict:
+        return {"traceEvents": self.events, "displayTimeUnit": "ms"}
+
+    def save(self, path: Optional[str] = None) -> str:
+        """Écrit la trace JSON et retourne son chemin"""
+        if path is None:
+            path = os.path.join(TRACE_DIRECTORY, f"{self.name}.trace.json")
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f)
+        return path
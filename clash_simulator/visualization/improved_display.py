@@ -1,13 +1,14 @@
 """
 Système de visualisation amélioré avec une mise en page plus claire
 """
-import os
 import sys
-from typing import List, Dict
+from typing import List, Dict, Optional
 from ..core.config import GRID_SIZE, COLORS, DISPLAY_CONFIG, TICK_RATE
 from ..entities.troop import Troop, TroopState
 from ..systems.base_layout import BaseLayout
 from ..systems.battle_simulator import BattleSimulator
+from ..systems.replay import BattleFrame, ReplayPlayer, ReplayReader
+from .terminal_display import CLEAR_SCREEN
 
 class ImprovedDisplay:
     """Affichage amélioré de la bataille avec une meilleure mise en page"""
@@ -29,8 +30,10 @@ class ImprovedDisplay:
             return hasattr(sys.stdout, 'isatty') and sys.stdout.isatty()
     
     def clear_screen(self) -> None:
-        """Efface l'écran"""
-        os.system('cls' if sys.platform == "win32" else 'clear')
+        """Efface l'écran (séquence ANSI, sans sous-processus)"""
+        if self.enable_colors:
+            sys.stdout.write(CLEAR_SCREEN)
+            sys.stdout.flush()
     
     def get_color(self, color_name: str) -> str:
         """Retourne le code couleur si activé"""
@@ -44,8 +47,12 @@ class ImprovedDisplay:
     
     def render_compact_battle(self, simulator: BattleSimulator) -> None:
         """Affiche une vue compacte de la bataille"""
+        self.render_compact_frame(BattleFrame.from_simulator(simulator))
+    
+    def render_compact_frame(self, frame: BattleFrame) -> None:
+        """Affiche une vue compacte d'un instantané de bataille (simulation en cours ou replay)"""
         self.clear_screen()
-        stats = simulator.get_statistics()
+        stats = frame.get_statistics()
         
         # En-tête
         print(f"{self.get_color('cyan')}═════════════════════════════════════════════════════════════{self.reset_color()}")
@@ -53,24 +60,24 @@ class ImprovedDisplay:
         print(f"{self.get_color('cyan')}═════════════════════════════════════════════════════════════{self.reset_color()}\n")
         
         # Statistiques principales sur une ligne
-        self._print_main_stats(simulator, stats)
+        self._print_main_stats(frame, stats)
         
         # Vue simplifiée de la carte
         print(f"\n{self.get_color('cyan')}▌ CARTE DE BATAILLE ▐{self.reset_color()}")
-        self._print_simplified_map(simulator)
+        self._print_simplified_map(frame)
         
         # État des troupes et bâtiments
         print(f"\n{self.get_color('cyan')}▌ ÉTAT DES FORCES ▐{self.reset_color()}")
-        self._print_forces_status(simulator)
+        self._print_forces_status(frame)
         
         # Actions en cours
         print(f"\n{self.get_color('cyan')}▌ ACTIONS EN COURS ▐{self.reset_color()}")
-        self._print_current_actions(simulator)
+        self._print_current_actions(frame)
     
-    def _print_main_stats(self, simulator: BattleSimulator, stats: dict) -> None:
+    def _print_main_stats(self, frame: BattleFrame, stats: dict) -> None:
         """Affiche les statistiques principales sur une ligne"""
         # Temps
-        time_ratio = simulator.current_time / simulator.battle_duration
+        time_ratio = frame.time / frame.battle_duration
         time_bar = self._create_progress_bar(time_ratio, 20)
         time_color = "green" if time_ratio < 0.5 else "yellow" if time_ratio < 0.8 else "red"
         
@@ -82,7 +89,7 @@ class ImprovedDisplay:
         # Étoiles
         stars = "★" * stats['stars'] + "☆" * (3 - stats['stars'])
         
-        print(f"⏱  Temps: {self.get_color(time_color)}{time_bar} {simulator.current_time:.0f}/{simulator.battle_duration}s{self.reset_color()}")
+        print(f"⏱  Temps: {self.get_color(time_color)}{time_bar} {frame.time:.0f}/{frame.battle_duration}s{self.reset_color()}")
         print(f"💥 Destruction: {self.get_color(dest_color)}{dest_bar} {stats['destruction_percentage']:.0f}%{self.reset_color()}")
         print(f"⭐ Étoiles: {self.get_color('yellow')}{stars}{self.reset_color()}")
         print(f"⚔  Troupes: {self.get_color('green')}{stats['troops_deployed'] - stats['troops_lost']}/{stats['troops_deployed']}{self.reset_color()}")
@@ -93,7 +100,7 @@ class ImprovedDisplay:
         bar = "█" * filled + "░" * (length - filled)
         return f"[{bar}]"
     
-    def _print_simplified_map(self, simulator: BattleSimulator) -> None:
+    def _print_simplified_map(self, frame: BattleFrame) -> None:
         """Affiche une carte simplifiée 20x20"""
         # Créer une grille simplifiée
         simplified_size = 20
@@ -101,7 +108,7 @@ class ImprovedDisplay:
         grid = [[' ' for _ in range(simplified_size)] for _ in range(simplified_size)]
         
         # Placer les bâtiments
-        for building in simulator.base_layout.get_all_buildings():
+        for building in frame.buildings:
             x = int(building.x / scale)
             y = int(building.y / scale)
             if 0 <= x < simplified_size and 0 <= y < simplified_size:
@@ -117,7 +124,7 @@ class ImprovedDisplay:
                     grid[y][x] = 'B'
         
         # Placer les troupes
-        for troop in simulator.troops:
+        for troop in frame.troops:
             if troop.is_alive():
                 x = int(troop.x / scale)
                 y = int(troop.y / scale)
@@ -133,20 +140,20 @@ class ImprovedDisplay:
         
         print(f"{self.get_color('gray')}Légende: T=Town Hall, D=Défense, B=Bâtiment, #=Mur, *=Troupe, x=Détruit{self.reset_color()}")
     
-    def _print_forces_status(self, simulator: BattleSimulator) -> None:
+    def _print_forces_status(self, frame: BattleFrame) -> None:
         """Affiche l'état des forces"""
         # Compter les troupes par type
         troop_counts = {}
-        for troop in simulator.troops:
+        for troop in frame.troops:
             if troop.is_alive():
                 troop_counts[troop.type] = troop_counts.get(troop.type, 0) + 1
         
         # Compter les bâtiments actifs
-        defense_count = sum(1 for b in simulator.base_layout.buildings 
+        defense_count = sum(1 for b in frame.buildings 
                           if b.type in ["cannon", "archer_tower", "mortar"] and not b.is_destroyed)
-        other_count = sum(1 for b in simulator.base_layout.buildings 
-                         if b.type not in ["cannon", "archer_tower", "mortar"] and not b.is_destroyed)
-        wall_count = sum(1 for w in simulator.base_layout.walls if not w.is_destroyed)
+        other_count = sum(1 for b in frame.buildings 
+                         if b.type not in ["cannon", "archer_tower", "mortar", "wall"] and not b.is_destroyed)
+        wall_count = sum(1 for w in frame.buildings if w.type == "wall" and not w.is_destroyed)
         
         # Afficher
         if troop_counts:
@@ -159,17 +166,17 @@ class ImprovedDisplay:
         print(f"Autres bâtiments: {self.get_color('blue')}{other_count}{self.reset_color()}")
         print(f"Murs intacts: {self.get_color('gray')}{wall_count}{self.reset_color()}")
     
-    def _print_current_actions(self, simulator: BattleSimulator) -> None:
+    def _print_current_actions(self, frame: BattleFrame) -> None:
         """Affiche les actions en cours"""
         actions = []
         
         # Actions des troupes
-        for troop in simulator.troops[:5]:  # Limiter à 5 pour ne pas surcharger
+        for troop in frame.troops[:5]:  # Limiter à 5 pour ne pas surcharger
             if troop.is_alive():
-                if troop.state == TroopState.ATTACKING and troop.target:
-                    actions.append(f"{troop.type} attaque {troop.target.type}")
-                elif troop.state == TroopState.MOVING and troop.target:
-                    actions.append(f"{troop.type} → {troop.target.type}")
+                if troop.state == TroopState.ATTACKING and troop.target_type:
+                    actions.append(f"{troop.type} attaque {troop.target_type}")
+                elif troop.state == TroopState.MOVING and troop.target_type:
+                    actions.append(f"{troop.type} → {troop.target_type}")
         
         if actions:
             for action in actions:
@@ -179,16 +186,28 @@ class ImprovedDisplay:
 
 
 class CompactBattleVisualizer:
-    """Visualiseur de bataille avec affichage compact"""
+    """Visualiseur de bataille avec affichage compact, en direct ou depuis un replay enregistré"""
     
-    def __init__(self, simulator: BattleSimulator):
+    def __init__(self, simulator: Optional[BattleSimulator] = None, replay: Optional[str] = None):
+        if (simulator is None) == (replay is None):
+            raise ValueError("Il faut fournir soit un simulateur, soit un fichier de replay")
         self.simulator = simulator
+        self.player = ReplayPlayer(ReplayReader(replay)) if replay is not None else None
         self.display = ImprovedDisplay()
     
     def run(self, speed_multiplier: float = 1.0) -> None:
         """Lance la visualisation compacte"""
         import time
         
+        if self.player is not None:
+            # Une frame par seconde de bataille, affichée toutes les 1/speed_multiplier secondes
+            for frame in self.player.play(self.player.tick_rate):
+                self.display.render_compact_frame(frame)
+                if not self.player.at_end():
+                    time.sleep(1.0 / speed_multiplier)
+            print(f"\n{self.display.get_color('green')}✓ Replay terminé !{self.display.reset_color()}")
+            return
+        
         self.simulator.start()
         
         # Mise à jour toutes les secondes
@@ -206,4 +225,23 @@ class CompactBattleVisualizer:
         
         # Affichage final
         self.display.render_compact_battle(self.simulator)
-        print(f"\n{self.display.get_color('green')}✓ Simulation terminée !{self.display.reset_color()}") 
\ No newline at end of file
+        print(f"\n{self.display.get_color('green')}✓ Simulation terminée !{self.display.reset_color()}")
+    
+    def seek(self, seconds: float) -> None:
+        """Affiche le replay au temps de bataille demandé"""
+        self._require_replay()
+        self.display.render_compact_frame(self.player.seek_time(seconds))
+    
+    def fast_forward(self, seconds: float = 5.0) -> None:
+        """Avance le replay de `seconds` secondes de bataille et l'affiche"""
+        self._require_replay()
+        self.display.render_compact_frame(self.player.fast_forward(seconds))
+    
+    def rewind(self, seconds: float = 5.0) -> None:
+        """Recule le replay de `seconds` secondes de bataille et l'affiche"""
+        self._require_replay()
+        self.display.render_compact_frame(self.player.rewind(seconds))
+    
+    def _require_replay(self) -> None:
+        if self.player is None:
+            raise ValueError("La navigation n'est disponible qu'en mode replay")
@@ -0,0 +1,84 @@
+"""
+Rendu découplé de la simulation: boîte à une place et thread d'affichage
+"""
+import threading
+import time
+from typing import Callable, Optional
+
+from ..systems.replay import BattleFrame
+
+
+class FrameMailbox:
+    """Boîte à une place entre la simulation et l'affichage.
+
+    Le producteur remplace la frame en attente (l'ancienne est comptée comme
+    ignorée), le consommateur prend toujours la plus récente. Les frames sont des
+    BattleFrame immuables: aucun verrou n'est nécessaire pour les lire.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._frame: Optional[BattleFrame] = None
+        self._closed = False
+        self.published = 0
+        self.dropped = 0
+
+    def publish(self, frame: BattleFrame) -> None:
+        with self._condition:
+            if self._frame is not None:
+                self.dropped += 1
+            self._frame = frame
+            self.published += 1
+            self._condition.notify()
+
+    def take(self) -> Optional[BattleFrame]:
+        """Attend et retire la frame la plus récente; None une fois fermée et vidée"""
+        with self._condition:
+            self._condition.wait_for(lambda: self._frame is not None or self._closed)
+            frame, self._frame = self._frame, None
+            return frame
+
+    def close(self) -> None:
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+
+class RenderThread(threading.Thread):
+    """Affiche les frames publiées, au plus une toutes les `min_interval` secondes.
+
+    La simulation ne bloque jamais sur le terminal: si l'affichage est plus lent,
+    les frames intermédiaires sont simplement ignorées. La dernière frame publiée
+    avant stop() est toujours affichée.
+    """
+
+    def __init__(self, draw: Callable[[BattleFrame], None], min_interval: float = 0.0):
+        super().__init__(name="battle-render", daemon=True)
+        self.draw = draw
+        self.min_interval = min_interval
+        self.mailbox = FrameMailbox()
+        self.rendered = 0
+
+    def publish(self, frame: BattleFrame) -> None:
+        self.mailbox.publish(frame)
+
+    def run(self) -> None:
+        while True:
+            frame = self.mailbox.take()
+            if frame is None:
+                break
+            started = time.perf_counter()
+            self.draw(frame)
+            self.rendered += 1
+            remaining = self.min_interval - (time.perf_counter() - started)
+            if remaining > 0:
+                time.sleep(remaining)
+
+    def stop(self) -> None:
+        """Ferme la boîte et attend l'affichage de la dernière frame"""
+        self.mailbox.close()
+        self.join()
+
+    @property
+    def dropped(self) -> int:
+        return self.mailbox.dropped
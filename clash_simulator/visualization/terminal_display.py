@@ -1,14 +1,25 @@
 """
 Système de visualisation dans le terminal avec couleurs
 """
-import os
 import sys
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from ..core.config import GRID_SIZE, COLORS, DISPLAY_CONFIG, TICK_RATE
 from ..entities.troop import Troop, TroopState
 from ..entities.defense_buildings import DefenseBuilding, Mortar
 from ..systems.base_layout import BaseLayout
 from ..systems.battle_simulator import BattleSimulator
+from ..systems.replay import BattleFrame, ReplayPlayer, ReplayReader
+from .render_thread import RenderThread
+
+# Séquences ANSI du rendu différentiel
+CLEAR_SCREEN = "\033[2J\033[H"
+CLEAR_LINE_END = "\033[K"
+CLEAR_SCREEN_END = "\033[J"
+STATS_SPACING = "   " # Espace entre la grille et le panneau de statistiques
+
+def _move_cursor(row: int, column: int) -> str:
+    """Séquence ANSI de positionnement du curseur (ligne, colonne à partir de 0)"""
+    return f"\033[{row + 1};{column + 1}H"
 
 class TerminalDisplay:
     """Affichage de la bataille dans le terminal"""
@@ -16,8 +27,16 @@ class TerminalDisplay:
     def __init__(self, width: int = GRID_SIZE, height: int = GRID_SIZE):
         self.width = width
         self.height = height
-        self.grid = [[' ' for _ in range(width)] for _ in range(height)]
         self.enable_colors = self._check_color_support()
+        # Couche statique (terrain vide) rendue une seule fois; chaque frame en part
+        empty_symbol = DISPLAY_CONFIG["terrain"]["empty"]["symbol"]
+        empty_color = DISPLAY_CONFIG["terrain"]["empty"]["color"]
+        self._static_row = [self.get_color(empty_color) + empty_symbol + self.reset_color()] * width
+        self._cell_cache = {}
+        self.grid = [self._static_row[:] for _ in range(height)]
+        # Dernier écran dessiné par draw_frame (None = prochain dessin complet)
+        self._previous_grid: Optional[List[List[str]]] = None
+        self._previous_stats: List[str] = []
         
     def _check_color_support(self) -> bool:
         """Vérifie si le terminal supporte les couleurs"""
@@ -36,11 +55,16 @@ class TerminalDisplay:
             return hasattr(sys.stdout, 'isatty') and sys.stdout.isatty()
     
     def clear_screen(self) -> None:
-        """Efface l'écran"""
-        if sys.platform == "win32":
-            os.system('cls')
-        else:
-            os.system('clear')
+        """Efface l'écran (séquence ANSI, sans sous-processus)"""
+        if self.enable_colors:
+            sys.stdout.write(CLEAR_SCREEN)
+            sys.stdout.flush()
+        self.invalidate()
+    
+    def invalidate(self) -> None:
+        """Force un dessin complet au prochain draw_frame (après un affichage extérieur)"""
+        self._previous_grid = None
+        self._previous_stats = []
     
     def get_color(self, color_name: str) -> str:
         """Retourne le code couleur si activé"""
@@ -66,21 +90,13 @@ class TerminalDisplay:
     
     def render_battle(self, simulator: BattleSimulator) -> None:
         """Affiche l'état actuel de la bataille avec la grille et les statistiques côte à côte."""
-        self._reset_grid() # Prépare self.grid avec les symboles colorés
-        
-        # Placer les bâtiments, troupes, projectiles...
-        for building in simulator.base_layout.get_all_buildings():
-            self._place_building(building)
-        for troop in simulator.troops:
-            if troop.is_alive():
-                self._place_troop(troop)
-        for building in simulator.base_layout.buildings:
-            if isinstance(building, Mortar) and hasattr(building, 'projectiles'):
-                for projectile in building.projectiles:
-                    self._place_projectile(projectile)
-        
+        self.render_frame(BattleFrame.from_simulator(simulator))
+    
+    def render_frame(self, frame: BattleFrame) -> None:
+        """Affiche un instantané de bataille (simulation en cours ou replay)."""
+        self._compose_grid(frame)
         grid_lines = self._print_grid(return_lines=True) or []
-        stats_lines_raw = self._print_stats(simulator, return_lines=True) or []
+        stats_lines_raw = self._print_stats(frame, return_lines=True) or []
 
         grid_line_width_no_ansi = 0
         if grid_lines:
@@ -97,7 +113,7 @@ class TerminalDisplay:
         stats_lines_padded = ["" for _ in range(stats_vertical_offset)] + stats_lines_raw
 
         max_height = max(len(grid_lines), len(stats_lines_padded))
-        spacing = "   " 
+        spacing = STATS_SPACING
 
         final_display_lines = []
         for i in range(max_height):
@@ -109,15 +125,72 @@ class TerminalDisplay:
         for line in final_display_lines:
             print(line)
     
-    def _reset_grid(self) -> None:
-        """Réinitialise la grille"""
-        empty_symbol = DISPLAY_CONFIG["terrain"]["empty"]["symbol"]
-        empty_color = DISPLAY_CONFIG["terrain"]["empty"]["color"]
-        colored_empty = self.get_color(empty_color) + empty_symbol + self.reset_color()
+    def draw_frame(self, frame: BattleFrame) -> None:
+        """Dessine un instantané en ne réécrivant que les cellules et lignes de statistiques modifiées.
+        
+        Le premier appel (ou après invalidate) efface l'écran et dessine tout; les suivants
+        comparent avec l'écran précédent et n'émettent que des déplacements de curseur ANSI
+        et les cellules changées. Sans terminal ANSI, revient à render_frame.
+        """
+        if not self.enable_colors:
+            self.render_frame(frame)
+            return
+        
+        self._compose_grid(frame)
+        stats_lines = self._print_stats(frame, return_lines=True) or []
+        stats_row = (self.height + 2) // 3 # Même décalage vertical que render_frame
+        stats_column = self.width + 4 + len(STATS_SPACING) # "│ " + grille + " │" + espacement
+        bottom_row = max(self.height + 2, stats_row + len(stats_lines))
         
-        for y in range(self.height):
-            for x in range(self.width):
-                self.grid[y][x] = colored_empty
+        output = []
+        if self._previous_grid is None:
+            output.append(CLEAR_SCREEN)
+            output.extend(line + "\n" for line in self._print_grid(return_lines=True))
+        else:
+            for y, row in enumerate(self.grid):
+                previous_row = self._previous_grid[y]
+                if row == previous_row:
+                    continue
+                for x, cell in enumerate(row):
+                    if cell != previous_row[x]:
+                        output.append(_move_cursor(y + 1, x + 2) + cell)
+        
+        for i, line in enumerate(stats_lines):
+            if i >= len(self._previous_stats) or line != self._previous_stats[i]:
+                output.append(_move_cursor(stats_row + i, stats_column) + line + CLEAR_LINE_END)
+        
+        # Curseur sous l'affichage, pour les messages qui suivent
+        output.append(_move_cursor(bottom_row, 0) + CLEAR_SCREEN_END)
+        sys.stdout.write("".join(output))
+        sys.stdout.flush()
+        
+        self._previous_grid = [row[:] for row in self.grid]
+        self._previous_stats = stats_lines
+    
+    def _compose_grid(self, frame: BattleFrame) -> None:
+        """Remplit self.grid à partir de la couche statique et des éléments de la frame"""
+        self._reset_grid() # Prépare self.grid avec les symboles colorés
+        
+        # Placer les bâtiments, troupes, projectiles...
+        for building in frame.buildings:
+            self._place_building(building)
+        for troop in frame.troops:
+            if troop.is_alive():
+                self._place_troop(troop)
+        for projectile in frame.projectiles:
+            self._place_projectile(projectile)
+    
+    def _reset_grid(self) -> None:
+        """Réinitialise la grille à partir de la couche statique pré-rendue"""
+        self.grid = [self._static_row[:] for _ in range(self.height)]
+    
+    def _colored(self, color: str, symbol: str) -> str:
+        """Symbole coloré, mis en cache (les mêmes chaînes sont réutilisées d'une frame à l'autre)"""
+        key = (color, symbol)
+        cell = self._cell_cache.get(key)
+        if cell is None:
+            cell = self._cell_cache[key] = self.get_color(color) + symbol + self.reset_color()
+        return cell
     
     def _place_building(self, building) -> None:
         """Place un bâtiment sur la grille"""
@@ -130,7 +203,7 @@ class TerminalDisplay:
         
         # Si le bâtiment est détruit, utiliser une couleur différente
         if building.is_destroyed:
-            colored_symbol = self.get_color("gray") + "x" + self.reset_color()
+            colored_symbol = self._colored("gray", "x")
         else:
             # Indicateur de santé
             hp_ratio = building.hp / building.max_hp
@@ -139,7 +212,7 @@ class TerminalDisplay:
             elif hp_ratio < 0.6:
                 color = "yellow"
             
-            colored_symbol = self.get_color(color) + symbol + self.reset_color()
+            colored_symbol = self._colored(color, symbol)
         
         # Placer le symbole sur toutes les tuiles du bâtiment
         for dy in range(building.size):
@@ -149,7 +222,7 @@ class TerminalDisplay:
                 if 0 <= x < self.width and 0 <= y < self.height:
                     self.grid[y][x] = colored_symbol
     
-    def _place_troop(self, troop: Troop) -> None:
+    def _place_troop(self, troop) -> None:
         """Place une troupe sur la grille"""
         if troop.type not in DISPLAY_CONFIG["troops"]:
             return
@@ -171,7 +244,7 @@ class TerminalDisplay:
         elif hp_ratio < 0.6:
             color = "yellow"
         
-        colored_symbol = self.get_color(color) + symbol + self.reset_color()
+        colored_symbol = self._colored(color, symbol)
         
         # Placer la troupe
         x = int(troop.x)
@@ -179,14 +252,13 @@ class TerminalDisplay:
         if 0 <= x < self.width and 0 <= y < self.height:
             self.grid[y][x] = colored_symbol
     
-    def _place_projectile(self, projectile: dict) -> None:
-        """Place un projectile de mortier"""
-        x = int(projectile['target_x'])
-        y = int(projectile['target_y'])
+    def _place_projectile(self, projectile: Tuple[float, float]) -> None:
+        """Place un projectile de mortier (position d'impact)"""
+        x = int(projectile[0])
+        y = int(projectile[1])
         
         if 0 <= x < self.width and 0 <= y < self.height:
-            symbol = self.get_color("orange") + "◎" + self.reset_color()
-            self.grid[y][x] = symbol
+            self.grid[y][x] = self._colored("orange", "◎")
     
     def _print_grid(self, return_lines: bool = False) -> Optional[List[str]]:
         """Affiche la grille ou retourne ses lignes."""
@@ -209,9 +281,9 @@ class TerminalDisplay:
                 print(line)
             return None # Explicite pour la clarté
     
-    def _print_stats(self, simulator: BattleSimulator, return_lines: bool = False) -> Optional[List[str]]:
+    def _print_stats(self, frame: BattleFrame, return_lines: bool = False) -> Optional[List[str]]:
         """Affiche les statistiques de la bataille ou retourne ses lignes."""
-        stats = simulator.get_statistics()
+        stats = frame.get_statistics()
         
         lines = []
         lines.append(f"{self.get_color('cyan')}╔══════════════════════════════════════╗{self.reset_color()}")
@@ -219,8 +291,8 @@ class TerminalDisplay:
         lines.append(f"{self.get_color('cyan')}╠══════════════════════════════════════╣{self.reset_color()}")
         
         # Temps
-        time_color = "green" if simulator.get_remaining_time() > 60 else "yellow" if simulator.get_remaining_time() > 30 else "red"
-        lines.append(f"{self.get_color('cyan')}║{self.reset_color()} Temps: {self.get_color(time_color)}{simulator.current_time:.1f}s / {simulator.battle_duration}s{self.reset_color()}")
+        time_color = "green" if frame.get_remaining_time() > 60 else "yellow" if frame.get_remaining_time() > 30 else "red"
+        lines.append(f"{self.get_color('cyan')}║{self.reset_color()} Temps: {self.get_color(time_color)}{frame.time:.1f}s / {frame.battle_duration}s{self.reset_color()}")
         
         # Destruction
         destruction = stats['destruction_percentage']
@@ -280,11 +352,16 @@ class TerminalDisplay:
 
 
 class BattleVisualizer:
-    """Visualiseur de bataille avec mise à jour en temps réel"""
+    """Visualiseur de bataille avec mise à jour en temps réel, ou relecture d'un replay enregistré"""
     
-    def __init__(self, simulator: BattleSimulator):
+    def __init__(self, simulator: Optional[BattleSimulator] = None, replay: Optional[str] = None):
+        if (simulator is None) == (replay is None):
+            raise ValueError("Il faut fournir soit un simulateur, soit un fichier de replay")
         self.simulator = simulator
+        self.player = ReplayPlayer(ReplayReader(replay)) if replay is not None else None
         self.display = TerminalDisplay()
+        self.frames_rendered = 0
+        self.frames_dropped = 0
         
     def run(self, speed_multiplier: float = 1.0, show_legend: bool = True, update_frequency: float = 1.0) -> None:
         """Lance la visualisation de la bataille
@@ -300,29 +377,37 @@ class BattleVisualizer:
             self.display.print_legend()
             input("\nAppuyez sur Entrée pour commencer la simulation...")
         
+        if self.player is not None:
+            self._play_replay(speed_multiplier, update_frequency)
+            return
+        
         self.simulator.start()
         
         # Temps entre chaque tick de simulation
-        tick_sleep_time = (1.0 / TICK_RATE) / speed_multiplier
-        
-        # Compteur pour la mise à jour de l'affichage
-        last_display_time = time.time()
-        
-        while not self.simulator.is_finished():
-            # Toujours simuler à la bonne vitesse
-            self.simulator.simulate_tick()
-            time.sleep(tick_sleep_time)
-            
-            # Mais ne rafraîchir l'affichage que selon update_frequency
-            current_time = time.time()
-            if current_time - last_display_time >= update_frequency:
-                self.display.clear_screen()
-                self.display.render_battle(self.simulator)
-                last_display_time = current_time
-        
-        # Affichage final
-        self.display.clear_screen()
-        self.display.render_battle(self.simulator)
+        tick_period = (1.0 / TICK_RATE) / speed_multiplier
+        
+        # L'affichage tourne dans son propre thread et ne reçoit que des instantanés immuables:
+        # un terminal lent fait ignorer des frames au lieu de ralentir la simulation
+        renderer = RenderThread(self.display.draw_frame, min_interval=update_frequency)
+        renderer.start()
+        try:
+            next_tick = time.perf_counter()
+            while not self.simulator.is_finished():
+                self.simulator.simulate_tick()
+                renderer.publish(BattleFrame.from_simulator(self.simulator))
+                
+                # Cadence fixe calée sur l'horloge (pas de dérive due au temps de calcul)
+                next_tick += tick_period
+                delay = next_tick - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    next_tick = time.perf_counter()
+        finally:
+            # La dernière frame publiée est toujours affichée avant de continuer
+            renderer.stop()
+        self.frames_rendered = renderer.rendered
+        self.frames_dropped = renderer.dropped
         
         print(f"\n{self.display.get_color('green')}Simulation terminée !{self.display.reset_color()}")
         
@@ -330,6 +415,53 @@ class BattleVisualizer:
         stats = self.simulator.get_statistics()
         self._print_final_summary(stats)
     
+    def _play_replay(self, speed_multiplier: float, update_frequency: float) -> None:
+        """Relit le replay depuis la position courante: une frame affichée par update_frequency"""
+        import time
+        
+        # Nombre de ticks de bataille écoulés entre deux affichages
+        step = max(1, int(round(update_frequency * self.player.tick_rate * speed_multiplier)))
+        frame = None
+        for frame in self.player.play(step):
+            self.display.draw_frame(frame)
+            if not self.player.at_end():
+                time.sleep(update_frequency)
+        
+        if frame is not None:
+            print(f"\n{self.display.get_color('green')}Replay terminé !{self.display.reset_color()}")
+            self._print_final_summary(frame.get_statistics())
+    
+    def browse(self, step_seconds: float = 1.0) -> None:
+        """Navigation interactive dans un replay (Entrée: avancer, +N/-N: avance rapide/retour de N secondes,
+        g T: aller au temps T, d: début, f: fin, p: lecture jusqu'à la fin, q: quitter)"""
+        if self.player is None:
+            raise ValueError("La navigation n'est disponible qu'en mode replay")
+        
+        frame = self.player.frame()
+        while True:
+            self.display.draw_frame(frame)
+            command = input("\n[Entrée] +1 | +N/-N s | g T | d | f | p | q > ").strip().lower()
+            try:
+                if command == "":
+                    frame = self.player.fast_forward(step_seconds)
+                elif command == "q":
+                    break
+                elif command == "d":
+                    frame = self.player.seek(0)
+                elif command == "f":
+                    frame = self.player.seek(self.player.last_position)
+                elif command == "p":
+                    self._play_replay(1.0, 1.0 / self.player.tick_rate)
+                    break
+                elif command.startswith("g"):
+                    frame = self.player.seek_time(float(command[1:]))
+                elif command.startswith("+"):
+                    frame = self.player.fast_forward(float(command[1:] or 5))
+                elif command.startswith("-"):
+                    frame = self.player.rewind(float(command[1:] or 5))
+            except ValueError:
+                print(f"Commande invalide : {command}")
+    
     def _print_final_summary(self, stats: dict) -> None:
         """Affiche un résumé final détaillé"""
         print(f"\n{self.display.get_color('cyan')}╔════════════════════════════════════════╗{self.display.reset_color()}")